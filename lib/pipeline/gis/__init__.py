@@ -11,11 +11,13 @@ from .feature_pagination_sharding import FeaturePaginationSharderFactory
 from .ingestion import GisIngestion, GisIngestionConfig, GisWorkerDbMode
 from .predicate import *
 from .pipeline import GisPipeline
+from .shard_plan import ShardPlan
 from .telemetry import GisPipelineTelemetry
 from .cache_cleaner import AbstractCacheCleaner, CacheCleaner, DisabledCacheCleaner
 from .config import (
     FeaturePageDescription,
     GisSchema,
     GisProjection,
+    PagingMode,
     SchemaField,
 )
@@ -1,12 +1,13 @@
 from abc import ABC, abstractmethod
 from logging import getLogger
 from pprint import pformat
-from typing import List, Set, Self
+from typing import List, Optional, Set, Self
 from urllib.parse import urlencode
 
 from lib.service.http import HttpLocalCache
 
 from .config import GisProjection, FeaturePageDescription
+from .shard_plan import ShardPlan
 from .url import get_page_url_params, UrlParams
 
 def get_page_clauses(schema_url: str, params: UrlParams, keys: Set[str]) -> List[str]:
@@ -47,8 +48,11 @@ class DisabledCacheCleaner(AbstractCacheCleaner):
 class CacheCleaner(AbstractCacheCleaner):
     _logger = getLogger(__name__)
 
-    def __init__(self: Self, file_cache: HttpLocalCache):
+    def __init__(self: Self,
+                 file_cache: HttpLocalCache,
+                 shard_plan: Optional[ShardPlan] = None):
         self._http_file_cache = file_cache
+        self._shard_plan = shard_plan
 
     async def forget_cache(
         self: Self,
@@ -70,6 +74,23 @@ class CacheCleaner(AbstractCacheCleaner):
             except:
                 self._logger.error(page_url_clauses)
                 raise
+
+            if not forget_total_shard:
+                return
+
+            # the requests the page was worked out from are no
+            # longer trusted either, such as the counts of the
+            # shards that were merged into this page.
+            for clause in feature_page.derived_from:
+                await self._http_file_cache.forget_by_clause(
+                    clauses=get_page_clauses(projection.schema.url, { 'where': clause }, {'where'}),
+                    partition=projection.partition_key(),
+                )
+
+            # the count of the shard is no longer trusted either
+            if self._shard_plan is not None:
+                for clause in [feature_page.where_clause, *feature_page.derived_from]:
+                    self._shard_plan.forget(projection.partition_key(), clause)
         except:
             self._logger.error(f"failed to clear cache for\n" \
                                f"{pformat(projection)}\n{pformat(feature_page)}")
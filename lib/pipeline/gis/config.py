@@ -9,6 +9,15 @@ from .predicate import YearMonth, PredicateFunction
 
 FieldPriority = str | List[str | Tuple[str, int]]
 
+# How the pages of a projection are worked out.
+#
+# - offset: the where clauses are sharded until each has at
+#   most `result_depth` results, and each is paged by offset.
+# - object_id: the object ids of the where clause are fetched
+#   first, and each page is a range of those ids.
+#
+PagingMode = Literal['offset', 'object_id']
+
 class IngestionTaskDescriptor:
     @dataclass(frozen=True)
     class Fetch:
@@ -20,6 +29,12 @@ class IngestionTaskDescriptor:
         projection: 'GisProjection'
         page_desc: 'FeaturePageDescription'
         df: gpd.GeoDataFrame
+        """
+        When set the `df` has already been prepared for this
+        query, which happens when it was decoded in another
+        process.
+        """
+        query: Optional[str] = field(default=None)
 
 @dataclass(frozen=True)
 class FeaturePageDescription:
@@ -28,6 +43,16 @@ class FeaturePageDescription:
     expected_results: int
     use_cache: bool
 
+    """
+    The where clauses of any other cached requests the page was
+    worked out from, such as the counts of shards merged into
+    this one, or the object ids the page is a range of. When
+    the results of the page go missing these are no longer
+    trusted either, so they're forgotten along with the page's
+    own clause.
+    """
+    derived_from: Tuple[str, ...] = field(default=())
+
 @dataclass(frozen=True)
 class SchemaField:
     category: str
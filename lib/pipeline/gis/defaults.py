@@ -29,8 +29,8 @@ BACKOFF_CONFIG = BackoffConfig(
 )
 
 HOST_SEMAPHORE_CONFIG = [
-    HostSemaphoreConfig(host=SPATIAL_NSW_HOST, limit=16),
-    HostSemaphoreConfig(host=ENVIRONMENT_NSW_HOST, limit=12),
+    HostSemaphoreConfig(host=SPATIAL_NSW_HOST, limit=16, adaptive=True, min_limit=4),
+    HostSemaphoreConfig(host=ENVIRONMENT_NSW_HOST, limit=12, adaptive=True, min_limit=2),
 ]
 
 SNSW_PROP_SCHEMA = GisSchema(
@@ -0,0 +1,78 @@
+import numpy
+import shapely
+from shapely import GeometryType
+from typing import Any, Dict, List, Optional, Sequence
+
+EsriGeometry = Optional[Dict[str, Any]]
+
+def esri_to_geometry_array(geometries: Sequence[EsriGeometry]) -> numpy.ndarray:
+    """
+    Converts a page of ESRI JSON geometries into an array of
+    shapely geometries, in a single vectorised call rather than
+    creating each geometry one at a time. Missing geometries end
+    up as `None`.
+
+    A page is assumed to only have one kind of geometry, which
+    is what a feature layer returns.
+
+      - `rings` become a Polygon, the first ring being the
+        exterior and the rest interiors.
+      - `paths` become a LineString when there is a single path
+        otherwise a MultiLineString.
+      - `x` and `y` become a Point.
+    """
+    kind = next((g for g in geometries if g), None)
+
+    if kind is None:
+        return numpy.full(len(geometries), None, dtype=object)
+    elif 'rings' in kind:
+        return _from_rings([(g or {}).get('rings') or [] for g in geometries])
+    elif 'paths' in kind:
+        return _from_paths([(g or {}).get('paths') or [] for g in geometries])
+    elif 'x' in kind:
+        return _from_points(geometries)
+    else:
+        raise ValueError(f'unknown esri geometry, {list(kind.keys())}')
+
+def _from_rings(features: List[List[List[List[float]]]]) -> numpy.ndarray:
+    part_counts = numpy.fromiter((len(rings) for rings in features), dtype=numpy.int64, count=len(features))
+    parts = [ring for rings in features for ring in rings]
+    coords, coord_offsets = _flatten_parts(parts)
+    part_offsets = _offsets(part_counts)
+    geoms = shapely.from_ragged_array(GeometryType.POLYGON, coords, (coord_offsets, part_offsets))
+    geoms[part_counts == 0] = None
+    return geoms
+
+def _from_paths(features: List[List[List[List[float]]]]) -> numpy.ndarray:
+    part_counts = numpy.fromiter((len(paths) for paths in features), dtype=numpy.int64, count=len(features))
+    parts = [path for paths in features for path in paths]
+    coords, coord_offsets = _flatten_parts(parts)
+    part_offsets = _offsets(part_counts)
+    geoms = shapely.from_ragged_array(GeometryType.MULTILINESTRING, coords, (coord_offsets, part_offsets))
+    single = part_counts == 1
+    geoms[single] = shapely.get_geometry(geoms[single], 0)
+    geoms[part_counts == 0] = None
+    return geoms
+
+def _from_points(features: Sequence[EsriGeometry]) -> numpy.ndarray:
+    xy = numpy.array([
+        (g.get('x'), g.get('y')) if g else (None, None)
+        for g in features
+    ], dtype=numpy.float64)
+    geoms = numpy.asarray(shapely.points(xy), dtype=object)
+    geoms[numpy.isnan(xy).any(axis=1)] = None
+    return geoms
+
+def _flatten_parts(parts: List[List[List[float]]]):
+    counts = numpy.fromiter((len(p) for p in parts), dtype=numpy.int64, count=len(parts))
+    if not parts or counts.sum() == 0:
+        return numpy.empty((0, 2), dtype=numpy.float64), _offsets(counts)
+
+    # ESRI may include z or m values, only x and y are kept.
+    coords = numpy.array([c[:2] for p in parts for c in p], dtype=numpy.float64)
+    return coords, _offsets(counts)
+
+def _offsets(counts: numpy.ndarray) -> numpy.ndarray:
+    offsets = numpy.zeros(len(counts) + 1, dtype=numpy.int64)
+    numpy.cumsum(counts, out=offsets[1:])
+    return offsets
@@ -3,12 +3,13 @@ from collections.abc import Callable
 from dataclasses import dataclass
 from logging import getLogger
 import random
-from typing import AsyncIterator, List, Optional, Self, Tuple, Sequence
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Self, Tuple, Sequence
 
-from lib.pipeline.gis.config import GisProjection, FeaturePageDescription
+from lib.pipeline.gis.config import GisProjection, FeaturePageDescription, PagingMode
 from lib.pipeline.gis.feature_server_client import FeatureServerClient
 from lib.pipeline.gis.predicate import PredicateFunction, PredicateParam
 
+from .shard_plan import ShardPlan
 from .telemetry import GisPipelineTelemetry
 
 class FeaturePaginationSharderFactory:
@@ -17,29 +18,62 @@ class FeaturePaginationSharderFactory:
         feature_server: FeatureServerClient,
         telemetry: GisPipelineTelemetry,
         shuffle: Callable[[List[PredicateParam]], None] = random.shuffle,
+        plan: Optional[ShardPlan] = None,
+        paging: PagingMode = 'offset',
     ) -> None:
         self._feature_server = feature_server
         self._telemetry = telemetry
         self._shuffle = shuffle
+        self._plan = plan
+        self._paging = paging
 
     def create(self: Self, proj: GisProjection):
-        return RequestSharder(proj, self._feature_server, self._telemetry, self._shuffle)
+        return RequestSharder(proj, self._feature_server, self._telemetry,
+                              self._shuffle, self._plan, self._paging)
 
 class RequestSharder:
+    """
+    When given a `ShardPlan`, the counts of any clause that can
+    be cached are read from (and recorded in) the plan, so only
+    counts of clauses that can't be cached are requested again.
+
+    With `object_id` paging, there's no recursive sharding, the
+    object ids of each shard of the first shard function are
+    fetched and every page is a range of those ids, rather than
+    an offset. Servers tend to get slower the deeper the offset,
+    so this keeps the time it takes to get each page flat.
+    """
     _logger = getLogger(f'{__name__}')
+    _planned: Dict[str, int]
+    _unplanned: List[Tuple[str, int]]
 
     def __init__(self: Self,
                  projection: GisProjection,
                  feature_server: FeatureServerClient,
                  telemetry: GisPipelineTelemetry,
-                 shuffle: Callable[[List[PredicateParam]], None]):
+                 shuffle: Callable[[List[PredicateParam]], None],
+                 plan: Optional[ShardPlan] = None,
+                 paging: PagingMode = 'offset'):
         self._projection = projection
         self._feature_server = feature_server
         self._telemetry = telemetry
         self._shuffle = shuffle
+        self._plan = plan
+        self._paging = paging
+        self._planned = {}
+        self._unplanned = []
 
     async def shard(self: Self, params: Sequence[PredicateParam]) -> AsyncIterator[FeaturePageDescription]:
         shard_scheme = self._projection.schema.shard_scheme
+        if self._paging == 'object_id':
+            async for c in self._object_id_pages(shard_scheme, params):
+                yield c
+            return
+
+        if self._plan is not None:
+            self._planned = self._plan.load(self._projection.partition_key())
+            self._logger.info(f'{len(self._planned)} planned counts for {self._projection.id}')
+
         async for c in self._recursive_shard(None, shard_scheme, params, use_cache=True):
             yield c
 
@@ -53,38 +87,49 @@ class RequestSharder:
         shard_f, *shard_fs = shard_functions
         shard_p, *shard_ps = params if params else [shard_f.default_param(where_clause)]
 
-        shard_count_queue = list(shard_p.shard())
+        # shards are kept with their siblings, so that siblings
+        # which are sparse can be merged back into one shard.
+        sibling_queue: List[List[PredicateParam]] = [list(shard_p.shard())]
         requires_extra_param = []
 
-        self._shuffle(shard_count_queue)
-        while shard_count_queue:
+        while sibling_queue:
+            shard_count_queue = [shard for siblings in sibling_queue for shard in siblings]
+            self._shuffle(shard_count_queue)
             counts = [
                 self._shard_count(shard_param, shard_f.field, use_cache)
                 for shard_param in shard_count_queue
             ]
 
-            shard_count_queue = []
-
-            for count, shard in await asyncio.gather(*counts):
-                query = shard.apply(shard_f.field)
-                _use_cache = use_cache and shard.can_cache()
-                if count == 0:
-                    continue
-                elif count <= depth:
-                    self._telemetry.init_clause(self._projection, query, count)
-                    for offset in range(0, count, limit):
-                        expected = min(limit, count - offset)
-                        yield FeaturePageDescription(
-                            where_clause=query,
-                            offset=offset,
-                            expected_results=expected,
-                            use_cache=_use_cache,
-                        )
-                elif shard.can_shard():
-                    shard_count_queue.extend(list(shard.shard()))
-                else:
-                    requires_extra_param.append(shard)
-            self._shuffle(shard_count_queue)
+            results = await asyncio.gather(*counts)
+            self._save_plan()
+            count_of = { id(shard): count for count, shard in results }
+
+            next_sibling_queue = []
+            for siblings in sibling_queue:
+                for shard, count, merged in merge_sparse_siblings(siblings, count_of, depth):
+                    query = shard.apply(shard_f.field)
+                    _use_cache = use_cache and shard.can_cache()
+                    # the count of a merged shard was never requested,
+                    # it's the sum of the counts of the shards in it.
+                    derived_from = tuple(m.apply(shard_f.field) for m in merged) if len(merged) > 1 else ()
+                    if count == 0:
+                        continue
+                    elif count <= depth:
+                        self._telemetry.init_clause(self._projection, query, count)
+                        for offset in range(0, count, limit):
+                            expected = min(limit, count - offset)
+                            yield FeaturePageDescription(
+                                where_clause=query,
+                                offset=offset,
+                                expected_results=expected,
+                                use_cache=_use_cache,
+                                derived_from=derived_from,
+                            )
+                    elif shard.can_shard():
+                        next_sibling_queue.append(list(shard.shard_for(count, depth)))
+                    else:
+                        requires_extra_param.append(shard)
+            sibling_queue = next_sibling_queue
         self._shuffle(requires_extra_param)
 
         for shard in requires_extra_param:
@@ -93,14 +138,103 @@ class RequestSharder:
             async for p in self._recursive_shard(query, shard_fs, shard_ps, use_cache=_use_cache):
                 yield p
 
+    async def _object_id_pages(self: Self,
+                               shard_functions: Sequence[PredicateFunction],
+                               params: Sequence[PredicateParam]) -> AsyncIterator[FeaturePageDescription]:
+        limit = self._projection.schema.result_limit
+        shard_f, *shard_fs = shard_functions
+        shard_p, *shard_ps = params if params else [shard_f.default_param(None)]
+
+        # any params for the other shard functions narrow
+        # down every shard, they're not sharded any further.
+        scope = ' AND '.join(p.apply(f.field) for f, p in zip(shard_fs, shard_ps))
+        shards = list(shard_p.shard()) if shard_p.can_shard() else [shard_p]
+        self._shuffle(shards)
+
+        async def get_ids(shard: PredicateParam):
+            clause = shard.apply(shard_f.field)
+            clause = f'{scope} AND {clause}' if scope else clause
+            use_cache = shard.can_cache() and all(p.can_cache() for p in shard_ps)
+            id_field, object_ids = await self._feature_server.get_object_ids(
+                projection=self._projection,
+                where_clause=clause,
+                use_cache=use_cache,
+            )
+            return clause, use_cache, id_field, object_ids
+
+        for clause, use_cache, id_field, object_ids in await asyncio.gather(*map(get_ids, shards)):
+            object_ids = sorted(object_ids)
+            for start in range(0, len(object_ids), limit):
+                page_ids = object_ids[start:start + limit]
+                query = f'{clause} AND {id_field} >= {page_ids[0]} AND {id_field} <= {page_ids[-1]}'
+                self._telemetry.init_clause(self._projection, query, len(page_ids))
+                yield FeaturePageDescription(
+                    where_clause=query,
+                    offset=0,
+                    expected_results=len(page_ids),
+                    use_cache=use_cache,
+                    # the ids are cached under the shard's clause.
+                    derived_from=(clause,),
+                )
+
     async def _shard_count(self: Self,
                            shard_param: PredicateParam,
                            field: str,
                            use_cache: bool) -> Tuple[int, PredicateParam]:
         where_clause = shard_param.apply(field)
         use_cache = use_cache and shard_param.can_cache()
-        return await self._feature_server.get_where_count(
+        if use_cache and where_clause in self._planned:
+            return self._planned[where_clause], shard_param
+
+        count = await self._feature_server.get_where_count(
             projection=self._projection,
             where_clause=where_clause,
             use_cache=use_cache,
-        ), shard_param
+        )
+        if use_cache and self._plan is not None:
+            self._planned[where_clause] = count
+            self._unplanned.append((where_clause, count))
+        return count, shard_param
+
+    def _save_plan(self: Self) -> None:
+        if self._plan is None or not self._unplanned:
+            return
+        self._plan.put_counts(self._projection.partition_key(), self._unplanned)
+        self._unplanned = []
+
+def merge_sparse_siblings(siblings: List[PredicateParam],
+                          count_of: Dict[int, int],
+                          depth: int) -> Iterator[Tuple[PredicateParam, int, List[PredicateParam]]]:
+    """
+    Merges adjacent siblings while their combined count is within
+    the depth, so a run of sparse shards becomes a single shard
+    which needs fewer page requests. Siblings over the depth are
+    left as is. `count_of` is the count of each sibling by its id.
+
+    Along with each shard and its count, this yields the siblings
+    that were merged into it (just the shard if it wasn't merged).
+    """
+    run: Optional[PredicateParam] = None
+    run_count = 0
+    run_members: List[PredicateParam] = []
+
+    for shard in siblings:
+        count = count_of[id(shard)]
+        merged = run.merge(shard) if run is not None and count <= depth else None
+
+        if merged is not None and run_count + count <= depth:
+            run, run_count = merged, run_count + count
+            run_members.append(shard)
+            continue
+
+        if run is not None:
+            yield run, run_count, run_members
+
+        if count > depth:
+            run, run_count, run_members = None, 0, []
+            yield shard, count, [shard]
+        else:
+            run, run_count, run_members = shard, count, [shard]
+
+    if run is not None:
+        yield run, run_count, run_members
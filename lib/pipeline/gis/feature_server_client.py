@@ -2,20 +2,22 @@ import asyncio
 from dataclasses import dataclass
 from logging import getLogger
 from pprint import pformat
-from typing import Any, Dict, Optional, Self, Set, List
+from typing import Any, Awaitable, Callable, Dict, Optional, Self, Set, List, Tuple
 from urllib.parse import urlencode
 
 from lib.service.clock import ClockService
 from lib.service.http import (
     AbstractClientSession,
+    AbstractGetResponse,
     HttpLocalCache,
+    loads_json,
     CacheHeader,
     url_with_params,
 )
 
 from .config import GisProjection, FeaturePageDescription
 from .cache_cleaner import AbstractCacheCleaner
-from .url import get_count_url_params, get_page_url_params
+from .url import get_count_url_params, get_object_ids_url_params, get_page_url_params
 
 @dataclass(frozen=True)
 class FeatureExpBackoff:
@@ -41,6 +43,19 @@ class FeatureServerClient:
             self: Self,
             projection: GisProjection,
             feature_page: FeaturePageDescription) -> List[Any]:
+        return await self.get_decoded_page(projection, feature_page, _decode_features)
+
+    async def get_decoded_page[T](
+            self: Self,
+            projection: GisProjection,
+            feature_page: FeaturePageDescription,
+            decode: Callable[[bytes], Awaitable[Tuple[int, T]]]) -> T:
+        """
+        Same as `get_page` except the decoding of the response body
+        is left to `decode`, which returns the number of features
+        in the page along with the decoded page. This allows the
+        decoding to happen somewhere else (like another process).
+        """
         try:
             url_params = get_page_url_params(
                 feature_page.offset,
@@ -49,15 +64,15 @@ class FeatureServerClient:
 
             allowed_attempts = self.exp_backoff_cfg.allowed_attempts
             while allowed_attempts > 0:
-                data = await self.get_json(
+                data = await self.get_bytes(
                     projection.schema.url,
                     params=url_params,
                     partition=projection.partition_key(),
                     use_cache=feature_page.use_cache,
                     cache_name='page')
 
-                features = data.get('features', [])
-                if len(features) < feature_page.expected_results:
+                count, page = await decode(data)
+                if count < feature_page.expected_results:
                     attempt = self.exp_backoff_cfg.allowed_attempts - allowed_attempts
                     allowed_attempts -= 1
 
@@ -70,14 +85,14 @@ class FeatureServerClient:
             self._logger.error(f'failed on task {feature_page}')
             raise GisTaskNetworkError(feature_page, e.http_status, e.response)
 
-        if len(features) < feature_page.expected_results:
-            self._logger.error(f"Potenial data loss has occured, response:\n{pformat(data)}")
+        if count < feature_page.expected_results:
+            self._logger.error(f"Potenial data loss has occured, response:\n{data.decode(errors='replace')}")
             await self._cache_cleaner.forget_partition_cache(projection, feature_page)
             raise MissingResultsError(
                 f'{feature_page.where_clause} OFFSET {feature_page.offset}, '
-                f'got {len(features)} wanted {feature_page.expected_results}')
+                f'got {count} wanted {feature_page.expected_results}')
 
-        return features
+        return page
 
     async def get_where_count(self: Self,
                               projection: GisProjection,
@@ -94,12 +109,52 @@ class FeatureServerClient:
         self._logger.debug(f'count for "{where_clause}" is {count}')
         return count
 
+    async def get_object_ids(self: Self,
+                             projection: GisProjection,
+                             where_clause: Optional[str],
+                             use_cache: bool) -> Tuple[str, List[int]]:
+        """
+        The name of the object id field, and the object ids of
+        every feature matching the where clause. Unlike pages,
+        this isn't capped by the max record count of the server.
+        """
+        response = await self.get_json(
+            projection.schema.url,
+            get_object_ids_url_params(where_clause),
+            partition=projection.partition_key(),
+            use_cache=use_cache,
+            cache_name='ids',
+        )
+        id_field = response.get('objectIdFieldName') or projection.schema.id_field
+        object_ids = response.get('objectIds') or []
+        self._logger.debug(f'{len(object_ids)} object ids for "{where_clause}"')
+        return id_field, object_ids
+
     async def get_json(self: Self,
                        feature_url: str,
                        params: Dict[str, Any],
                        use_cache: bool,
                        partition: str,
-                       cache_name=None):
+                       cache_name: str):
+        return await self._get(feature_url, params, use_cache, partition, cache_name,
+                               lambda response: response.json())
+
+    async def get_bytes(self: Self,
+                        feature_url: str,
+                        params: Dict[str, Any],
+                        use_cache: bool,
+                        partition: str,
+                        cache_name: str) -> bytes:
+        return await self._get(feature_url, params, use_cache, partition, cache_name,
+                               lambda response: response.read())
+
+    async def _get[T](self: Self,
+                      feature_url: str,
+                      params: Dict[str, Any],
+                      use_cache: bool,
+                      partition: str,
+                      cache_name: str,
+                      read: Callable[[AbstractGetResponse], Awaitable[T]]) -> T:
         url = url_with_params(f'{feature_url}/query', params)
         try:
             async with self._session.get(url, headers={
@@ -112,13 +167,17 @@ class FeatureServerClient:
                     self._logger.error(f"Crashed at {url}")
                     self._logger.error(response)
                     raise GisNetworkError(response.status, response)
-                return await response.json()
+                return await read(response)
         except asyncio.CancelledError:
             raise
         except:
             self._logger.error(f'failed on {url}')
             raise
 
+async def _decode_features(data: bytes) -> Tuple[int, List[Any]]:
+    features = loads_json(data).get('features', [])
+    return len(features), features
+
 class GisNetworkError(Exception):
     def __init__(self: Self, http_status, response, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -1,16 +1,17 @@
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import geopandas as gpd
 import numpy
 import pandas as pd
 import warnings
 from logging import getLogger
-from shapely.geometry import shape
 from typing import Any, Dict, List, Literal, Self, Set, Tuple, Optional
 
 from lib.service.database import DatabaseService, PgClientException, log_exception_info_df
-from lib.utility.df import prepare_postgis_insert, FieldFormat, fmt_head
+from lib.service.http import loads_json
+from lib.utility.df import prepare_postgis_copy, prepare_postgis_insert, FieldFormat, fmt_head
 
 from .config import (
     GisProjection,
@@ -18,10 +19,11 @@ from .config import (
     FeaturePageDescription,
 )
 from .cache_cleaner import AbstractCacheCleaner
+from .esri import esri_to_geometry_array
 from .feature_server_client import FeatureServerClient
 from .telemetry import GisPipelineTelemetry
 
-GisWorkerDbMode = Literal['write', 'print_head_then_quit', 'skip']
+GisWorkerDbMode = Literal['write', 'copy', 'print_head_then_quit', 'skip']
 
 @dataclass(frozen=True)
 class GisIngestionConfig:
@@ -30,6 +32,12 @@ class GisIngestionConfig:
     db_mode: GisWorkerDbMode
     db_workers: int
     chunk_size: Optional[int]
+    """
+    When set, the decoding of pages and preparing them for
+    the database happens in a process pool of this size, so
+    it does not compete with the api and db workers.
+    """
+    decode_workers: Optional[int] = field(default=None)
 
 class GisIngestion:
     """
@@ -51,11 +59,13 @@ class GisIngestion:
                  db: DatabaseService,
                  telemetry: GisPipelineTelemetry,
                  cache_cleaner: AbstractCacheCleaner,
-                 save_queue: asyncio.Queue[IngestionTaskDescriptor.Save]):
+                 save_queue: asyncio.Queue[IngestionTaskDescriptor.Save],
+                 decode_pool: Optional[ProcessPoolExecutor]):
         self.config = config
         self._db = db
         self._telemetry = telemetry
         self._bg_ts = set()
+        self._decode_pool = decode_pool
 
         self._cache_cleaner = cache_cleaner
         self._feature_server = feature_server
@@ -72,8 +82,11 @@ class GisIngestion:
         # pressure to limit how much ends up getting queued
         save_queue = asyncio.Queue[IngestionTaskDescriptor.Save](
             maxsize=config.api_worker_backpressure)
+        decode_pool = ProcessPoolExecutor(config.decode_workers) \
+            if config.decode_workers else None
         return GisIngestion(config, feature_server, db,
-                            telemetry, cache_cleaner, save_queue)
+                            telemetry, cache_cleaner, save_queue,
+                            decode_pool)
 
     def stop(self: Self):
         self._stopped = True
@@ -81,6 +94,12 @@ class GisIngestion:
             if not t.done():
                 t.cancel()
         self._bg_ts = set()
+        self._shutdown_decode_pool()
+
+    def _shutdown_decode_pool(self: Self):
+        if self._decode_pool is not None:
+            self._decode_pool.shutdown(wait=False, cancel_futures=True)
+            self._decode_pool = None
 
     def queue_page(self: Self, t_desc: IngestionTaskDescriptor.Fetch) -> None:
         self._bg_ts.add(asyncio.create_task(self._fetch_queue.put(t_desc)))
@@ -114,16 +133,38 @@ class GisIngestion:
         except Exception as e:
             self.stop()
             raise e
+        finally:
+            self._shutdown_decode_pool()
 
     async def _fetch(self: Self, t_desc_fetch: IngestionTaskDescriptor.Fetch):
         projection, page_desc = t_desc_fetch.projection, t_desc_fetch.page_desc
         self._telemetry.record_fetch_start(t_desc_fetch)
-        page = await self._feature_server.get_page(projection, page_desc)
-        self._telemetry.record_fetch_end(t_desc_fetch, len(page))
-        t_desc_save = IngestionTaskDescriptor.Save(
-            projection, page_desc, build_df(projection, page))
+
+        if self._decode_pool is None:
+            page = await self._feature_server.get_page(projection, page_desc)
+            df, query = build_df(projection, page), None
+        else:
+            df, query = await self._feature_server.get_decoded_page(
+                projection, page_desc, self._decode_in_pool(self._decode_pool, projection, page_desc))
+
+        self._telemetry.record_fetch_end(t_desc_fetch, len(df))
+        t_desc_save = IngestionTaskDescriptor.Save(projection, page_desc, df, query)
         await self._save_queue.put(t_desc_save)
-        self._telemetry.record_save_queue(t_desc_save, len(page))
+        self._telemetry.record_save_queue(t_desc_save, len(df))
+
+    def _decode_in_pool(self: Self,
+                        pool: ProcessPoolExecutor,
+                        proj: GisProjection,
+                        page_desc: FeaturePageDescription):
+        # the pool is captured rather than read from `self` when
+        # decoding, as it's unset on shutdown and passing `None`
+        # to `run_in_executor` would use the default executor.
+        async def decode(data: bytes) -> Tuple[int, Tuple[pd.DataFrame, Optional[str]]]:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                pool, decode_page, proj, page_desc,
+                self.config.db_mode, data)
+        return decode
 
     async def _save(self: Self, t_desc: IngestionTaskDescriptor.Save):
         self._telemetry.record_save_start(t_desc, len(t_desc.df))
@@ -144,7 +185,8 @@ class GisIngestion:
             case 'skip':
                 pass
             case 'write':
-                df_copy, query = prepare_query(db_relation, proj, df)
+                df_copy, query = (df, t_desc.query) if t_desc.query \
+                    else prepare_query(db_relation, proj, df)
                 async with self._db.async_connect() as conn:
                     async with conn.cursor() as cur:
                         slice, rows = [], df_copy.to_records(index=False).tolist()
@@ -162,6 +204,25 @@ class GisIngestion:
                             await self._cache_cleaner.forget_page_cache(proj, page_desc)
                             raise e
                     await conn.commit()
+            case 'copy':
+                df_copy, query = (df, t_desc.query) if t_desc.query \
+                    else prepare_copy(db_relation, proj, df)
+                async with self._db.async_connect() as conn:
+                    async with conn.cursor() as cur:
+                        rows = df_copy.to_records(index=False).tolist()
+                        try:
+                            async with cur.copy(query) as copy:
+                                for row in rows:
+                                    await copy.write_row(row)
+                        except PgClientException as e:
+                            self.stop()
+                            log_exception_info_df(df_copy, self._logger, e)
+                            await self._cache_cleaner.forget_page_cache(proj, page_desc)
+                            raise e
+                        except Exception as e:
+                            await self._cache_cleaner.forget_page_cache(proj, page_desc)
+                            raise e
+                    await conn.commit()
         self._telemetry.record_save_end(t_desc, len(t_desc.df))
         t_desc.df.drop(t_desc.df.index, inplace=True)
 
@@ -198,13 +259,7 @@ def prepare_query(db_relation: str, p: GisProjection, df: gpd.GeoDataFrame) -> T
         return prepare_postgis_insert(df,
             relation=db_relation,
             epsg_crs=p.epsg_crs,
-            column_formats={
-                'geometry': 'geometry',
-                **({
-                    (f.rename or f.name): f.format
-                    for f in p.get_fields() if f.format
-                })
-            },
+            column_formats=get_column_formats(p),
             clone=True,
         )
     except:
@@ -212,29 +267,63 @@ def prepare_query(db_relation: str, p: GisProjection, df: gpd.GeoDataFrame) -> T
         _logger.error(pformat(p))
         raise
 
-def build_df(proj: GisProjection, page: List[Any]) -> gpd.GeoDataFrame:
-    components: List[Tuple[Any, Dict[str, Any]]] = []
-
-    for feature in page:
-        obj_id = feature['attributes'][proj.schema.id_field]
-
-        geometry = feature['geometry']
-        if 'rings' in geometry:
-            geom = shape({"type": "Polygon", "coordinates": geometry['rings']})
-        elif 'paths' in geometry:
-            geom = shape({"type": "LineString", "coordinates": geometry['paths']})
-        else:
-            geom = shape(geometry)
+def prepare_copy(db_relation: str, p: GisProjection, df: gpd.GeoDataFrame) -> Tuple[gpd.GeoDataFrame, str]:
+    try:
+        return prepare_postgis_copy(df,
+            relation=db_relation,
+            epsg_crs=p.epsg_crs,
+            column_formats=get_column_formats(p),
+            clone=True,
+        )
+    except:
+        from pprint import pformat
+        _logger.error(pformat(p))
+        raise
 
-        components.append((geom, feature['attributes']))
+def get_column_formats(p: GisProjection) -> _Formats:
+    return {
+        'geometry': 'geometry',
+        **({
+            (f.rename or f.name): f.format
+            for f in p.get_fields() if f.format
+        })
+    }
+
+def decode_page(proj: GisProjection,
+                page_desc: FeaturePageDescription,
+                db_mode: GisWorkerDbMode,
+                data: bytes) -> Tuple[int, Tuple[pd.DataFrame, Optional[str]]]:
+    """
+    Runs in the decode pool, it turns the raw response into a
+    dataframe that is ready for `_save` to write to the database.
+    """
+    features = loads_json(data).get('features', [])
+    if len(features) < page_desc.expected_results:
+        return len(features), (gpd.GeoDataFrame(), None)
+
+    df = build_df(proj, features)
+    match (db_mode, proj.schema.db_relation):
+        case ('write', str(db_relation)):
+            df, query = prepare_query(db_relation, proj, df)
+            return len(features), (pd.DataFrame(df), query)
+        case ('copy', str(db_relation)):
+            df, query = prepare_copy(db_relation, proj, df)
+            return len(features), (pd.DataFrame(df), query)
+        case _:
+            return len(features), (df, None)
 
-    if not components:
+def build_df(proj: GisProjection, page: List[Any]) -> gpd.GeoDataFrame:
+    if not page:
         return gpd.GeoDataFrame()
 
-    geometries, attributes = [list(c) for c in zip(*components)]
+    attributes = [feature['attributes'] for feature in page]
+    columns = list(attributes[0].keys())
+    if proj.schema.id_field not in columns:
+        raise KeyError(proj.schema.id_field)
+
     return gpd.GeoDataFrame(
-        attributes,
-        geometry=geometries,
+        { c: [a.get(c) for a in attributes] for c in columns },
+        geometry=esri_to_geometry_array([f.get('geometry') for f in page]),
         crs=f"EPSG:{proj.epsg_crs}",
     ).rename(columns={
         f.name: f.rename
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Iterator, Self
+from typing import Iterator, Optional, Self
 
 @dataclass
 class PredicateFunction:
@@ -26,6 +26,21 @@ class PredicateParam:
     def shard(self) -> Iterator[Self]:
         raise NotImplementedError()
 
+    def shard_for(self, count: int, depth: int) -> Iterator[Self]:
+        """
+        Shards the param knowing it has `count` results, and a
+        shard can have at most `depth` results. By default this
+        is no different from `shard`.
+        """
+        return self.shard()
+
+    def merge(self, other: Self) -> Optional[Self]:
+        """
+        Combines this param with `other` when `other` is the range
+        directly after this one, otherwise `None`.
+        """
+        return None
+
     def can_cache(self) -> bool:
         raise NotImplementedError()
 
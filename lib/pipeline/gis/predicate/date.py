@@ -1,16 +1,16 @@
 import calendar
 from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta
-from typing import Tuple, Iterator
+from typing import Callable, List, Optional, Tuple, Iterator
 
-from lib.service.clock import ClockService
+from lib.service.clock import AbstractClockService, ClockService
 
 from .base import PredicateFunction, PredicateParam
 
 
 @dataclass
 class DateRangeParamFactory:
-    clock: ClockService = field(repr=False)
+    clock: AbstractClockService = field(repr=False)
     def create(self, start: 'YearMonth', end: 'YearMonth', scope: str) -> 'DateRangeParam':
         return DateRangeParam(start, end, scope=scope, clock=self.clock)
 
@@ -41,9 +41,9 @@ class DatePredicateFunction(PredicateFunction):
 class DateRangeParam(PredicateParam):
     start: 'YearMonth'
     end: 'YearMonth'
-    _clock: ClockService = field(repr=False)
+    _clock: AbstractClockService = field(repr=False)
 
-    def __init__(self, start, end, clock: ClockService, scope=None):
+    def __init__(self, start, end, clock: AbstractClockService, scope=None):
         super().__init__('date', scope=scope)
         self.start = start
         self.end = end
@@ -60,16 +60,55 @@ class DateRangeParam(PredicateParam):
         return today > self.end
 
     def shard(self) -> Iterator['DateRangeParam']:
+        yield from self._shard_at(self._natural_level())
+
+    def shard_for(self, count: int, depth: int) -> Iterator['DateRangeParam']:
+        """
+        If shards at the usual level would still average more than
+        `_DENSE_FACTOR` times the depth, all of them would most likely
+        need sharding again, so the counts of that level are skipped
+        by sharding at a finer level. Shards can't go finer than a
+        month, as days are only sharded within a single month.
+        """
+        level = self._natural_level()
+        shards = list(self._shard_at(level))
+        while level < _MONTH_LEVEL and shards and count / len(shards) > depth * _DENSE_FACTOR:
+            level += 1
+            shards = list(self._shard_at(level))
+        yield from shards
+
+    def merge(self, other: 'DateRangeParam') -> Optional['DateRangeParam']:
+        if not isinstance(other, DateRangeParam) \
+                or self.scope != other.scope \
+                or self.end != other.start:
+            return None
+        return self._scoped(self.start, other.end)
+
+    def _natural_level(self) -> int:
         if self.end > self.start.next_year(n=100):
+            return _CENTURY_LEVEL
+        elif self.end > self.start.next_year(n=5):
+            return _5_YEAR_LEVEL
+        elif self.end > self.start.next_year():
+            return _YEAR_LEVEL
+        elif self.end > self.start.next_month():
+            return _MONTH_LEVEL
+        else:
+            return _DAY_LEVEL
+
+    def _shard_at(self, level: int) -> Iterator['DateRangeParam']:
+        iterator: Iterator[YearMonth]
+        next_date: Callable[[YearMonth], YearMonth]
+        if level == _CENTURY_LEVEL:
             iterator = self.start.years_between(self.end, n=100)
             next_date = lambda d: d.next_year(n=100).min(self.end)
-        elif self.end > self.start.next_year(n=5):
+        elif level == _5_YEAR_LEVEL:
             iterator = self.start.years_between(self.end, n=5)
             next_date = lambda d: d.next_year(n=5).min(self.end)
-        elif self.end > self.start.next_year():
+        elif level == _YEAR_LEVEL:
             iterator = self.start.years_between(self.end)
             next_date = lambda d: d.next_year()
-        elif self.end > self.start.next_month():
+        elif level == _MONTH_LEVEL:
             iterator = self.start.months_between(self.end)
             next_date = lambda d: d.next_month()
         else:
@@ -94,6 +133,12 @@ class DateRangeParam(PredicateParam):
            and self.end == other.end \
            and self.scope == other.scope
 
+_CENTURY_LEVEL, _5_YEAR_LEVEL, _YEAR_LEVEL, _MONTH_LEVEL, _DAY_LEVEL = range(5)
+
+# How many times over the depth shards need to be, before
+# `shard_for` decides to skip a level of sharding.
+_DENSE_FACTOR = 4
+
 @dataclass
 class YearMonth:
     year: int
@@ -1,7 +1,7 @@
 from dataclasses import dataclass, field
 import math
 from itertools import chain
-from typing import Tuple, Iterator, List
+from typing import Optional, Tuple, Iterator, List
 
 from .base import PredicateFunction, PredicateParam
 
@@ -43,7 +43,27 @@ class FloatRangeParam(PredicateParam):
         return True
 
     def shard(self) -> Iterator['FloatRangeParam']:
-        n = 12
+        yield from self._shard_into(_MAX_PIECES)
+
+    def shard_for(self, count: int, depth: int) -> Iterator['FloatRangeParam']:
+        """
+        Rather than always splitting into the same number of
+        pieces, a range just over the depth is split into a
+        few pieces, while a much denser range is split into
+        more pieces (upto the usual number).
+        """
+        pieces = math.ceil(count / depth) * 2 if depth > 0 else _MAX_PIECES
+        yield from self._shard_into(min(max(pieces, 2), _MAX_PIECES))
+
+    def merge(self, other: 'FloatRangeParam') -> Optional['FloatRangeParam']:
+        if not isinstance(other, FloatRangeParam) \
+                or self.scope != other.scope \
+                or self.end != other.start:
+            return None
+        return self._scoped(self.start, other.end)
+
+    def _shard_into(self, pieces: int) -> Iterator['FloatRangeParam']:
+        n = pieces + 1
         ls = math.log10(self.start) if self.start > 0 else 0.0
         le = math.log10(self.end)
         step = (le - ls) / (n - 1)
@@ -61,6 +81,8 @@ class FloatRangeParam(PredicateParam):
             yield self._scoped(last, item)
             last = item
 
+_MAX_PIECES = 11
+
 def round_items(ls: Iterator[float]) -> Iterator[float]:
     def minimal_rounding(item, last):
         n = 0
@@ -70,3 +70,16 @@ class DateRangeParamTestCase(unittest.TestCase):
             y301_apart._scoped(YM(1200, 1), YM(1300, 1)),
             y301_apart._scoped(YM(1300, 1), YM(1301, 1)),
         ])
+
+    def test_shard_for_skips_dense_levels(self):
+        y10_apart = DateRangeParam(YM(2000, 1), YM(2010, 1), self.mock_clock)
+        self.assertEqual(len(list(y10_apart.shard_for(40, 20))), 2)
+        self.assertEqual(len(list(y10_apart.shard_for(10000, 20))), 120)
+
+    def test_merge(self):
+        a = DateRangeParam(YM(2010, 1), YM(2010, 2), self.mock_clock)
+        b = DateRangeParam(YM(2010, 2), YM(2010, 3), self.mock_clock)
+        c = DateRangeParam(YM(2010, 4), YM(2010, 5), self.mock_clock)
+        self.assertEqual(a.merge(b), DateRangeParam(YM(2010, 1), YM(2010, 3), self.mock_clock))
+        self.assertIsNone(a.merge(c))
+        self.assertIsNone(b.merge(a))
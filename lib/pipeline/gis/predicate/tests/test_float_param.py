@@ -71,3 +71,14 @@ class FloatParamTestCase(unittest.TestCase):
             FloatRangeParam(2.4, 2.55555),
         ])
 
+
+    def test_shard_for(self):
+        param = FloatRangeParam(100, 200)
+        self.assertEqual(len(list(param.shard_for(25, 20))), 4)
+        self.assertEqual(len(list(param.shard_for(1000, 20))), 11)
+
+    def test_merge(self):
+        a = FloatRangeParam(100.0, 106.0)
+        b = FloatRangeParam(106.0, 113.0)
+        self.assertEqual(a.merge(b), FloatRangeParam(100.0, 113.0))
+        self.assertIsNone(b.merge(a))
@@ -0,0 +1,63 @@
+import sqlite3
+from typing import Dict, List, Self, Tuple
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS shard_count (
+      partition TEXT NOT NULL,
+      clause TEXT NOT NULL,
+      count INTEGER NOT NULL,
+      PRIMARY KEY (partition, clause)
+    )
+    """,
+]
+
+class ShardPlan:
+    """
+    The counts of each where clause the sharder has resolved,
+    stored by the partition of the projection. This allows the
+    sharder to work out the pages of a projection without making
+    the same count requests each time it runs.
+
+    Only the counts of clauses which can be cached should be
+    stored here, as the counts of open ended ranges will change.
+    """
+
+    def __init__(self: Self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    @staticmethod
+    def open(path: str) -> 'ShardPlan':
+        conn = sqlite3.connect(path, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        return ShardPlan(conn)
+
+    def close(self: Self) -> None:
+        self._conn.close()
+
+    def load(self: Self, partition: str) -> Dict[str, int]:
+        rows = self._conn.execute(
+            'SELECT clause, count FROM shard_count WHERE partition = ?',
+            (partition,))
+        return { clause: count for clause, count in rows }
+
+    def put_counts(self: Self, partition: str, counts: List[Tuple[str, int]]) -> None:
+        if not counts:
+            return
+        self._conn.execute('BEGIN')
+        try:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO shard_count (partition, clause, count) VALUES (?, ?, ?)',
+                ((partition, clause, count) for clause, count in counts))
+        except:
+            self._conn.execute('ROLLBACK')
+            raise
+        self._conn.execute('COMMIT')
+
+    def forget(self: Self, partition: str, clause: str) -> None:
+        self._conn.execute(
+            'DELETE FROM shard_count WHERE partition = ? AND clause = ?',
+            (partition, clause))
@@ -1,19 +1,18 @@
 from dataclasses import dataclass, field
-from functools import reduce
 from logging import getLogger
 import math
 from pprint import pformat
 from typing import Self, Optional, List, Tuple, Dict
 
-from lib.service.clock import ClockService
-from lib.utility.format import fmt_time_elapsed
+from lib.service.clock import AbstractClockService
+from lib.utility.sampling import AbstractSample, Sampler, SamplingConfig
 from .config import GisProjection, IngestionTaskDescriptor
 
 def _p(a, b):
     return ((a/b) if b > 0 else 0) * 100.0
 
 @dataclass
-class ShardStatistics:
+class ShardStatistics(AbstractSample):
     """
     These are statistics relating to progress of ingesting the contents of
     scraped data. Each step in the ingestion is tracked to identify if
@@ -24,16 +23,24 @@ class ShardStatistics:
     The total state of the pipeline can be gathered from adding all
     of the different steps in the pipeline together.
     """
-    shard_size: int
-    fetch_started: int
-    fetch_completed: int
-    save_queued: int
-    save_started: int
-    save_completed: int
+    # these are counts, but they're floats when averaged by the sampler.
+    shard_size: float
+    fetch_started: float
+    fetch_completed: float
+    save_queued: float
+    save_started: float
+    save_completed: float
+
+    @classmethod
+    def empty(cls):
+        return ShardStatistics(0, 0, 0, 0, 0, 0)
 
     def finished(self) -> bool:
         return self.shard_size == self.save_completed
 
+    def __str__(self: Self) -> str:
+        return f'{self.count()}\n{self.chain()}'
+
     def __add__(self, other: 'ShardStatistics') -> 'ShardStatistics':
         return ShardStatistics(
             shard_size=self.shard_size + other.shard_size,
@@ -44,6 +51,28 @@ class ShardStatistics:
             save_completed=self.save_completed + other.save_completed,
         )
 
+    def __sub__(self, other: 'ShardStatistics') -> 'ShardStatistics':
+        return ShardStatistics(
+            shard_size=self.shard_size - other.shard_size,
+            fetch_started=self.fetch_started - other.fetch_started,
+            fetch_completed=self.fetch_completed - other.fetch_completed,
+            save_queued=self.save_queued - other.save_queued,
+            save_started=self.save_started - other.save_started,
+            save_completed=self.save_completed - other.save_completed,
+        )
+
+    def __truediv__(self, other) -> 'ShardStatistics':
+        if not isinstance(other, float):
+            raise TypeError(f'cannot divide ShardStatistics by {type(other)}')
+        return ShardStatistics(
+            shard_size=self.shard_size / other,
+            fetch_started=self.fetch_started / other,
+            fetch_completed=self.fetch_completed / other,
+            save_queued=self.save_queued / other,
+            save_started=self.save_started / other,
+            save_completed=self.save_completed / other,
+        )
+
     def chain(self) -> str:
         a_n = self.shard_size - self.fetch_started
         b_n = self.fetch_started - self.fetch_completed
@@ -68,80 +97,87 @@ class GisPipelineTelemetry:
     """
     This mostly exist for the purpose of tracking progress within the
     ingestion pipeline.
+
+    The total across every shard is kept as a running total, updated
+    with the change from each event, as there can be many thousands
+    of shards. The progress is logged by a sampler, so it's only
+    logged at most once per `min_sample_delta`.
     """
 
     _logger = getLogger(__name__)
     _state_map: _StateMap
-    _clock: ClockService
-
-    """
-    Total State is cached in order provide fast access.
-    """
-    total_state: ShardStatistics
+    _clock: AbstractClockService
+    _sampler: Sampler[ShardStatistics]
 
     def __init__(self: Self,
-                 clock: ClockService,
-                 start_time: float,
+                 clock: AbstractClockService,
+                 sampler: Sampler[ShardStatistics],
                  state_map: Optional[_StateMap]):
         self._clock = clock
-        self._start_time = start_time
+        self._sampler = sampler
         self._state_map = state_map or {}
-        self.state = ShardStatistics(0, 0, 0, 0, 0, 0)
 
     @staticmethod
-    def create(clock: ClockService) -> 'GisPipelineTelemetry':
-        start_time: float = clock.time()
-        return GisPipelineTelemetry(clock, start_time, None)
+    def create(clock: AbstractClockService,
+               config: Optional[SamplingConfig] = None) -> 'GisPipelineTelemetry':
+        sampler = Sampler[ShardStatistics].create(
+            clock,
+            config or SamplingConfig(),
+            getLogger(f'{__name__}.progress'),
+            ShardStatistics.empty(),
+        )
+        return GisPipelineTelemetry(clock, sampler, None)
+
+    @property
+    def total_state(self: Self) -> ShardStatistics:
+        return self._sampler.state
 
     def init_clause(self: Self, p: GisProjection, clause: str, count):
         if p.id not in self._state_map:
             self._state_map[p.id] = {}
-        self._state_map[p.id][clause] = ShardStatistics(count, 0, 0, 0, 0, 0)
-        self._log_status(event="Fetch Queue")
+        p_map = self._state_map[p.id]
+        state = ShardStatistics(count, 0, 0, 0, 0, 0)
+        delta = state - p_map[clause] if clause in p_map else state
+        p_map[clause] = state
+        self._count(delta)
 
     def record_fetch_start(self, t_desc: IngestionTaskDescriptor.Fetch):
         state = self._state_map[t_desc.projection.id][t_desc.page_desc.where_clause]
-        state.fetch_started += t_desc.page_desc.expected_results
-        self._log_status(event="Fetch Start")
+        amount = t_desc.page_desc.expected_results
+        state.fetch_started += amount
+        self._count(ShardStatistics(0, amount, 0, 0, 0, 0))
 
     def record_fetch_end(self, t_desc: IngestionTaskDescriptor.Fetch, amount: int):
         state = self._state_map[t_desc.projection.id][t_desc.page_desc.where_clause]
         state.fetch_completed += amount
-        self._log_status(event="Fetch End")
+        self._count(ShardStatistics(0, 0, amount, 0, 0, 0))
 
     def record_save_queue(self, t_desc: IngestionTaskDescriptor.Save, amount: int):
         state = self._state_map[t_desc.projection.id][t_desc.page_desc.where_clause]
         state.save_queued += amount
-        self._log_status(event="Save Queue")
+        self._count(ShardStatistics(0, 0, 0, amount, 0, 0))
 
     def record_save_start(self, t_desc: IngestionTaskDescriptor.Save, amount: int):
         state = self._state_map[t_desc.projection.id][t_desc.page_desc.where_clause]
         state.save_started += amount
-        self._log_status(event="Save Start")
+        self._count(ShardStatistics(0, 0, 0, 0, amount, 0))
 
     def record_save_end(self, t_desc: IngestionTaskDescriptor.Save, amount: int):
         state = self._state_map[t_desc.projection.id][t_desc.page_desc.where_clause]
         state.save_completed += amount
-        self._log_status(event="Save Done")
+        self._count(ShardStatistics(0, 0, 0, 0, 0, amount))
 
     def record_save_skip(self, t_desc: IngestionTaskDescriptor.Save, amount: int):
         state = self._state_map[t_desc.projection.id][t_desc.page_desc.where_clause]
         state.save_completed += amount
-        self._log_status(event="Save Skip")
+        self._count(ShardStatistics(0, 0, 0, 0, 0, amount))
 
     def get_state(self, p: GisProjection, clause: str) -> ShardStatistics:
         return self._state_map[p.id][clause]
 
     def get_total(self) -> ShardStatistics:
-        return reduce(lambda a, b: a + b, [
-            shard_state
-            for p_map in self._state_map.values()
-            for shard_state in p_map.values()
-        ])
-
-    def _log_status(self: Self, event: str):
-        total = self.get_total()
-        t = fmt_time_elapsed(self._start_time, self._clock.time(), 'hms')
-        self.total_state = total
-        self._logger.info(f"{event.rjust(11)} ({t}) " \
-                          f"{total.count()}\n{total.chain()}")
+        return self._sampler.state
+
+    def _count(self: Self, delta: ShardStatistics):
+        self._sampler.count(delta)
+        self._sampler.log_if_necessary()
@@ -0,0 +1,46 @@
+import pytest
+from shapely.geometry import LineString, MultiLineString, Point, Polygon
+
+from ..esri import esri_to_geometry_array
+
+square = [[0.0, 0.0], [0.0, 4.0], [4.0, 4.0], [4.0, 0.0], [0.0, 0.0]]
+hole = [[1.0, 1.0], [2.0, 1.0], [2.0, 2.0], [1.0, 1.0]]
+
+def test_rings() -> None:
+    geoms = esri_to_geometry_array([
+        {'rings': [square]},
+        None,
+        {'rings': [square, hole]},
+    ])
+    assert list(geoms) == [
+        Polygon(square),
+        None,
+        Polygon(square, [hole]),
+    ]
+
+def test_paths() -> None:
+    geoms = esri_to_geometry_array([
+        {'paths': [square]},
+        {'paths': [square, hole]},
+        {'paths': []},
+    ])
+    assert list(geoms) == [
+        LineString(square),
+        MultiLineString([square, hole]),
+        None,
+    ]
+
+def test_points() -> None:
+    geoms = esri_to_geometry_array([{'x': 1.0, 'y': 2.0}, {'x': 'NaN', 'y': 'NaN'}, None])
+    assert list(geoms) == [Point(1, 2), None, None]
+
+def test_drops_z_values() -> None:
+    geoms = esri_to_geometry_array([{'rings': [[[*c, 9.0] for c in square]]}])
+    assert list(geoms) == [Polygon(square)]
+
+def test_empty_page() -> None:
+    assert list(esri_to_geometry_array([None, None])) == [None, None]
+
+def test_unknown_geometry() -> None:
+    with pytest.raises(ValueError):
+        esri_to_geometry_array([{'curveRings': []}])
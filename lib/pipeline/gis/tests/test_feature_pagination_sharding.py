@@ -0,0 +1,184 @@
+from dataclasses import replace
+from datetime import datetime
+from typing import Optional
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, MagicMock
+from urllib.parse import urlencode
+
+from lib.service.clock.mocks import MockClockService
+from lib.service.http.middleware.cache import HttpLocalCache
+
+from ..cache_cleaner import CacheCleaner
+from ..feature_pagination_sharding import FeaturePaginationSharderFactory
+from ..feature_server_client import FeatureServerClient
+from ..predicate import DatePredicateFunction, FloatPredicateFunction
+from ..predicate.date import DateRangeParamFactory
+from ..shard_plan import ShardPlan
+from ..telemetry import GisPipelineTelemetry
+from .test_ingestion import projection
+
+clock = MockClockService(dt=datetime(2020, 6, 15))
+
+sharded_projection = replace(projection, schema=replace(
+    projection.schema,
+    result_limit=10,
+    result_depth=20,
+    shard_scheme=[
+        DatePredicateFunction('date', (2019, 2021), DateRangeParamFactory(clock)),
+        FloatPredicateFunction('area', (0.0, 1000.0)),
+    ],
+))
+
+def count_of(where_clause: Optional[str]) -> int:
+    # everything happens on the first day of 2020, which has
+    # too many results for one shard, so it's split by area.
+    clause = where_clause or ''
+    if 'area' in clause:
+        return 15 if 'area >= 0.0 ' in clause else 0
+    if "date >= DATE '2020-1-1' AND date < DATE '2020-1-2'" in clause:
+        return 30
+    if "DATE '2020-1-1'" in clause or "DATE '2019-1-1'" in clause:
+        return 30
+    return 0
+
+class RequestSharderTestCase(IsolatedAsyncioTestCase):
+    async def _shard(self, plan: ShardPlan):
+        feature_server = AsyncMock(spec=FeatureServerClient)
+        feature_server.get_where_count.side_effect = \
+            lambda projection, where_clause, use_cache: count_of(where_clause)
+        telemetry = MagicMock(spec=GisPipelineTelemetry)
+        factory = FeaturePaginationSharderFactory(feature_server, telemetry, lambda ls: None, plan)
+        sharder = factory.create(sharded_projection)
+        pages = [p async for p in sharder.shard([])]
+        return pages, feature_server
+
+    async def test_counts_are_reused_from_plan(self):
+        plan = ShardPlan.open(':memory:')
+        pages_1, server_1 = await self._shard(plan)
+        pages_2, server_2 = await self._shard(plan)
+
+        self.assertEqual(pages_1, pages_2)
+        self.assertTrue(pages_1)
+        self.assertGreater(server_1.get_where_count.call_count, 0)
+
+        # only clauses that can't be cached are counted again,
+        # which are the ranges that end after the current date.
+        recounted = [c.kwargs['where_clause'] for c in server_2.get_where_count.call_args_list]
+        self.assertTrue(all(not c.kwargs['use_cache'] for c in server_2.get_where_count.call_args_list))
+        self.assertLess(len(recounted), server_1.get_where_count.call_count)
+
+    async def test_forgotten_counts_are_requested(self):
+        plan = ShardPlan.open(':memory:')
+        await self._shard(plan)
+        planned = plan.load(sharded_projection.partition_key())
+        clause = next(iter(planned))
+        plan.forget(sharded_projection.partition_key(), clause)
+
+        _, server = await self._shard(plan)
+        recounted = [c.kwargs['where_clause'] for c in server.get_where_count.call_args_list]
+        self.assertIn(clause, recounted)
+
+class SparseShardMergeTestCase(IsolatedAsyncioTestCase):
+    async def test_sparse_months_are_merged(self):
+        # 2020 has 3 results a month, too many for one shard,
+        # but the months can be merged back into two shards.
+        projection_2020 = replace(sharded_projection, schema=replace(
+            sharded_projection.schema,
+            shard_scheme=[DatePredicateFunction('date', (2020, 2021), DateRangeParamFactory(clock))],
+        ))
+
+        def count_of_2020(where_clause: Optional[str]) -> int:
+            if "DATE '2020-1-1' AND date < DATE '2021-1-1'" in (where_clause or ''):
+                return 36
+            return 3
+
+        feature_server = AsyncMock(spec=FeatureServerClient)
+        feature_server.get_where_count.side_effect = \
+            lambda projection, where_clause, use_cache: count_of_2020(where_clause)
+        telemetry = MagicMock(spec=GisPipelineTelemetry)
+        factory = FeaturePaginationSharderFactory(feature_server, telemetry, lambda ls: None)
+        sharder = factory.create(projection_2020)
+        pages = [p async for p in sharder.shard([])]
+
+        self.assertEqual(sum(p.expected_results for p in pages), 36)
+        self.assertEqual(len({ p.where_clause for p in pages }), 2)
+        self.assertTrue(any("DATE '2020-1-1' AND date < DATE '2020-7-1'" in (p.where_clause or '') for p in pages))
+
+    async def test_forgetting_merged_page_forgets_sibling_counts(self):
+        # by 2022 all of 2020 can be cached, so every count is planned.
+        clock_2022 = MockClockService(dt=datetime(2022, 1, 1))
+        projection_2020 = replace(sharded_projection, schema=replace(
+            sharded_projection.schema,
+            shard_scheme=[DatePredicateFunction('date', (2020, 2021), DateRangeParamFactory(clock_2022))],
+        ))
+
+        def count_of_2020(where_clause: Optional[str]) -> int:
+            if "DATE '2020-1-1' AND date < DATE '2021-1-1'" in (where_clause or ''):
+                return 36
+            return 3
+
+        feature_server = AsyncMock(spec=FeatureServerClient)
+        feature_server.get_where_count.side_effect = \
+            lambda projection, where_clause, use_cache: count_of_2020(where_clause)
+        plan = ShardPlan.open(':memory:')
+        factory = FeaturePaginationSharderFactory(
+            feature_server, MagicMock(spec=GisPipelineTelemetry), lambda ls: None, plan)
+        pages = [p async for p in factory.create(projection_2020).shard([])]
+
+        merged = next(p for p in pages if len(p.derived_from) > 1)
+        partition = projection_2020.partition_key()
+        self.assertTrue(set(merged.derived_from) <= set(plan.load(partition)))
+        self.assertNotIn(merged.where_clause, plan.load(partition))
+
+        file_cache = AsyncMock(spec=HttpLocalCache)
+        cleaner = CacheCleaner(file_cache, plan)
+        await cleaner.forget_partition_cache(projection_2020, merged)
+
+        remaining = plan.load(partition)
+        self.assertFalse(set(merged.derived_from) & set(remaining))
+        forgotten = [c.kwargs['clauses'] for c in file_cache.forget_by_clause.call_args_list]
+        for clause in merged.derived_from:
+            self.assertIn([projection_2020.schema.url, urlencode({ 'where': clause })], forgotten)
+
+class ObjectIdPagingTestCase(IsolatedAsyncioTestCase):
+    async def test_pages_are_ranges_of_object_ids(self):
+        def object_ids_of(where_clause: Optional[str]):
+            if "date >= DATE '2020-1-1'" in (where_clause or ''):
+                return 'OBJECTID', [25, 3, 7, 1, 12]
+            return 'OBJECTID', []
+
+        feature_server = AsyncMock(spec=FeatureServerClient)
+        feature_server.get_object_ids.side_effect = \
+            lambda projection, where_clause, use_cache: object_ids_of(where_clause)
+        telemetry = MagicMock(spec=GisPipelineTelemetry)
+        projection = replace(sharded_projection, schema=replace(sharded_projection.schema, result_limit=2))
+        factory = FeaturePaginationSharderFactory(feature_server, telemetry, lambda ls: None, paging='object_id')
+        sharder = factory.create(projection)
+        pages = [p async for p in sharder.shard([])]
+
+        feature_server.get_where_count.assert_not_called()
+        self.assertEqual([p.expected_results for p in pages], [2, 2, 1])
+        self.assertTrue(all(p.offset == 0 for p in pages))
+        self.assertTrue(pages[0].where_clause.endswith('OBJECTID >= 1 AND OBJECTID <= 3'))
+        self.assertTrue(pages[1].where_clause.endswith('OBJECTID >= 7 AND OBJECTID <= 12'))
+        self.assertTrue(pages[2].where_clause.endswith('OBJECTID >= 25 AND OBJECTID <= 25'))
+
+    async def test_forgetting_page_forgets_object_ids(self):
+        feature_server = AsyncMock(spec=FeatureServerClient)
+        feature_server.get_object_ids.return_value = ('OBJECTID', [1, 2, 3])
+        projection = replace(sharded_projection, schema=replace(sharded_projection.schema, result_limit=2))
+        factory = FeaturePaginationSharderFactory(
+            feature_server, MagicMock(spec=GisPipelineTelemetry), lambda ls: None, paging='object_id')
+        pages = [p async for p in factory.create(projection).shard([])]
+
+        page = pages[0]
+        ids_clauses = { c.kwargs['where_clause'] for c in feature_server.get_object_ids.call_args_list }
+        self.assertEqual(len(page.derived_from), 1)
+        self.assertIn(page.derived_from[0], ids_clauses)
+        self.assertTrue(page.where_clause.startswith(f'{page.derived_from[0]} AND OBJECTID'))
+
+        file_cache = AsyncMock(spec=HttpLocalCache)
+        await CacheCleaner(file_cache).forget_partition_cache(projection, page)
+
+        forgotten = [c.kwargs['clauses'] for c in file_cache.forget_by_clause.call_args_list]
+        self.assertIn([projection.schema.url, urlencode({ 'where': page.derived_from[0] })], forgotten)
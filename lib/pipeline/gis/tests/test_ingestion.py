@@ -0,0 +1,63 @@
+import json
+from typing import Any, Dict, List
+
+from ..config import FeaturePageDescription, GisProjection, GisSchema, SchemaField
+from ..ingestion import decode_page
+
+projection = GisProjection(
+    id='test',
+    schema=GisSchema(
+        url='http://example.com/0',
+        id_field='objectid',
+        db_relation='s.t',
+        result_limit=10,
+        result_depth=100,
+        fields=[
+            SchemaField('id', 'objectid', 1, rename='object_id'),
+            SchemaField('data', 'thing', 1, format='number'),
+        ],
+        shard_scheme=[],
+        debug_field='objectid',
+    ),
+    fields='*',
+    epsg_crs=7844,
+)
+
+def make_page(n: int) -> bytes:
+    features: List[Dict[str, Any]] = [
+        {
+            'attributes': {'objectid': i, 'thing': None if i % 2 else 1.0},
+            'geometry': {'x': float(i), 'y': 1.0},
+        }
+        for i in range(n)
+    ]
+    return json.dumps({'features': features}).encode()
+
+def page_desc(expected: int) -> FeaturePageDescription:
+    return FeaturePageDescription('1=1', 0, expected, True)
+
+def test_decode_page_for_copy() -> None:
+    count, (df, query) = decode_page(projection, page_desc(3), 'copy', make_page(3))
+    assert count == 3
+    assert query == 'COPY s.t (object_id, thing, geometry) FROM STDIN'
+    assert [r[:2] for r in df.to_records(index=False).tolist()] == [
+        (0, 1), (1, None), (2, 1),
+    ]
+
+def test_decode_page_for_write() -> None:
+    count, (df, query) = decode_page(projection, page_desc(3), 'write', make_page(3))
+    assert count == 3
+    assert query is not None and query.startswith('INSERT INTO s.t')
+    assert df['geometry'][0] == 'POINT (0 1)'
+
+def test_decode_page_without_preparing() -> None:
+    count, (df, query) = decode_page(projection, page_desc(2), 'skip', make_page(2))
+    assert count == 2
+    assert query is None
+    assert len(df) == 2
+
+def test_decode_short_page() -> None:
+    count, (df, query) = decode_page(projection, page_desc(5), 'copy', make_page(2))
+    assert count == 2
+    assert query is None
+    assert len(df) == 0
@@ -0,0 +1,72 @@
+from datetime import datetime
+from functools import reduce
+import logging
+import pytest
+from unittest.mock import MagicMock
+
+from lib.service.clock.mocks import MockClockService
+from lib.utility.sampling import SamplingConfig
+
+from ..config import FeaturePageDescription, GisProjection, GisSchema, IngestionTaskDescriptor
+from ..telemetry import GisPipelineTelemetry, ShardStatistics
+
+@pytest.fixture
+def projection() -> GisProjection:
+    return GisProjection(
+        id='test',
+        schema=GisSchema(
+            url='http://example.com/0',
+            id_field='objectid',
+            db_relation='s.t',
+            result_limit=10,
+            result_depth=100,
+            fields=[],
+            shard_scheme=[],
+            debug_field='objectid',
+        ),
+        fields='*',
+        epsg_crs=7844,
+    )
+
+def fetch(projection: GisProjection, clause: str, expected: int) -> IngestionTaskDescriptor.Fetch:
+    return IngestionTaskDescriptor.Fetch(projection, FeaturePageDescription(clause, 0, expected, True))
+
+def save(projection: GisProjection, clause: str) -> IngestionTaskDescriptor.Save:
+    return IngestionTaskDescriptor.Save(projection, FeaturePageDescription(clause, 0, 0, True), MagicMock())
+
+def test_running_total(projection: GisProjection) -> None:
+    clock = MockClockService(dt=datetime(2012, 12, 12), clock_time=0)
+    telemetry = GisPipelineTelemetry.create(clock)
+    telemetry.init_clause(projection, 'a', 10)
+    telemetry.init_clause(projection, 'b', 5)
+    telemetry.init_clause(projection, 'b', 6)
+
+    telemetry.record_fetch_start(fetch(projection, 'a', 4))
+    telemetry.record_fetch_end(fetch(projection, 'a', 4), 4)
+    telemetry.record_save_queue(save(projection, 'a'), 4)
+    telemetry.record_save_start(save(projection, 'a'), 4)
+    telemetry.record_save_end(save(projection, 'a'), 4)
+    telemetry.record_fetch_start(fetch(projection, 'b', 6))
+    telemetry.record_fetch_end(fetch(projection, 'b', 6), 6)
+    telemetry.record_save_skip(save(projection, 'b'), 6)
+
+    expected = reduce(lambda a, b: a + b, [
+        telemetry.get_state(projection, 'a'),
+        telemetry.get_state(projection, 'b'),
+    ])
+    assert expected == ShardStatistics(16, 10, 10, 4, 4, 10)
+    assert telemetry.get_total() == expected
+
+def test_logs_are_sampled(projection: GisProjection, caplog) -> None:
+    caplog.set_level(logging.INFO, logger='lib.pipeline.gis.telemetry.progress')
+    clock = MockClockService(dt=datetime(2012, 12, 12), clock_time=0)
+    telemetry = GisPipelineTelemetry.create(clock, SamplingConfig(min_sample_delta=5))
+    telemetry.init_clause(projection, 'a', 100)
+
+    for _ in range(10):
+        telemetry.record_fetch_start(fetch(projection, 'a', 1))
+    assert len(caplog.records) == 1
+
+    clock.tick_time(6)
+    telemetry.record_fetch_start(fetch(projection, 'a', 1))
+    assert len(caplog.records) == 2
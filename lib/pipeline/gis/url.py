@@ -24,6 +24,9 @@ def get_page_url_params(
         'f': 'json',
     }
 
+def get_object_ids_url_params(where_clause: Optional[str]) -> UrlParams:
+    return { 'where': where_clause or '1=1', 'returnIdsOnly': True, 'f': 'json' }
+
 def get_count_url_params(where_clause: Optional[str]) -> UrlParams:
     return { 'where': where_clause or '1=1', 'returnCountOnly': True, 'f': 'json' }
 
@@ -39,4 +39,15 @@ class WorkerTask:
 class WorkerConfig:
     db_config: DatabaseConfig
     db_poolsize: int
-    batch_size: int
+
+    """
+    The number of bytes of a file sent to the database at a time.
+    """
+    chunk_size: int = field(default=2 ** 20)
+
+    """
+    When set rows are copied into a staging table, then inserted
+    skipping any rows which already exist, otherwise they're
+    copied into the table directly, which fails on conflicts.
+    """
+    staging: bool = field(default=True)
@@ -1,6 +1,7 @@
 import asyncio
+from dataclasses import dataclass, field
 import multiprocessing
-from typing import Iterator, List
+from typing import List, Optional
 
 from lib.service.io import IoService
 from .config import Config, WorkerConfig, WorkerTask
@@ -23,7 +24,6 @@ def worker(id: int, config: WorkerConfig, tasks: List[WorkerTask]):
     import asyncio
 
     async def main() -> None:
-        import csv
         import logging
         import os
 
@@ -38,36 +38,60 @@ def worker(id: int, config: WorkerConfig, tasks: List[WorkerTask]):
             table_name, file = task.table_name, task.file_source
             with db.connect() as conn, conn.cursor() as cursor:
                 cursor.execute("SET session_replication_role = 'replica';")
-                with open(file, 'r') as f:
+                with open(file, 'rb') as f:
                     logger.info(f"Loading {os.path.basename(file)}")
-                    reader = csv.reader(f, delimiter='|')
-                    headers = next(reader)
-                    insert_query = f"""
-                        INSERT INTO {_SCHEMA}.{table_name} ({', '.join(headers)})
-                        VALUES ({', '.join(['%s'] * len(headers))})
-                        ON CONFLICT DO NOTHING
-                    """
-
-                    for batch_index, batch in enumerate(_get_batches(config.batch_size, reader)):
-                        try:
-                            cursor.executemany(insert_query, batch)
-                        except Exception as e:
-                            logger.error(f"Error inserting batch {batch_index + 1} into {table_name}: {e}")
-                            raise e
+                    headers = read_headers(f.readline())
+                    queries = copy_queries(table_name, headers, config.staging)
+                    try:
+                        if queries.create_stage:
+                            cursor.execute(queries.create_stage)
+                        with cursor.copy(queries.copy) as copy:
+                            while chunk := f.read(config.chunk_size):
+                                copy.write(chunk)
+                        if queries.insert:
+                            cursor.execute(queries.insert)
+                    except Exception as e:
+                        logger.error(f"Error copying {os.path.basename(file)} into {table_name}: {e}")
+                        raise e
                     conn.commit()
                 cursor.execute("SET session_replication_role = 'origin';")
             logger.info(f"Loaded {os.path.basename(file)}")
         logger.info(f"DONE")
     asyncio.run(main())
 
-def _get_batches(batch_size: int, reader) -> Iterator[List[str]]:
-    batch = []
-    for row in reader:
-        row = [(None if v == "" else v) for v in (v.strip() for v in row)]
-        batch.append(row)
+@dataclass(frozen=True)
+class CopyQueries:
+    copy: str
+    create_stage: Optional[str] = field(default=None)
+    insert: Optional[str] = field(default=None)
+
+def read_headers(line: bytes) -> List[str]:
+    return [h.strip() for h in line.decode('utf-8-sig').strip().split('|')]
+
+def copy_queries(table_name: str, headers: List[str], staging: bool) -> CopyQueries:
+    """
+    The rows of the file (after the header) are sent to postgres
+    as they are, which parses them as csv, where an empty field
+    is null.
+
+    Without staging the rows are copied into the table directly,
+    which is fastest but fails on any row that already exists.
+    With staging they're copied into a temporary table first,
+    then inserted into the table skipping existing rows, as
+    COPY on its own has no way to skip conflicting rows.
+    """
+    columns = ', '.join(headers)
+    table = f'{_SCHEMA}.{table_name}'
+    options = "WITH (FORMAT csv, DELIMITER '|', NULL '')"
+
+    if not staging:
+        return CopyQueries(copy=f"COPY {table} ({columns}) FROM STDIN {options}")
 
-        if len(batch) >= batch_size:
-            yield batch
-            batch = []
-    if batch:
-        yield batch
+    stage = f'pg_temp.{table_name}_stage'
+    return CopyQueries(
+        create_stage=f"CREATE TEMP TABLE IF NOT EXISTS {stage} ON COMMIT DELETE ROWS AS "
+                     f"SELECT {columns} FROM {table} WITH NO DATA",
+        copy=f"COPY {stage} ({columns}) FROM STDIN {options}",
+        insert=f"INSERT INTO {table} ({columns}) "
+               f"SELECT {columns} FROM {stage} ON CONFLICT DO NOTHING",
+    )
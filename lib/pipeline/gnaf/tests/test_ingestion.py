@@ -0,0 +1,24 @@
+from ..ingestion import copy_queries, read_headers
+
+def test_read_headers():
+    line = '\ufeffADDRESS_DETAIL_PID|DATE_CREATED|LEVEL_NUMBER\r\n'.encode('utf-8')
+    assert read_headers(line) == ['ADDRESS_DETAIL_PID', 'DATE_CREATED', 'LEVEL_NUMBER']
+
+def test_copy_directly():
+    queries = copy_queries('address_detail', ['a', 'b'], staging=False)
+    assert queries.create_stage is None
+    assert queries.insert is None
+    assert queries.copy == (
+        "COPY gnaf.address_detail (a, b) FROM STDIN "
+        "WITH (FORMAT csv, DELIMITER '|', NULL '')"
+    )
+
+def test_copy_through_stage():
+    queries = copy_queries('address_detail', ['a', 'b'], staging=True)
+    assert queries.create_stage is not None
+    assert 'pg_temp.address_detail_stage' in queries.create_stage
+    assert queries.copy.startswith('COPY pg_temp.address_detail_stage (a, b) FROM STDIN')
+    assert queries.insert == (
+        'INSERT INTO gnaf.address_detail (a, b) '
+        'SELECT a, b FROM pg_temp.address_detail_stage ON CONFLICT DO NOTHING'
+    )
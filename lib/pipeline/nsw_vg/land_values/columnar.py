@@ -0,0 +1,159 @@
+from dataclasses import fields
+from datetime import datetime
+from logging import getLogger
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+import lib.pipeline.nsw_vg.raw_data.rows as util
+
+from .config import RawLandValueRow
+
+_logger = getLogger(__name__)
+
+LAND_VALUE_COLUMNS: List[str] = [f.name for f in fields(RawLandValueRow)]
+
+_AREA_TYPES = ['M', 'H', 'U', '']
+_ZONE_CODE_LEN = 4
+
+class _Rejected(Exception):
+    """
+    Raised when a column can't be converted as a whole, at which
+    point the chunk is converted a row at a time, which will
+    either raise a descriptive error for the offending row, or
+    convert it if the vectorised conversion was too strict.
+    """
+
+def parse_chunk(chunk: pd.DataFrame,
+                first_line: int,
+                file_path: str,
+                source_date: datetime) -> pd.DataFrame:
+    """
+    Converts a chunk of a land value csv (read with every column
+    as a string) into the columns of `RawLandValueRow`, with the
+    same conversions `RawLandValueRow.from_row` applies to each
+    row, but applied to each column at once.
+
+    Every column of the result has the object dtype, with python
+    values and `None` for anything missing, so the rows can be
+    passed to the database as they are.
+    """
+    try:
+        return _parse_columns(chunk, first_line, file_path, source_date)
+    except _Rejected as e:
+        _logger.debug(f'falling back to row by row conversion in {file_path}, {e}')
+        return _parse_rows(chunk, first_line, file_path, source_date)
+
+def _parse_columns(chunk: pd.DataFrame,
+                   first_line: int,
+                   file_path: str,
+                   source_date: datetime) -> pd.DataFrame:
+    zone_code = chunk['ZONE CODE']
+    if (zone_code.str.len() > _ZONE_CODE_LEN).any():
+        raise _Rejected('zone_code')
+
+    area_type = chunk['AREA TYPE']
+    if not area_type.isin(_AREA_TYPES).all():
+        raise _Rejected('area_type')
+
+    postcode = chunk['POSTCODE']
+    out = {
+        'district_code': _int(chunk, 'DISTRICT CODE'),
+        'district_name': _optional_str(chunk, 'DISTRICT NAME'),
+        'property_id': _int(chunk, 'PROPERTY ID'),
+        'property_type': _str(chunk, 'PROPERTY TYPE'),
+        'property_name': _optional_str(chunk, 'PROPERTY NAME'),
+        'unit_number': _optional_str(chunk, 'UNIT NUMBER'),
+        'house_number': _optional_str(chunk, 'HOUSE NUMBER'),
+        'street_name': _optional_str(chunk, 'STREET NAME'),
+        'suburb_name': _str(chunk, 'SUBURB NAME'),
+        'postcode': _none_where(postcode, postcode.str.len() != 4),
+        'property_description': _optional_str(chunk, 'PROPERTY DESCRIPTION'),
+        'zone_code': _optional_str(chunk, 'ZONE CODE'),
+        'zone_standard': _zone_standard(zone_code),
+        'area': _optional_float(chunk, 'AREA'),
+        'area_type': _optional_str(chunk, 'AREA TYPE'),
+    }
+    for n in range(1, 6):
+        out[f'land_value_{n}'] = _optional_float(chunk, f'LAND VALUE {n}')
+        out[f'base_date_{n}'] = _optional_date(chunk, f'BASE DATE {n}')
+        out[f'authority_{n}'] = _optional_str(chunk, f'AUTHORITY {n}')
+        out[f'basis_{n}'] = _optional_str(chunk, f'BASIS {n}')
+
+    size = len(chunk)
+    out['source_file_name'] = pd.Series([file_path] * size, dtype=object)
+    out['source_line_number'] = pd.Series(range(first_line, first_line + size), dtype=object)
+    out['source_date'] = pd.Series([source_date] * size, dtype=object)
+
+    return pd.DataFrame({
+        name: out[name].reset_index(drop=True)
+        for name in LAND_VALUE_COLUMNS
+    })
+
+def _parse_rows(chunk: pd.DataFrame,
+                first_line: int,
+                file_path: str,
+                source_date: datetime) -> pd.DataFrame:
+    rows = [
+        RawLandValueRow.from_row(row, first_line + i, file_path, source_date)
+        for i, row in enumerate(chunk.to_dict('records'))
+    ]
+    return pd.DataFrame(
+        [[getattr(row, name) for name in LAND_VALUE_COLUMNS] for row in rows],
+        columns=LAND_VALUE_COLUMNS,
+        dtype=object,
+    )
+
+def _none_where(col: pd.Series, missing: pd.Series) -> pd.Series:
+    return col.astype(object).where(~missing, None)
+
+def _str(chunk: pd.DataFrame, name: str) -> pd.Series:
+    col = chunk[name]
+    if (col == '').any():
+        raise _Rejected(name)
+    return col.astype(object)
+
+def _optional_str(chunk: pd.DataFrame, name: str) -> pd.Series:
+    col = chunk[name]
+    return _none_where(col, col == '')
+
+def _int(chunk: pd.DataFrame, name: str) -> pd.Series:
+    try:
+        col = pd.to_numeric(chunk[name], errors='raise')
+    except (ValueError, TypeError) as e:
+        raise _Rejected(name) from e
+    if not pd.api.types.is_integer_dtype(col):
+        raise _Rejected(name)
+    return col.astype(object)
+
+def _optional_float(chunk: pd.DataFrame, name: str) -> pd.Series:
+    col = chunk[name]
+    missing = col == ''
+    try:
+        values = pd.to_numeric(col.where(~missing, None), errors='raise').astype(float)
+    except (ValueError, TypeError) as e:
+        raise _Rejected(name) from e
+    return _none_where(values, missing)
+
+def _optional_date(chunk: pd.DataFrame, name: str) -> pd.Series:
+    # there are only a handful of distinct dates in a file, so
+    # each is parsed once (by the same parser as the row path).
+    col = chunk[name]
+    try:
+        lookup = { d: util.parse_date_pre_2002(d) for d in col.unique() if d }
+    except ValueError as e:
+        raise _Rejected(name) from e
+    return _map_values(col, lookup)
+
+def _zone_standard(col: pd.Series) -> pd.Series:
+    lookup = { z: util.parse_zone_std(z) for z in col.unique() if z }
+    return _map_values(col, lookup)
+
+def _map_values(col: pd.Series, lookup: Dict[str, Any]) -> pd.Series:
+    # `Series.map` would infer a dtype from the values (turning
+    # dates into timestamps), so the values are taken by the code
+    # of each distinct string into an object array instead.
+    codes, uniques = pd.factorize(col)
+    values = np.array([lookup.get(u) for u in uniques], dtype=object)
+    return pd.Series(values[codes], index=col.index, dtype=object)
@@ -12,6 +12,8 @@ from typing import (
     Union,
 )
 
+import pandas as pd
+
 import lib.pipeline.nsw_vg.raw_data.rows as util
 from lib.pipeline.nsw_vg.raw_data.zoning import ZoningKind
 
@@ -64,7 +66,11 @@ class NswVgLvTaskDesc:
     class Load(Base):
         file: str
         offset: int
-        rows: List['RawLandValueRow'] = field(repr=False)
+
+        """
+        The columns of `RawLandValueRow`, see `columnar.parse_chunk`.
+        """
+        rows: pd.DataFrame = field(repr=False)
 
 class NswVgLvParentMsg:
     class Base:
@@ -157,7 +163,7 @@ class RawLandValueRow:
             suburb_name=util.read_str(row, 'SUBURB NAME', 'suburb_name'),
             postcode=util.read_postcode(row, 'POSTCODE', 'postcode'),
             property_description=row['PROPERTY DESCRIPTION'] or None,
-            zone_code=util.StrCheck(max_len=4).read_optional(row, 'ZONE CODE', 'zone_code'),
+            zone_code=util.zone_code_4.read_optional(row, 'ZONE CODE', 'zone_code'),
             zone_standard=util.read_zone_std(row, 'ZONE CODE', 'zone_standard'),
             area=util.read_optional_float(row, 'AREA', 'area'),
             area_type=util.read_area_type(row, 'AREA TYPE', 'area_type'),
@@ -1,50 +1,53 @@
 import asyncio
-import csv
 from dataclasses import dataclass
-from io import StringIO
 from logging import getLogger
 from multiprocessing import Queue as MpQueue
 import queue
-from typing import AsyncIterator, Self
+from typing import AsyncIterator, Callable, Self
 
 from lib.service.database import DatabaseService
 from lib.service.io import IoService
 
+from .columnar import LAND_VALUE_COLUMNS, parse_chunk
 from .config import (
     NswVgLvTaskDesc,
     NswVgLvParentMsg,
     NswVgLvChildMsg,
-    RawLandValueRow,
 )
 
+_COPY_SQL = f"COPY nsw_vg_raw.land_value_row ({', '.join(LAND_VALUE_COLUMNS)}) FROM STDIN"
+
+# The number of parsed chunks of a file which can be
+# waiting to be copied into the database.
+_PARSE_AHEAD = 2
+
 class NswVgLvWorker:
     _close_requested: bool = False
     _stopped: bool = False
 
     _logger = getLogger(__name__)
     _parse_q: asyncio.Queue[NswVgLvTaskDesc.Parse]
-    _load_q: asyncio.Queue[NswVgLvTaskDesc.Load]
 
     def __init__(self: Self,
                  id: int,
                  ingestion: 'NswVgLvIngestion',
-                 coordinator: 'NswVgLvCoordinatorClient',
-                 load_q: asyncio.Queue[NswVgLvTaskDesc.Load]):
+                 coordinator: 'NswVgLvCoordinatorClient'):
         self.id = id
         self._ingestion = ingestion
         self._coordinator = coordinator
         self._parse_q = asyncio.Queue()
-        self._load_q = load_q
 
     @staticmethod
     def create(id: int,
                ingestion: 'NswVgLvIngestion',
-               coordinator: 'NswVgLvCoordinatorClient',
-               back_pressure: int):
-        return NswVgLvWorker(id, ingestion, coordinator, asyncio.Queue(maxsize=back_pressure))
-
+               coordinator: 'NswVgLvCoordinatorClient'):
+        return NswVgLvWorker(id, ingestion, coordinator)
 
     async def start(self: Self, size: int):
+        """
+        Each of the `size` loops ingests one file at a time, with
+        its own database connection.
+        """
         async def read_parse_messages() -> None:
             while self._keep_running():
                 try:
@@ -53,29 +56,19 @@ class NswVgLvWorker:
                     continue
 
                 self._logger.debug(f'Running task {t_desc}')
-                async for load_desc in self._ingestion.parse(t_desc):
-                    m = NswVgLvParentMsg.FileRowsParsed(self.id, load_desc.file, len(load_desc.rows))
-                    self._coordinator.send_msg(m)
-                    await self._load_q.put(load_desc)
-
-        async def read_load_messages() -> None:
-            while self._keep_running():
-                try:
-                    t_desc = await asyncio.wait_for(self._load_q.get(), timeout=0.5)
-                except asyncio.TimeoutError:
-                    continue
-
-                self._logger.debug(f'Running task {t_desc}')
-                await self._ingestion.load(t_desc)
-                m = NswVgLvParentMsg.FileRowsSaved(self.id, t_desc.file, len(t_desc.rows))
-                self._coordinator.send_msg(m)
+                await self._ingestion.ingest(
+                    t_desc,
+                    on_parsed=lambda n: self._coordinator.send_msg(
+                        NswVgLvParentMsg.FileRowsParsed(self.id, t_desc.file, n)),
+                    on_saved=lambda n: self._coordinator.send_msg(
+                        NswVgLvParentMsg.FileRowsSaved(self.id, t_desc.file, n)),
+                )
 
         try:
             self._logger.debug(f'starting loop')
             await asyncio.gather(
                 self._start_recv(),
                 *[read_parse_messages() for i in range(0, size)],
-                *[read_load_messages() for i in range(0, size)],
             )
         except Exception as e:
             self._stopped = True
@@ -99,8 +92,7 @@ class NswVgLvWorker:
         if self._stopped:
             return False
         if self._close_requested:
-            return not self._parse_q.empty() \
-                or not self._load_q.empty()
+            return not self._parse_q.empty()
         return True
 
 @dataclass
@@ -127,51 +119,75 @@ class NswVgLvIngestion:
     def __init__(self: Self,
                  chunk_size: int,
                  io: IoService,
-                 db: DatabaseService):
+                 db: DatabaseService,
+                 flush_size: int = 50_000):
         self.chunk_size = chunk_size
+        self.flush_size = flush_size
         self._io = io
         self._db = db
 
-    async def parse(self: Self, task: NswVgLvTaskDesc.Parse) -> AsyncIterator[NswVgLvTaskDesc.Load]:
-        quasi_file = StringIO(await self._get_data(task.file))
-        offset = 0
-        batch = []
-        for index, row_raw in enumerate(csv.DictReader(quasi_file)):
-            batch.append(RawLandValueRow.from_row(
-                row_raw,
-                index + 1,
-                task.file,
-                task.target.datetime,
-            ))
-
-            if len(batch) >= self.chunk_size:
-                yield NswVgLvTaskDesc.Load(task.file, offset, batch)
-                await asyncio.sleep(0)
-                offset += self.chunk_size
-                batch = []
-
-        if batch:
-            yield NswVgLvTaskDesc.Load(task.file, offset, batch)
-
-    async def load(self: Self, task: NswVgLvTaskDesc.Load):
-        columns = task.rows[0].db_columns()
-        column_str = ', '.join(columns)
-        values_str = ', '.join(['%s'] * len(columns))
-        values = [[getattr(row, name) for name in columns] for row in task.rows]
+    async def ingest(self: Self,
+                     task: NswVgLvTaskDesc.Parse,
+                     on_parsed: Callable[[int], None],
+                     on_saved: Callable[[int], None]) -> None:
+        """
+        Parses the file and streams its rows into the table with
+        COPY, over one connection for the whole file. The rows are
+        committed every `flush_size` rows (give or take a chunk),
+        so progress is saved and reported as the file is loaded
+        rather than only at the end. Parsing the next chunks while
+        the last is being copied is bounded by `_PARSE_AHEAD`.
+        """
+        chunks: asyncio.Queue[NswVgLvTaskDesc.Load | None] = asyncio.Queue(maxsize=_PARSE_AHEAD)
+
+        async def produce() -> None:
+            async for load in self.parse(task):
+                on_parsed(len(load.rows))
+                await chunks.put(load)
+            await chunks.put(None)
+
+        async def consume() -> None:
+            async with self._db.async_connect() as conn, conn.cursor() as cursor:
+                load = await chunks.get()
+                while load is not None:
+                    pending = 0
+                    async with cursor.copy(_COPY_SQL) as copy:
+                        while load is not None and pending < self.flush_size:
+                            for row in load.rows.itertuples(index=False, name=None):
+                                await copy.write_row(row)
+                            pending += len(load.rows)
+                            load = await chunks.get()
+                    await conn.commit()
+                    self._logger.debug(f'copied {pending} rows from {task.file}')
+                    on_saved(pending)
 
         try:
-            async with self._db.async_connect() as conn:
-                async with conn.cursor() as cursor:
-                    await cursor.executemany(f"""
-                        INSERT INTO nsw_vg_raw.land_value_row ({column_str})
-                        VALUES ({values_str})
-                    """, values)
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(produce())
+                tg.create_task(consume())
         except Exception as e:
             self._logger.error(f'failed to ingest {task.file}')
             raise e
 
-    async def _get_data(self: Self, f: str) -> str:
-        try:
-            return await self._io.f_read(f, encoding='utf-8')
-        except UnicodeDecodeError:
-            return await self._io.f_read(f, encoding='ISO-8859-1')
+    async def parse(self: Self, task: NswVgLvTaskDesc.Parse) -> AsyncIterator[NswVgLvTaskDesc.Load]:
+        encoding = await self._get_encoding(task.file)
+        offset = 0
+        async for chunk in self._io.f_read_csv_chunks(task.file, self.chunk_size, encoding):
+            # converting a chunk is cpu bound, so it's done off the event loop.
+            batch = await asyncio.to_thread(
+                parse_chunk,
+                chunk,
+                offset + 1,
+                task.file,
+                task.target.datetime,
+            )
+            yield NswVgLvTaskDesc.Load(task.file, offset, batch)
+            offset += len(batch)
+
+    async def _get_encoding(self: Self, f: str) -> str:
+        # most files are utf-8, but the odd one isn't, checking
+        # upfront means a file is never half ingested before a
+        # decode error is found.
+        if await self._io.f_decodes_as(f, 'utf-8'):
+            return 'utf-8'
+        return 'ISO-8859-1'
@@ -0,0 +1,121 @@
+import csv
+from datetime import datetime
+from io import StringIO
+from unittest.mock import AsyncMock, MagicMock, Mock
+import pytest
+
+from lib.service.database import DatabaseService
+from lib.service.io import IoService
+
+from ..columnar import LAND_VALUE_COLUMNS, parse_chunk
+from ..config import ByoLandValue, NswVgLvTaskDesc, RawLandValueRow
+from ..ingest import NswVgLvIngestion
+
+_header = [
+    'DISTRICT CODE', 'DISTRICT NAME', 'PROPERTY ID', 'PROPERTY TYPE',
+    'PROPERTY NAME', 'UNIT NUMBER', 'HOUSE NUMBER', 'STREET NAME',
+    'SUBURB NAME', 'POSTCODE', 'PROPERTY DESCRIPTION', 'ZONE CODE',
+    'AREA', 'AREA TYPE',
+    *[f'{c} {n}' for n in range(1, 6)
+      for c in ['LAND VALUE', 'BASE DATE', 'AUTHORITY', 'BASIS']],
+]
+
+def _row(pid: int, zone: str, area: str, postcode: str, suburb: str = 'SYDNEY') -> list:
+    return [
+        '1', 'SYDNEY', str(pid), 'NORMAL', '', '', str(pid), 'SMITH ST',
+        suburb, postcode, f'1/{pid}/DP1', zone, area, 'M' if area else '',
+        '1000', '01/07/2023', 'MA', 'A',
+        '950.5', '01/07/2022', '', '',
+        '', '', '', '',
+        '', '', '', '',
+        '', '', '', '',
+    ]
+
+def _csv(rows: list) -> str:
+    out = StringIO()
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(_header)
+    writer.writerows(rows)
+    return out.getvalue()
+
+_source_date = datetime(2023, 8, 1)
+
+def _expected(text: str, file_path: str) -> list:
+    return [
+        tuple(getattr(RawLandValueRow.from_row(row, i + 1, file_path, _source_date), c)
+              for c in LAND_VALUE_COLUMNS)
+        for i, row in enumerate(csv.DictReader(StringIO(text)))
+    ]
+
+_rows = [
+    _row(1, 'R2', '612.1', '2000'),
+    _row(2, '', '', '200'),
+    _row(3, 'A', '12', 'ABCD'),
+    _row(4, 'RU1', '', ''),
+]
+
+def _chunk(text: str):
+    import pandas as pd
+    return pd.read_csv(StringIO(text), dtype=str, keep_default_na=False, na_filter=False)
+
+def test_parse_chunk_matches_from_row():
+    text = _csv(_rows)
+    result = parse_chunk(_chunk(text), 1, 'a.csv', _source_date)
+    assert list(result.columns) == LAND_VALUE_COLUMNS
+    assert list(result.itertuples(index=False, name=None)) == _expected(text, 'a.csv')
+    assert all(type(v) is int for v in result['property_id'])
+
+def test_parse_chunk_falls_back_to_rows():
+    # the missing suburb can't be converted by column, so the chunk
+    # is converted a row at a time, which reports the bad field.
+    text = _csv([*_rows[:2], _row(5, 'R2', '1', '2000', suburb='')])
+    with pytest.raises(Exception, match='suburb_name'):
+        parse_chunk(_chunk(text), 1, 'a.csv', _source_date)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('encoding', ['utf-8', 'ISO-8859-1'])
+async def test_parse_in_chunks(tmp_path, encoding):
+    rows = [*_rows, _row(6, 'B4', '4', '2000', suburb='MÉNDEZ')]
+    text = _csv(rows)
+    path = tmp_path / 'lv.csv'
+    path.write_bytes(text.encode(encoding))
+
+    ingestion = NswVgLvIngestion(2, IoService.create(None), Mock(spec=DatabaseService))
+    task = NswVgLvTaskDesc.Parse(str(path), len(text), ByoLandValue(None, _source_date))
+    loads = [load async for load in ingestion.parse(task)]
+
+    assert [(l.offset, len(l.rows)) for l in loads] == [(0, 2), (2, 2), (4, 1)]
+    parsed = [r for l in loads for r in l.rows.itertuples(index=False, name=None)]
+    assert parsed == _expected(text, str(path))
+
+@pytest.mark.asyncio
+async def test_ingest_copies_file_over_one_connection(tmp_path):
+    rows = [_row(i, 'R2', '1', '2000') for i in range(1, 6)]
+    text = _csv(rows)
+    path = tmp_path / 'lv.csv'
+    path.write_text(text)
+
+    copy = AsyncMock()
+    cursor = MagicMock()
+    cursor.copy.return_value.__aenter__.return_value = copy
+    conn = MagicMock()
+    conn.commit = AsyncMock()
+    conn.cursor.return_value.__aenter__.return_value = cursor
+    connection = MagicMock()
+    connection.__aenter__.return_value = conn
+    db = Mock(spec=DatabaseService)
+    db.async_connect.return_value = connection
+
+    parsed, saved = [], []
+    ingestion = NswVgLvIngestion(2, IoService.create(None), db, flush_size=3)
+    task = NswVgLvTaskDesc.Parse(str(path), len(text), ByoLandValue(None, _source_date))
+    await ingestion.ingest(task, on_parsed=parsed.append, on_saved=saved.append)
+
+    assert db.async_connect.call_count == 1
+    assert parsed == [2, 2, 1]
+    # a copy is committed once it has at least `flush_size` rows
+    assert saved == [4, 1]
+    assert conn.commit.await_count == 2
+    assert 'COPY nsw_vg_raw.land_value_row' in cursor.copy.call_args.args[0]
+    written = [c.args[0] for c in copy.write_row.await_args_list]
+    assert written == _expected(text, str(path))
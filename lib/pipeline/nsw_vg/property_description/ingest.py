@@ -107,13 +107,24 @@ class PropDescIngestionSupervisor:
             }
 
 class PropDescIngestionWorker:
+    """
+    Each quantile is copied into a temp table, which is read a
+    page at a time using the `row_no` of the last row read (rather
+    than an offset, which gets slower the further in it is). Each
+    page is written and committed in a single transaction.
+    """
     _logger = getLogger(f'{__name__}.PropDescIngestionWorker')
     _semaphore: MpSemaphore
     _db: DatabaseService
+    _page_size: int
 
-    def __init__(self: Self, semaphore: MpSemaphore, db: DatabaseService) -> None:
+    def __init__(self: Self,
+                 semaphore: MpSemaphore,
+                 db: DatabaseService,
+                 page_size: int = 1000) -> None:
         self._semaphore = semaphore
         self._db = db
+        self._page_size = page_size
 
     async def ingest(self: Self, quantiles: List[QuantileRange]) -> None:
         self._logger.info("Starting sub workers")
@@ -122,7 +133,6 @@ class PropDescIngestionWorker:
         self._logger.info("Finished ingesting")
 
     async def worker(self: Self, quantile: QuantileRange) -> None:
-        limit = 100
         temp_table_name = f"q_{uuid.uuid4().hex[:8]}"
 
         async with self._db.async_connect() as conn, conn.cursor() as cursor:
@@ -132,9 +142,14 @@ class PropDescIngestionWorker:
             await cursor.execute(f"SELECT count(*) FROM pg_temp.{temp_table_name}")
             count = (await cursor.fetchone())[0]
 
-            for offset in range(0, count, limit):
-                self._logger.info(f"{temp_table_name}: {offset}/{count}")
-                await self.ingest_page(conn, cursor, temp_table_name, offset, limit)
+            last_row_no, done = 0, 0
+            while done < count:
+                self._logger.info(f"{temp_table_name}: {done}/{count}")
+                page_count, last_row_no = await self.ingest_page(
+                    conn, cursor, temp_table_name, last_row_no, self._page_size)
+                if page_count == 0:
+                    break
+                done += page_count
 
             self._logger.info(f"{temp_table_name}: DONE")
             await cursor.execute(f"""
@@ -146,25 +161,36 @@ class PropDescIngestionWorker:
                           conn,
                           cursor,
                           table_name: str,
-                          offset: int,
-                          limit: int) -> None:
+                          after_row_no: int,
+                          limit: int) -> Tuple[int, int]:
+        """
+        Returns the number of rows ingested and the `row_no`
+        of the last one, which the next page starts after.
+        """
         try:
             await cursor.execute(f"""
                 SELECT source_id,
                        legal_description,
                        legal_description_id,
                        property_id,
-                       effective_date
+                       effective_date,
+                       row_no
                   FROM pg_temp.{table_name}
-                  LIMIT {limit} OFFSET {offset}
-            """)
+                 WHERE row_no > %s
+                 ORDER BY row_no
+                 LIMIT %s
+            """, (after_row_no, limit))
+            page = await cursor.fetchall()
         except Exception as e:
             self._logger.error(e)
             raise e
 
+        if not page:
+            return 0, after_row_no
+
         rows: List[Tuple[str, PropertyDescription, str, str, str, str]] = [
             (r[0], *parse_property_description_data(r[1]), r[2], r[3], r[4])
-            for r in await cursor.fetchall()
+            for r in page
         ]
 
         remains: List[Tuple[str, str]] = [
@@ -188,7 +214,6 @@ class PropDescIngestionWorker:
                 for source, property_desc, property, effective_date in row_data
                 for folio in property_desc.folios.all
             ])
-            await conn.commit()
 
             await cursor.executemany("""
                 INSERT INTO nsw_lrs.folio (
@@ -204,7 +229,6 @@ class PropDescIngestionWorker:
                 for source, property_desc, property, effective_date in row_data
                 for folio in property_desc.folios.all
             ])
-            await conn.commit()
 
             await cursor.executemany("""
                 INSERT INTO nsw_lrs.property_folio(
@@ -236,6 +260,7 @@ class PropDescIngestionWorker:
             self._logger.error(e)
             raise e
         await conn.commit()
+        return len(page), page[-1][5]
 
 
     async def create_temp_table(self: Self,
@@ -248,7 +273,8 @@ class PropDescIngestionWorker:
             SET session_replication_role = 'replica';
 
             CREATE TEMP TABLE pg_temp.{temp_table_name} AS
-            SELECT source_id,
+            SELECT row_number() OVER () AS row_no,
+                   source_id,
                    legal_description,
                    legal_description_id,
                    property_id,
@@ -260,6 +286,8 @@ class PropDescIngestionWorker:
                {f"AND property_id >= {q.start}" if q.start else ''}
                {f"AND property_id < {q.end}" if q.end else ''}
                AND strata_lot_number IS NULL;
+
+            ALTER TABLE pg_temp.{temp_table_name} ADD PRIMARY KEY (row_no);
         """)
         self._semaphore.release()
         time.sleep(0.01)
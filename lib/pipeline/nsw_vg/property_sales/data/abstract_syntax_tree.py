@@ -7,11 +7,19 @@ from lib.pipeline.nsw_vg.discovery import NswVgTarget
 from lib.pipeline.nsw_vg.raw_data.zoning import ZoningKind
 
 class BasePropertySaleFileRow(abc.ABC):
+    """
+    Rows are slotted, and rather than holding a reference to the
+    record they belong to they only hold its position in the file
+    (`parent_position`), so a row queued for ingestion doesn't
+    keep the rows before it alive.
+    """
+    __slots__ = ()
+
     @abc.abstractmethod
     def db_columns(self: Self) -> List[str]:
         raise NotImplementedError('ahh')
 
-@dataclass
+@dataclass(slots=True)
 class SaleRecordFileLegacy(BasePropertySaleFileRow):
     position: int
     file_path: str = field(repr=False)
@@ -22,11 +30,11 @@ class SaleRecordFileLegacy(BasePropertySaleFileRow):
     def db_columns(self: Self) -> List[str]:
         return list(map(lambda f: f.name, fields(self)))
 
-@dataclass
+@dataclass(slots=True)
 class SalePropertyDetails1990(BasePropertySaleFileRow):
     position: int
     file_path: str = field(repr=False)
-    parent: SaleRecordFileLegacy = field(repr=False)
+    parent_position: Optional[int] = field(repr=False)
     district_code: int
     source: Optional[str]
     valuation_number: Optional[str]
@@ -47,10 +55,10 @@ class SalePropertyDetails1990(BasePropertySaleFileRow):
     zone_standard: ZoningKind | None
 
     def db_columns(self: Self) -> List[str]:
-        not_allowed = {'parent'}
+        not_allowed = {'parent_position'}
         return [f.name for f in fields(self) if f.name not in not_allowed]
 
-@dataclass
+@dataclass(slots=True)
 class SaleRecordFile(BasePropertySaleFileRow):
     position: int
     year_of_sale: int
@@ -63,11 +71,11 @@ class SaleRecordFile(BasePropertySaleFileRow):
     def db_columns(self: Self) -> List[str]:
         return list(map(lambda f: f.name, fields(self)))
 
-@dataclass
+@dataclass(slots=True)
 class SalePropertyDetails(BasePropertySaleFileRow):
     position: int
     file_path: str = field(repr=False)
-    parent: SaleRecordFile = field(repr=False)
+    parent_position: Optional[int] = field(repr=False)
     district_code: int
     property_id: Optional[int]
     sale_counter: int
@@ -97,14 +105,14 @@ class SalePropertyDetails(BasePropertySaleFileRow):
     dealing_number: str
 
     def db_columns(self: Self) -> List[str]:
-        not_allowed = {'parent'}
+        not_allowed = {'parent_position'}
         return [f.name for f in fields(self) if f.name not in not_allowed]
 
-@dataclass
+@dataclass(slots=True)
 class SalePropertyLegalDescription(BasePropertySaleFileRow):
     position: int
     file_path: str = field(repr=False)
-    parent: SalePropertyDetails = field(repr=False)
+    parent_position: Optional[int] = field(repr=False)
 
     district_code: int
 
@@ -117,14 +125,14 @@ class SalePropertyLegalDescription(BasePropertySaleFileRow):
     property_description: Optional[str]
 
     def db_columns(self: Self) -> List[str]:
-        not_allowed = {'parent'}
+        not_allowed = {'parent_position'}
         return [f.name for f in fields(self) if f.name not in not_allowed]
 
-@dataclass
+@dataclass(slots=True)
 class SaleParticipant(BasePropertySaleFileRow):
     position: int
     file_path: str = field(repr=False)
-    parent: SalePropertyLegalDescription = field(repr=False)
+    parent_position: Optional[int] = field(repr=False)
     district_code: int
     """
     Missing in property sale records from July 2001
@@ -135,14 +143,14 @@ class SaleParticipant(BasePropertySaleFileRow):
     participant: str
 
     def db_columns(self: Self) -> List[str]:
-        not_allowed = {'parent'}
+        not_allowed = {'parent_position'}
         return [f.name for f in fields(self) if f.name not in not_allowed]
 
-@dataclass
+@dataclass(slots=True)
 class SaleDataFileSummary(BasePropertySaleFileRow):
     position: int
     file_path: str = field(repr=False)
-    parent: SaleRecordFile = field(repr=False)
+    parent_position: Optional[int] = field(repr=False)
     total_records: int
     total_sale_property_details: int
 
@@ -153,6 +161,6 @@ class SaleDataFileSummary(BasePropertySaleFileRow):
     total_sale_participants: int
 
     def db_columns(self: Self) -> List[str]:
-        not_allowed = {'parent'}
+        not_allowed = {'parent_position'}
         return [f.name for f in fields(self) if f.name not in not_allowed]
 
@@ -1,6 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
 
 @dataclass
 class PropertySaleDatFileMetaData:
@@ -8,3 +8,18 @@ class PropertySaleDatFileMetaData:
     published_year: int
     download_date: Optional[datetime]
     size: int
+
+    """
+    When set the file is read straight from this zip, by the
+    chain of members leading to it (see `IoService.zip_walk`),
+    and `file_path` is where the file would have been extracted.
+    """
+    archive_path: Optional[str] = field(default=None)
+    archive_members: Tuple[str, ...] = field(default=())
+
+    """
+    The names of every file queued from the same nested zip as
+    this one (including this one), they're read from the zip
+    together so it's only read into memory once for all of them.
+    """
+    archive_batch: Tuple[str, ...] = field(default=())
@@ -1,4 +1,4 @@
 from .factories import *
 from .parse import PropertySalesRowParserFactory
 from .syntax import get_columns_and_syntax, Syntax
-from .text_source import BufferedFileReaderTextSource, StringTextSource
+from .text_source import BufferedFileReaderTextSource, MmapTextSource, StringTextSource, ZipMemberTextSource
@@ -6,6 +6,11 @@ from typing import Any, Callable, Generic, Self, List, TypeVar, Optional, Protoc
 from lib.pipeline.nsw_vg.property_sales import data as t
 from lib.pipeline.nsw_vg.raw_data.rows import *
 
+def _position_of(record: Any) -> Optional[int]:
+    # rows only refer to their parent by its position, see
+    # `BasePropertySaleFileRow`.
+    return None if record is None else record.position
+
 class AbstractFormatFactory(abc.ABC):
     @classmethod
     def create(cls, year: int, file_path: str) -> 'AbstractFormatFactory':
@@ -33,7 +38,7 @@ class AbstractFormatFactory(abc.ABC):
 
 class CurrentFormatFactory(AbstractFormatFactory):
     zone_standard: t.ZoningKind = 'ep&a_2006'
-    zone_code_len: int = 3
+    zone_code_check: StrCheck = zone_code_3
 
     def __init__(self: Self, year: int, file_path: str):
         self.year = year
@@ -58,7 +63,7 @@ class CurrentFormatFactory(AbstractFormatFactory):
         return t.SalePropertyDetails(
             position=pos,
             file_path=self.file_path,
-            parent=a_record,
+            parent_position=_position_of(a_record),
             district_code=read_int(row, 0, 'district_code'),
             property_id=read_optional_int(row, 1, 'property_id'),
             sale_counter=read_int(row, 2, 'sale_counter'),
@@ -74,7 +79,7 @@ class CurrentFormatFactory(AbstractFormatFactory):
             contract_date=read_optional_date(row, 12, 'contract_date'),
             settlement_date=read_optional_date(row, 13, 'settlement_date'),
             purchase_price=read_optional_float(row, 14, 'purchase_price'),
-            zone_code=StrCheck(max_len=self.zone_code_len).read_optional(row, 15, 'zone_code'),
+            zone_code=self.zone_code_check.read_optional(row, 15, 'zone_code'),
             zone_standard=read_zone_std(row, 15, 'zone_code'),
             nature_of_property=read_str(row, 16, 'nature_of_property'),
             primary_purpose=row[17] or None,
@@ -89,7 +94,7 @@ class CurrentFormatFactory(AbstractFormatFactory):
         return t.SalePropertyLegalDescription(
             position=pos,
             file_path=self.file_path,
-            parent=b_record,
+            parent_position=_position_of(b_record),
             district_code=read_int(row, 0, 'district_code'),
             property_id=read_optional_int(row, 1, 'property_id'),
             sale_counter=read_int(row, 2, 'sale_counter'),
@@ -101,7 +106,7 @@ class CurrentFormatFactory(AbstractFormatFactory):
         return t.SaleParticipant(
             position=pos,
             file_path=self.file_path,
-            parent=c_record,
+            parent_position=_position_of(c_record),
             district_code=read_int(row, 0, 'district_code'),
             property_id=read_optional_int(row, 1, 'property_id'),
             sale_counter=read_int(row, 2, 'sale_counter'),
@@ -113,7 +118,7 @@ class CurrentFormatFactory(AbstractFormatFactory):
         return t.SaleDataFileSummary(
             position=pos,
             file_path=self.file_path,
-            parent=a_record,
+            parent_position=_position_of(a_record),
             total_records=read_int(row, 0, 'total_records'),
             total_sale_property_details=read_int(row, 1, 'total_sale_property_details'),
             total_sale_property_legal_descriptions=read_int(row, 2, 'total_sale_property_legal_descriptions'),
@@ -122,7 +127,7 @@ class CurrentFormatFactory(AbstractFormatFactory):
 
 class Legacy2002Format(CurrentFormatFactory):
     zone_standard = 'legacy_vg_2011'
-    zone_code_len = 4
+    zone_code_check = zone_code_4
 
     @classmethod
     def create(cls, year: int, file_path: str) -> 'Legacy2002Format':
@@ -146,7 +151,7 @@ class Legacy2002Format(CurrentFormatFactory):
             return t.SalePropertyLegalDescription(
                 position=pos,
                 file_path=self.file_path,
-                parent=b_record,
+                parent_position=_position_of(b_record),
                 district_code=read_int(row, 0, 'district_code'),
                 property_id=None,
                 sale_counter=read_int(row, 1, 'sale_counter'),
@@ -163,7 +168,7 @@ class Legacy2002Format(CurrentFormatFactory):
             return t.SaleParticipant(
                 position=pos,
                 file_path=self.file_path,
-                parent=c_record,
+                parent_position=_position_of(c_record),
                 district_code=read_int(row, 0, 'district_code'),
                 property_id=None,
                 sale_counter=read_int(row, 1, 'sale_counter'),
@@ -199,7 +204,7 @@ class Legacy1990Format(AbstractFormatFactory):
         return t.SalePropertyDetails1990(
             position=pos,
             file_path=self.file_path,
-            parent=a_record,
+            parent_position=_position_of(a_record),
             district_code=read_int(row, 0, 'district_code'),
             source=row[1] or None,
             valuation_number=row[2] or None,
@@ -216,7 +221,7 @@ class Legacy1990Format(AbstractFormatFactory):
             area_type=read_area_type(row, 13, 'area_type'),
             dimensions=row[14] or None,
             comp_code=row[15] or None,
-            zone_code=StrCheck(max_len=4).read_optional(row, 16, 'zone_code'),
+            zone_code=zone_code_4.read_optional(row, 16, 'zone_code'),
             zone_standard=read_zone_std(row, 16, 'zone_standard'),
         )
 
@@ -230,7 +235,7 @@ class Legacy1990Format(AbstractFormatFactory):
         return t.SaleDataFileSummary(
             position=pos,
             file_path=self.file_path,
-            parent=a_record,
+            parent_position=_position_of(a_record),
             total_records=read_int(row, 0, 'total_records'),
             total_sale_property_details=read_int(row, 1, 'total_sale_property_details'),
 
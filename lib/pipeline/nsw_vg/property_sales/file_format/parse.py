@@ -10,12 +10,14 @@ from lib.service.io import IoService
 
 from .factories import AbstractFormatFactory
 from .syntax import get_columns_and_syntax, Syntax
-from .text_source import AbstractTextSource
+from .text_source import AbstractTextSource, ZipMemberTextSource
+from .tokenizer import RecordTokenizer
 
 class PropertySalesRowParserFactory:
     Source: Type[AbstractTextSource]
     chunk_size: int
     _io: IoService
+    _archive_reads: Dict[Tuple[str, Tuple[str, ...], Tuple[str, ...]], asyncio.Task[Dict[str, bytes]]]
 
     def __init__(self: Self,
                  io: IoService,
@@ -24,6 +26,7 @@ class PropertySalesRowParserFactory:
         self._io = io
         self.Source = Source
         self.chunk_size = chunk_size
+        self._archive_reads = {}
 
     async def create_parser(self: Self, file_data: PropertySaleDatFileMetaData) -> 'PropertySalesParser':
         date = file_data.download_date
@@ -32,14 +35,42 @@ class PropertySalesRowParserFactory:
 
         Factory, syntax = get_columns_and_syntax(date, year)
         factory = Factory.create(year=year, file_path=path)
-        f_path = file_data.file_path
-        source = await self.Source.create(
-            file_data.file_path,
-            self._io,
-            chunk_size=self.chunk_size,
-        )
+        source: AbstractTextSource
+        if file_data.archive_path is None:
+            source = await self.Source.create(
+                file_data.file_path,
+                self._io,
+                chunk_size=self.chunk_size,
+            )
+        else:
+            # files discovered in an archive can only be read from it.
+            source = ZipMemberTextSource(await self._read_archived(file_data), path)
         return PropertySalesParser(file_data, factory, source, syntax)
 
+    async def _read_archived(self: Self, file_data: PropertySaleDatFileMetaData) -> bytes:
+        """
+        The files of a batch (see `archive_batch`) are read from
+        their nested zip by whichever file is parsed first, and the
+        rest are held onto until their file is parsed.
+        """
+        assert file_data.archive_path is not None
+        *parents, name = file_data.archive_members
+        names = file_data.archive_batch or (name,)
+        key = (file_data.archive_path, tuple(parents), names)
+
+        if key not in self._archive_reads:
+            self._archive_reads[key] = asyncio.create_task(self._io.zip_read_nested_batch(
+                file_data.archive_path,
+                tuple(parents),
+                list(names),
+            ))
+
+        batch = await self._archive_reads[key]
+        data = batch.pop(name)
+        if not batch:
+            del self._archive_reads[key]
+        return data
+
 class PropertySalesParser:
     file_data: PropertySaleDatFileMetaData
     constructors: AbstractFormatFactory
@@ -49,6 +80,7 @@ class PropertySalesParser:
 
     __last_row: str = ''
     _index: int = 0
+    _batch_size: int = 512
     _logger = getLogger(f'{__name__}.PropertySalesParser')
 
     def __init__(self: Self,
@@ -102,8 +134,32 @@ class PropertySalesParser:
             self._logger.error(f'Remaining: {await self.remaining()}')
             self._logger.exception(e)
             raise e
+        finally:
+            self._source.close()
 
     async def get_rows(self: Self) -> AsyncIterator[Tuple[int, str | None, str, List[str]]]:
+        contents = self._source.contents()
+        if contents is None:
+            async for row in self._get_rows_from_source():
+                yield row
+            return
+
+        # When the whole source is in memory the rows can be
+        # tokenized synchronously, which avoids awaiting the
+        # source for every semicolon.
+        tokenizer = RecordTokenizer(contents,
+                                    self._semi_colons,
+                                    self._source.source_name,
+                                    self._index)
+        try:
+            for batch in tokenizer.batches(self._batch_size):
+                for row in batch:
+                    self._index = row[0]
+                    yield row
+        finally:
+            self.__last_row = tokenizer.last_row
+
+    async def _get_rows_from_source(self: Self) -> AsyncIterator[Tuple[int, str | None, str, List[str]]]:
         while self._index < self._source.size():
             position = self._index
             row_s, mode = await self._get_mode()
@@ -29,14 +29,26 @@ async def test_end_to_end(file_name: str,
     file_path = f'./_fixtures/{file_name}'
     file_size = await io.f_size(file_path)
     file_data = PropertySaleDatFileMetaData(file_path=file_path, published_year=published_year, download_date=download_date, size=file_size)
+    m_factory = PropertySalesRowParserFactory(io, MmapTextSource)
     s_parser = await s_factory.create_parser(file_data)
     b_parser = await b_factory.create_parser(file_data)
+    m_parser = await m_factory.create_parser(file_data)
     s_items = [it async for it in s_parser.get_data_from_file()]
     b_items = [it async for it in b_parser.get_data_from_file()]
+    m_items = [it async for it in m_parser.get_data_from_file()]
 
-    # these differ which is fine
+    # both use byte offsets, so the positions should match
+    assert m_items == b_items
+
+    # these differ which is fine, but each row's parent has to
+    # be the same row, so parents are mapped by the positions.
+    assert len(s_items) == len(b_items)
+    b_position_of = { a.position: b.position for a, b in zip(s_items, b_items) }
     for a, b in zip(s_items, b_items):
         a.position = b.position
+        if hasattr(a, 'parent_position'):
+            assert b_position_of.get(a.parent_position) == b.parent_position
+            a.parent_position = b.parent_position
 
     assert s_items == b_items
 
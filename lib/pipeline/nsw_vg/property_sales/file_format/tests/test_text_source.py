@@ -67,6 +67,12 @@ async def u_buffered_source(mock_unicode_io_service) -> BufferedFileReaderTextSo
         chunk_size=128*2 ** 4,
     )
 
+@pytest.fixture
+async def u_mmap_source(unicode_text: str, tmp_path) -> MmapTextSource:
+    file_path = tmp_path / 'unicode.txt'
+    file_path.write_bytes(unicode_text.encode('utf-8'))
+    return await MmapTextSource.create(str(file_path), IoService.create(None))
+
 @pytest.fixture
 def a_string_source(ascii_text: str):
     return StringTextSource(source_name="in_memory", text=ascii_text)
@@ -146,3 +152,91 @@ async def test_unicode_find(depth: int,
         s_last_index = s_end + 1
         b_last_index = b_end + 1
 
+
+@pytest.mark.asyncio
+async def test_mmap_matches_buffered(u_buffered_source, u_mmap_source):
+    buffered_source = await u_buffered_source
+    mmap_source = await u_mmap_source
+    assert mmap_source.size() == buffered_source.size()
+
+    b_last_index, m_last_index = 0, 0
+    while b_last_index < buffered_source.size():
+        b_end = await buffered_source.find_index(';', b_last_index, b_last_index)
+        m_end = await mmap_source.find_index(';', m_last_index, m_last_index)
+        assert b_end == m_end
+        if b_end == -1:
+            break
+
+        buffered_text = await buffered_source.read(b_last_index, b_end)
+        mmap_text = await mmap_source.read(m_last_index, m_end)
+        assert buffered_text == mmap_text
+        b_last_index, m_last_index = b_end + 1, m_end + 1
+
+    mmap_source.close()
+
+@pytest.mark.asyncio
+async def test_zip_member_source(tmp_path, unicode_text: str):
+    import io
+    from zipfile import ZipFile
+
+    def zip_bytes(name: str, body: bytes) -> bytes:
+        buffer = io.BytesIO()
+        with ZipFile(buffer, 'w') as z:
+            z.writestr(name, body)
+        return buffer.getvalue()
+
+    week = zip_bytes('001_SALES_DATA.DAT', unicode_text.encode('utf-8'))
+    (tmp_path / 'year.zip').write_bytes(zip_bytes('20010107.zip', week))
+
+    io_service = IoService.create(None)
+    members, size = (await io_service.zip_walk(str(tmp_path / 'year.zip')))[0]
+    assert members == ('20010107.zip', '001_SALES_DATA.DAT')
+
+    source = await ZipMemberTextSource.create(
+        'year/20010107/001_SALES_DATA.DAT',
+        io_service,
+        archive_path=str(tmp_path / 'year.zip'),
+        archive_members=members,
+    )
+    assert source.size() == size
+    assert await source.read(0, source.size()) == unicode_text
+
+@pytest.mark.asyncio
+async def test_archive_batch_is_read_once(tmp_path):
+    import io
+    from zipfile import ZipFile
+
+    from lib.pipeline.nsw_vg.property_sales import PropertySaleDatFileMetaData
+    from ..parse import PropertySalesRowParserFactory
+
+    def zip_bytes(files: dict[str, bytes]) -> bytes:
+        buffer = io.BytesIO()
+        with ZipFile(buffer, 'w') as z:
+            for name, body in files.items():
+                z.writestr(name, body)
+        return buffer.getvalue()
+
+    week = zip_bytes({ 'a.DAT': b'A;a;', 'b.DAT': b'A;b;' })
+    (tmp_path / 'year.zip').write_bytes(zip_bytes({ '20010107.zip': week }))
+
+    io_service = IoService.create(None)
+    read_batch = AsyncMock(wraps=io_service.zip_read_nested_batch)
+    io_service.zip_read_nested_batch = read_batch # type: ignore
+    factory = PropertySalesRowParserFactory(io_service, MmapTextSource)
+
+    await asyncio.gather(*[
+        factory.create_parser(PropertySaleDatFileMetaData(
+            file_path=f'year/20010107/{name}',
+            published_year=2001,
+            download_date=None,
+            size=4,
+            archive_path=str(tmp_path / 'year.zip'),
+            archive_members=('20010107.zip', name),
+            archive_batch=('a.DAT', 'b.DAT'),
+        ))
+        for name in ['a.DAT', 'b.DAT']
+    ])
+
+    read_batch.assert_awaited_once_with(str(tmp_path / 'year.zip'), ('20010107.zip',), ['a.DAT', 'b.DAT'])
+    batch = await read_batch(str(tmp_path / 'year.zip'), ('20010107.zip',), ['a.DAT', 'b.DAT'])
+    assert batch == { 'a.DAT': b'A;a;', 'b.DAT': b'A;b;' }
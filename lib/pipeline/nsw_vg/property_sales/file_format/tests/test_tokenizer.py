@@ -0,0 +1,40 @@
+import pytest
+
+from ..syntax import SYNTAX_2001_07
+from ..tokenizer import RecordTokenizer
+
+_text = (
+    'A;136;20010720 09:50;PDANN;\n'
+    'C;136;1328274;1;20010720 09:50;118//13421;\n'
+    'C;136;1328274;20010720 09:50;118//13421;\n'
+    'D;136;1328274;1;20010720 09:50;P;;;;;;\n'
+    'Z;1;2;3;4;\n'
+)
+
+@pytest.mark.parametrize("data", [_text, _text.encode('utf-8')])
+def test_variants(data):
+    tokenizer = RecordTokenizer(data, SYNTAX_2001_07, 'test')
+    rows = list(tokenizer.rows())
+
+    assert [(kind, variant) for _, variant, kind, _ in rows] == [
+        ('A', None),
+        ('C', None),
+        ('C', 'missing_property_id'),
+        ('D', None),
+        ('Z', None),
+    ]
+    assert rows[1][3] == ['136', '1328274', '1', '20010720 09:50', '118//13421']
+    assert rows[2][3] == ['136', '1328274', '20010720 09:50', '118//13421']
+    assert [pos for pos, _, _, _ in rows] == [
+        _text.index(line) for line in _text.splitlines()
+    ]
+
+def test_batches():
+    tokenizer = RecordTokenizer(_text, SYNTAX_2001_07, 'test')
+    batches = list(tokenizer.batches(2))
+    assert [len(b) for b in batches] == [2, 2, 1]
+
+def test_unexpected_mode():
+    tokenizer = RecordTokenizer('A;1;2;3;\nQ;1;\n', SYNTAX_2001_07, 'test')
+    with pytest.raises(ValueError, match='Unexpected mode'):
+        list(tokenizer.rows())
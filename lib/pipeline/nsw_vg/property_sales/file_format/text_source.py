@@ -1,4 +1,5 @@
 import abc
+import mmap
 from typing import Self
 
 from lib.service.io import IoService
@@ -25,6 +26,16 @@ class AbstractTextSource(abc.ABC):
     async def find_index(self, search: str, offset: int, retained_index: int) -> int:
         pass
 
+    def contents(self) -> str | bytes | mmap.mmap | None:
+        """
+        The whole source if it's already in memory (or mapped
+        into memory), which allows it to be read synchronously.
+        """
+        return None
+
+    def close(self) -> None:
+        pass
+
 class StringTextSource(AbstractTextSource):
     _text: str
     _source_name: str
@@ -46,6 +57,9 @@ class StringTextSource(AbstractTextSource):
     async def find_index(self: Self, search: str, offset: int, retained_index: int) -> int:
         return self._text.find(';', offset)
 
+    def contents(self: Self) -> str:
+        return self._text
+
     @classmethod
     async def create(cls, file_path: str, io_service: IoService, **kwargs):
         text = await io_service.f_read(file_path)
@@ -174,3 +188,64 @@ class BufferedFileReaderTextSource(AbstractTextSource):
         except UnicodeDecodeError as e:
             return b'' if e.start == 0 else buffer[:e.start]
 
+
+class MmapTextSource(AbstractTextSource):
+    """
+    Memory maps the file, so reads and searches are slices and
+    finds on the mapped bytes, leaving the OS to page the file
+    in. Unlike the buffered reader there is no file opened and
+    no thread hop each time more of the file is needed.
+
+    Like the buffered reader, indexes are byte offsets.
+    """
+    _data: bytes | mmap.mmap
+    _file_path: str
+
+    def __init__(self, data: bytes | mmap.mmap, file_path: str) -> None:
+        self._data = data
+        self._file_path = file_path
+
+    @property
+    def source_name(self) -> str:
+        return self._file_path
+
+    def size(self) -> int:
+        return len(self._data)
+
+    async def read(self, start: int, end: int) -> str:
+        return self._data[start:end].decode('utf-8')
+
+    async def find_index(self, search: str, offset: int, retained_index: int) -> int:
+        return self._data.find(search.encode('utf-8'), offset)
+
+    def contents(self) -> bytes | mmap.mmap:
+        return self._data
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    @classmethod
+    async def create(cls,
+                     file_path: str,
+                     io_service: IoService,
+                     **kwargs) -> "MmapTextSource":
+        # empty files can't be mapped
+        if await io_service.f_size(file_path) == 0:
+            return cls(b'', file_path)
+        return cls(await io_service.f_mmap(file_path), file_path)
+
+class ZipMemberTextSource(MmapTextSource):
+    """
+    Reads a file within a zip (or within a zip nested in that
+    zip) into memory, so it never has to be extracted to disk.
+    Otherwise it's the same as the memory mapped source.
+    """
+
+    @classmethod
+    async def create(cls,
+                     file_path: str,
+                     io_service: IoService,
+                     **kwargs) -> "ZipMemberTextSource":
+        data = await io_service.zip_read_nested(kwargs['archive_path'], kwargs['archive_members'])
+        return cls(data, file_path)
@@ -0,0 +1,116 @@
+import mmap
+from typing import Dict, Iterator, List, Optional, Self, Tuple
+
+from .syntax import Syntax
+
+# The position, variant, kind & fields of a record.
+Row = Tuple[int, str | None, str, List[str]]
+
+# Anything that can be searched and sliced, so a string,
+# bytes or a memory mapped file. Positions of rows are
+# indexes into this, so bytes will have byte offsets.
+Searchable = str | bytes | mmap.mmap
+
+class RecordTokenizer:
+    """
+    Splits text already in memory (or mapped into memory)
+    into records synchronously, without going through the
+    async interface of a text source for every semicolon.
+
+    This follows the same rules as the `PropertySalesParser`,
+    in particular when a kind of record has more than one
+    variant, the variant with the most semicolons is used,
+    unless the field that would be the end of a shorter
+    variant spans onto the next line.
+    """
+    index: int
+    last_row: str = ''
+
+    def __init__(self: Self,
+                 data: Searchable,
+                 syntax: Syntax,
+                 source_name: str,
+                 index: int = 0) -> None:
+        self.index = index
+        self._data = data
+        self._source_name = source_name
+        self._is_text = isinstance(data, str)
+        self._sep = ';' if self._is_text else b';'
+        self._variants: Dict[str, List[Tuple[int, Optional[str]]]] = {
+            kind: sorted(count, reverse=True) if isinstance(count, list) else [(count, None)]
+            for kind, count in syntax.items()
+        }
+
+    def batches(self: Self, batch_size: int) -> Iterator[List[Row]]:
+        batch: List[Row] = []
+        for row in self.rows():
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def rows(self: Self) -> Iterator[Row]:
+        size = len(self._data)
+        while self.index < size:
+            position = self.index
+            mode_end = self._find_nth_semicolon(position, 1)
+            mode = self._decode(position, mode_end).strip()
+
+            if mode not in self._variants:
+                raise ValueError(f'Unexpected mode: "{mode}"@{position}, ' \
+                                 f'last row: "{self.last_row}", ' \
+                                 f'source: {self._source_name}')
+
+            variant, row_end, row = self._row_body(mode, mode_end)
+            yield position, variant, mode, row
+
+            if mode == 'Z':
+                break
+
+            self.index = row_end + 2
+
+    def _row_body(self: Self, mode: str, mode_end: int) -> Tuple[str | None, int, List[str]]:
+        variants = self._variants[mode]
+        for i, (sc_count, variant) in enumerate(variants):
+            row_end = self._find_nth_semicolon(mode_end + 1, sc_count - 1)
+
+            if row_end == -1:
+                raise ValueError(
+                    f'Unexpected end of data: "{mode}"@{self.index}, ' \
+                    f'last row: "{self.last_row}", ' \
+                    f'source: {self._source_name}'
+                )
+
+            row_s = self._decode(mode_end + 1, row_end)
+            row = row_s.split(';')
+
+            if i+1 == len(variants):
+                break
+
+            sc_count_next, _ = variants[i+1]
+            if '\n' not in row[sc_count_next - 1]:
+                break
+        else:
+            raise ValueError(f'No iteration occurred when parsing {mode}')
+
+        self.last_row = row_s
+        return variant, row_end, row
+
+    def _find_nth_semicolon(self: Self, start: int, n: int) -> int:
+        if n == 0:
+            return start - 1
+
+        find, sep = self._data.find, self._sep
+        found_index = start - 1
+        for _ in range(n):
+            found_index = find(sep, found_index + 1) # type: ignore
+            if found_index == -1:
+                return -1
+        return found_index
+
+    def _decode(self: Self, start: int, end: int) -> str:
+        if self._is_text:
+            return self._data[start:end] # type: ignore
+        return self._data[start:end].decode('utf-8') # type: ignore
@@ -0,0 +1,48 @@
+from operator import attrgetter
+from typing import Any, Callable, Iterator, List, Self, Tuple, Type
+
+from lib.pipeline.nsw_vg.property_sales import data as t
+
+class RowBatch:
+    """
+    The values of queued rows of a single type, stored by column
+    rather than holding onto the rows themselves. Each row is
+    taken apart as it's queued, so once queued the row can be
+    freed, and the batch only holds the values that will be
+    written to the database.
+    """
+    kind: Type[t.BasePropertySaleFileRow]
+    columns: List[str]
+    values: List[List[Any]]
+
+    _read: Callable[[t.BasePropertySaleFileRow], Tuple[Any, ...]]
+
+    def __init__(self: Self,
+                 kind: Type[t.BasePropertySaleFileRow],
+                 columns: List[str]) -> None:
+        self.kind = kind
+        self.columns = columns
+        self.values = [[] for _ in columns]
+        self._read = attrgetter(*columns) # type: ignore
+
+    @staticmethod
+    def of(row: t.BasePropertySaleFileRow) -> 'RowBatch':
+        return RowBatch(type(row), row.db_columns())
+
+    def __len__(self: Self) -> int:
+        return len(self.values[0]) if self.values else 0
+
+    def append(self: Self, row: t.BasePropertySaleFileRow) -> None:
+        if type(row) is not self.kind:
+            raise TypeError(f'expected {self.kind.__name__}, got {type(row).__name__}')
+
+        # `attrgetter` with one column returns the value rather than a tuple.
+        row_values = self._read(row) if len(self.columns) > 1 else (self._read(row),)
+        for column, value in zip(self.values, row_values):
+            column.append(value)
+
+    def empty(self: Self) -> 'RowBatch':
+        return RowBatch(self.kind, self.columns)
+
+    def rows(self: Self) -> Iterator[Tuple[Any, ...]]:
+        return zip(*self.values)
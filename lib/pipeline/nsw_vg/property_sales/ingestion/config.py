@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from logging import getLogger
-from typing import List, Self
+from typing import List, Self, Type
 
 from lib.pipeline.nsw_vg.property_sales import data as t
 
@@ -19,6 +19,7 @@ class IngestionTableConfig:
     def hydrate(self: Self, schema: str | None) -> 'IngestionTableConfig':
         schema = self.schema if self.schema else schema
         return IngestionTableConfig(table=self.table,
+                                    uniques=self.uniques,
                                     schema=schema)
 
 @dataclass
@@ -31,24 +32,26 @@ class IngestionTableMap:
     d: IngestionTableConfig
 
     def get_config(self: Self, row: t.BasePropertySaleFileRow) -> IngestionTableConfig | None:
-        match row:
-            case t.SaleRecordFile():
-                return self.a
-            case t.SaleRecordFileLegacy():
-                return self.a_legacy
-            case t.SalePropertyDetails():
-                return self.b
-            case t.SalePropertyDetails1990():
-                return self.b_legacy
-            case t.SalePropertyLegalDescription():
-                return self.c
-            case t.SaleParticipant():
-                return self.d
-            case t.SaleDataFileSummary():
-                return None
-            case t.BasePropertySaleFileRow():
-                raise ValueError('this shouldn\'t happen')
-        raise ValueError(f'unknown row, {row}')
+        return self.get_config_for_type(type(row))
+
+    def get_config_for_type(self: Self, kind: Type[t.BasePropertySaleFileRow]) -> IngestionTableConfig | None:
+        if issubclass(kind, t.SaleRecordFile):
+            return self.a
+        elif issubclass(kind, t.SaleRecordFileLegacy):
+            return self.a_legacy
+        elif issubclass(kind, t.SalePropertyDetails):
+            return self.b
+        elif issubclass(kind, t.SalePropertyDetails1990):
+            return self.b_legacy
+        elif issubclass(kind, t.SalePropertyLegalDescription):
+            return self.c
+        elif issubclass(kind, t.SaleParticipant):
+            return self.d
+        elif issubclass(kind, t.SaleDataFileSummary):
+            return None
+        elif issubclass(kind, t.BasePropertySaleFileRow):
+            raise ValueError('this shouldn\'t happen')
+        raise ValueError(f'unknown row type, {kind}')
 
 @dataclass
 class IngestionConfig:
@@ -56,6 +59,9 @@ class IngestionConfig:
     tables: IngestionTableMap
 
     def get_config(self: Self, row: t.BasePropertySaleFileRow) -> IngestionTableConfig:
-        match self.tables.get_config(row):
+        return self.get_config_for_type(type(row))
+
+    def get_config_for_type(self: Self, kind: Type[t.BasePropertySaleFileRow]) -> IngestionTableConfig:
+        match self.tables.get_config_for_type(kind):
             case None: raise ValueError('unexpected row type')
             case conf: return conf.hydrate(schema=self.schema)
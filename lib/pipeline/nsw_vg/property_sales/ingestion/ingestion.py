@@ -1,25 +1,54 @@
 import asyncio
 from asyncio import TaskGroup
+from dataclasses import dataclass
 from logging import getLogger
-from typing import Any, Dict, List, Self, Set, Tuple, Type
+from typing import Any, Dict, List, Optional, Self, Set, Tuple, Type
 
 from lib.service.database import DatabaseService
 from lib.pipeline.nsw_vg.property_sales import data as t
 
+from .batch import RowBatch
 from .config import IngestionConfig, IngestionTableConfig
 
-def insert_queue(conf: IngestionTableConfig, row: t.BasePropertySaleFileRow) -> Tuple[str, List[Any]]:
-    columns = row.db_columns()
+def insert_queue(conf: IngestionTableConfig, columns: List[str]) -> str:
     values_str = ', '.join(['%s'] * len(columns))
     column_str = ', '.join(columns)
-    on_conflict = ''
-    if conf.uniques:
-        on_conflict = f"ON CONFLICT ({','.join(conf.uniques)}) DO NOTHING"
-
-    query = f"INSERT INTO {conf.table_symbol} ({column_str}) VALUES ({values_str}) {on_conflict}"
-    return query, columns
-
-RowBatchState = Dict[Type[t.BasePropertySaleFileRow], List[t.BasePropertySaleFileRow]]
+    return f"INSERT INTO {conf.table_symbol} ({column_str}) VALUES ({values_str}) {_on_conflict(conf)}"
+
+@dataclass(frozen=True)
+class CopyQueries:
+    create_stage: str
+    copy: str
+    insert: str
+
+def copy_queries(conf: IngestionTableConfig, columns: List[str]) -> CopyQueries:
+    """
+    Rows are copied into a temporary staging table, which is
+    then inserted into the actual table, as COPY on its own
+    has no way to skip rows that already exist.
+
+    The staging table is created from a select (rather than
+    `LIKE`) so it has none of the constraints of the table,
+    such as the not null primary key, and its rows are removed
+    on commit so it can be reused by the connection.
+    """
+    column_str = ', '.join(columns)
+    stage = f'pg_temp.{conf.table}_stage'
+    return CopyQueries(
+        create_stage=f"CREATE TEMP TABLE IF NOT EXISTS {stage} ON COMMIT DELETE ROWS AS "
+                     f"SELECT {column_str} FROM {conf.table_symbol} WITH NO DATA",
+        copy=f"COPY {stage} ({column_str}) FROM STDIN",
+        insert=f"INSERT INTO {conf.table_symbol} ({column_str}) "
+               f"SELECT {column_str} FROM {stage} {_on_conflict(conf)}",
+    )
+
+def _on_conflict(conf: IngestionTableConfig) -> str:
+    if not conf.uniques:
+        return ''
+    return f"ON CONFLICT ({','.join(conf.uniques)}) DO NOTHING"
+
+# The batch of each row type, which is created from the first row of that type.
+RowBatchState = Dict[Type[t.BasePropertySaleFileRow], Optional[RowBatch]]
 
 class PropertySalesIngestion:
     _logger = getLogger(f'{__name__}.PropertySalesIngestion')
@@ -50,12 +79,12 @@ class PropertySalesIngestion:
                config: IngestionConfig,
                batch_size: int) -> 'PropertySalesIngestion':
         return PropertySalesIngestion(db, tg, config, batch_size, {
-            t.SaleRecordFileLegacy: [],
-            t.SalePropertyDetails1990: [],
-            t.SaleRecordFile: [],
-            t.SalePropertyDetails: [],
-            t.SalePropertyLegalDescription: [],
-            t.SaleParticipant: [],
+            t.SaleRecordFileLegacy: None,
+            t.SalePropertyDetails1990: None,
+            t.SaleRecordFile: None,
+            t.SalePropertyDetails: None,
+            t.SalePropertyLegalDescription: None,
+            t.SaleParticipant: None,
         })
 
     def abort(self: Self) -> None:
@@ -67,14 +96,13 @@ class PropertySalesIngestion:
 
     async def flush(self: Self) -> int:
         size = 0
-        for t, queued in self._state.items():
-            size += len(queued)
-            if queued:
-                table_conf = self._config.get_config(queued[0])
-                self._dispatch(table_conf, queued)
+        for kind, batch in self._state.items():
+            if batch is None or not len(batch):
+                continue
+            size += len(batch)
+            self._dispatch(batch)
+            self._state[kind] = batch.empty()
 
-
-        self._state = {t: [] for t in self._state.keys()}
         await asyncio.gather(*self._tasks)
         await self._maintain_running()
         return size
@@ -90,22 +118,22 @@ class PropertySalesIngestion:
             self._logger.error(f'state: {list(self._state.keys())}')
             raise ValueError('unexpected row type')
 
-        queued = self._state[type(row)]
-        queued.append(row)
+        batch = self._state[type(row)] or RowBatch.of(row)
+        batch.append(row)
 
-        if len(queued) < self.batch_size:
+        if len(batch) < self.batch_size:
+            self._state[type(row)] = batch
             return 0
 
-        table_conf = self._config.get_config(row)
-
-        self._dispatch(table_conf, queued)
-        self._state[type(row)] = []
+        self._dispatch(batch)
+        self._state[type(row)] = batch.empty()
         return self.batch_size
 
-    def _dispatch(self: Self, c: IngestionTableConfig, q: List[t.BasePropertySaleFileRow]) -> None:
-        sql, columns = insert_queue(c, q[0])
-        values = [[getattr(row, name) for name in columns] for row in q]
-        task = self._tg.create_task(self._worker(sql, values, c.table_symbol))
+    def _dispatch(self: Self, batch: RowBatch) -> None:
+        c = self._config.get_config_for_type(batch.kind)
+        sql = insert_queue(c, batch.columns)
+        values = list(batch.rows())
+        task = self._tg.create_task(self._copy_worker(copy_queries(c, batch.columns), sql, values, c.table_symbol))
         self._tasks.add(task)
 
     async def _maintain_running(self: Self) -> None:
@@ -114,7 +142,25 @@ class PropertySalesIngestion:
         for t in completed:
             await t
 
-    async def _worker(self: Self, sql: str, rows: List[List[str]], name: str):
+    async def _copy_worker(self: Self,
+                           queries: CopyQueries,
+                           sql: str,
+                           rows: List[Tuple[Any, ...]],
+                           name: str):
+        try:
+            async with self._db.async_connect() as c, c.cursor() as cursor:
+                await cursor.execute(queries.create_stage)
+                async with cursor.copy(queries.copy) as copy:
+                    for row in rows:
+                        await copy.write_row(row)
+                await cursor.execute(queries.insert)
+            self._logger.debug(f'copied {len(rows)} for {name}')
+        except Exception as e:
+            # the inserts will narrow down what caused the issue
+            self._logger.warning(f'failed to copy into {name}, falling back to inserts, {e}')
+            await self._worker(sql, rows, name)
+
+    async def _worker(self: Self, sql: str, rows: List[Tuple[Any, ...]], name: str):
         try:
             async with self._db.async_connect() as c, c.cursor() as cursor:
                 match len(rows):
@@ -0,0 +1,55 @@
+from datetime import datetime
+import pytest
+
+from lib.pipeline.nsw_vg.property_sales import data as t
+from ..batch import RowBatch
+
+def _participant(position: int, participant: str) -> t.SaleParticipant:
+    return t.SaleParticipant(
+        position=position,
+        file_path='a.dat',
+        parent_position=position - 1,
+        district_code=1,
+        property_id=None,
+        sale_counter=2,
+        date_provided=datetime(2001, 7, 20),
+        participant=participant,
+    )
+
+def test_stores_values_by_column():
+    first, second = _participant(10, 'P'), _participant(20, 'V')
+    batch = RowBatch.of(first)
+    batch.append(first)
+    batch.append(second)
+
+    assert len(batch) == 2
+    assert 'parent_position' not in batch.columns
+    assert batch.values[batch.columns.index('participant')] == ['P', 'V']
+    assert list(batch.rows()) == [
+        tuple(getattr(row, c) for c in batch.columns)
+        for row in [first, second]
+    ]
+
+def test_empty_keeps_columns():
+    batch = RowBatch.of(_participant(10, 'P'))
+    batch.append(_participant(10, 'P'))
+    empty = batch.empty()
+    assert len(empty) == 0
+    assert empty.columns == batch.columns
+
+def test_rejects_other_row_types():
+    batch = RowBatch.of(_participant(10, 'P'))
+    summary = t.SaleDataFileSummary(
+        position=30,
+        file_path='a.dat',
+        parent_position=0,
+        total_records=1,
+        total_sale_property_details=1,
+        total_sale_property_legal_descriptions=0,
+        total_sale_participants=1,
+    )
+    with pytest.raises(TypeError):
+        batch.append(summary)
+
+def test_rows_are_slotted():
+    assert not hasattr(_participant(10, 'P'), '__dict__')
@@ -0,0 +1,33 @@
+from lib.pipeline.nsw_vg.property_sales import data as t
+
+from ..config import IngestionTableConfig
+from ..defaults import NSW_VG_PS_INGESTION_CONFIG
+from ..ingestion import copy_queries, insert_queue
+
+def test_copy_through_stage():
+    conf = IngestionTableConfig(table='ps_row_b', uniques=['file_path', 'position'], schema='nsw_vg_raw')
+    queries = copy_queries(conf, ['file_path', 'position', 'x'])
+    assert queries.create_stage == (
+        'CREATE TEMP TABLE IF NOT EXISTS pg_temp.ps_row_b_stage ON COMMIT DELETE ROWS AS '
+        'SELECT file_path, position, x FROM nsw_vg_raw.ps_row_b WITH NO DATA'
+    )
+    assert queries.copy == 'COPY pg_temp.ps_row_b_stage (file_path, position, x) FROM STDIN'
+    assert queries.insert == (
+        'INSERT INTO nsw_vg_raw.ps_row_b (file_path, position, x) '
+        'SELECT file_path, position, x FROM pg_temp.ps_row_b_stage '
+        'ON CONFLICT (file_path,position) DO NOTHING'
+    )
+
+def test_copy_without_uniques():
+    queries = copy_queries(IngestionTableConfig(table='t'), ['a'])
+    assert queries.insert.startswith('INSERT INTO t (a) SELECT a FROM pg_temp.t_stage')
+    assert 'ON CONFLICT' not in queries.insert
+
+def test_hydrate_keeps_uniques():
+    conf = NSW_VG_PS_INGESTION_CONFIG.get_config_for_type(t.SalePropertyDetails)
+    assert conf.table_symbol == 'nsw_vg_raw.ps_row_b'
+    assert conf.uniques == ['file_path', 'position']
+    assert insert_queue(conf, ['file_path', 'position']) == (
+        'INSERT INTO nsw_vg_raw.ps_row_b (file_path, position) VALUES (%s, %s) '
+        'ON CONFLICT (file_path,position) DO NOTHING'
+    )
@@ -16,6 +16,13 @@ class NswVgPsiSupervisorConfig:
     download_min: Optional[date]
     download_max: Optional[date]
 
+    """
+    When set, the DAT files are read straight from the downloaded
+    zips in this directory, rather than found in `target_root_dir`
+    which requires every nested zip to be extracted first.
+    """
+    archive_root_dir: Optional[str] = field(default=None)
+
     def valid_download_date(self: Self, maybe_dt: Optional[datetime]) -> bool:
         if maybe_dt is None:
             return self.download_min is None and self.download_max is None
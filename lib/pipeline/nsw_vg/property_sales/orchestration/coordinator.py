@@ -1,11 +1,13 @@
 import asyncio
 from asyncio import TaskGroup
+from dataclasses import replace
 from datetime import datetime
 from logging import getLogger
 import multiprocessing
+import os
 import queue
 import re
-from typing import Any, Coroutine, List, Self, Tuple, Optional, TypeVar
+from typing import Any, Coroutine, Dict, List, Self, Tuple, Optional, TypeVar
 
 from lib.pipeline.nsw_vg.discovery import NswVgTarget
 from lib.pipeline.nsw_vg.property_sales.data import PropertySaleDatFileMetaData
@@ -48,12 +50,22 @@ class NswVgPsIngestionCoordinator:
         m_task = self._t(self._listen_to_children())
         try:
             q_task, queue = self._file_queue(targets)
+            batches: Dict[Tuple[str, Tuple[str, ...]], NswVgPsChildClient] = {}
             while True:
                 file = await self._t(queue.get())
                 if file is None:
                     break
 
-                self._find_next_child().parse(file)
+                if file.archive_path is None:
+                    self._find_next_child().parse(file)
+                    continue
+
+                # files in the same nested zip are read together,
+                # so they need to be parsed by the same child.
+                key = (file.archive_path, file.archive_members[:-1])
+                if key not in batches:
+                    batches[key] = self._find_next_child()
+                batches[key].parse(file)
 
             await asyncio.gather(q_task, *[
                 self._t(c.wait_till_done())
@@ -107,11 +119,43 @@ class NswVgPsIngestionCoordinator:
                 return
 
             zip_path =  f'{self.config.target_root_dir}/{t.zip_dst}'
+            if self.config.archive_root_dir is not None:
+                return await find_archived_files(t, zip_path)
+
             async for path in self._io.grep_dir(zip_path, '*.DAT'):
                 download_date = get_download_date(path)
                 if self.config.valid_download_date(download_date):
                     tasks.append(self._t(queue_task(t, path)))
 
+        async def find_archived_files(t: NswVgTarget, zip_path: str):
+            archive_path = f'{self.config.archive_root_dir}/{t.web_dst}'
+            batches: Dict[Tuple[str, ...], List[PropertySaleDatFileMetaData]] = {}
+            for members, size in await self._t(self._io.zip_walk(archive_path)):
+                *zips, name = members
+                if not name.endswith('.DAT') or name.endswith('-checkpoint.DAT'):
+                    continue
+
+                # the path is the same as if the zip was extracted,
+                # so the rows have the same file path either way.
+                path = '/'.join([zip_path, *(os.path.splitext(z)[0] for z in zips), name])
+                download_date = get_download_date(path)
+                if not self.config.valid_download_date(download_date):
+                    continue
+
+                batches.setdefault(tuple(zips), []).append(PropertySaleDatFileMetaData(
+                    file_path=path,
+                    published_year=t.datetime.year,
+                    download_date=download_date,
+                    size=size,
+                    archive_path=archive_path,
+                    archive_members=members,
+                ))
+
+            for files in batches.values():
+                names = tuple(f.archive_members[-1] for f in files)
+                for file in files:
+                    await queue.put(replace(file, archive_batch=names))
+
         async def queue_task(t: NswVgTarget, path: str):
             if path.endswith('-checkpoint.DAT'):
                 return
@@ -1,16 +1,38 @@
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, Callable, Generic, Self, List, TypeVar, Optional, Protocol
 
 from .zoning import ZoningKind
 
-def parse_datetime(date_str):
+# A file has millions of date fields but only a few thousand
+# distinct dates, and datetimes are immutable, so each distinct
+# string is only parsed once. The caches are bounded so a file
+# with unusually many distinct values can't grow them forever.
+_DATE_CACHE_SIZE = 2 ** 14
+
+@lru_cache(maxsize=_DATE_CACHE_SIZE)
+def parse_datetime(date_str: str) -> datetime:
+    # YYYYMMDD HH:MM
+    if len(date_str) == 14 and date_str[8] == ' ' and date_str[11] == ':' \
+            and date_str[:8].isdigit() and date_str[9:11].isdigit() and date_str[12:].isdigit():
+        return datetime(int(date_str[:4]), int(date_str[4:6]), int(date_str[6:8]),
+                        int(date_str[9:11]), int(date_str[12:]))
     return datetime.strptime(date_str, "%Y%m%d %H:%M")
 
-def parse_date(date_str):
+@lru_cache(maxsize=_DATE_CACHE_SIZE)
+def parse_date(date_str: str) -> datetime:
+    # YYYYMMDD
+    if len(date_str) == 8 and date_str.isdigit():
+        return datetime(int(date_str[:4]), int(date_str[4:6]), int(date_str[6:]))
     return datetime.strptime(date_str, "%Y%m%d")
 
-def parse_date_pre_2002(date_str):
+@lru_cache(maxsize=_DATE_CACHE_SIZE)
+def parse_date_pre_2002(date_str: str) -> datetime:
+    # DD/MM/YYYY
+    if len(date_str) == 10 and date_str[2] == '/' and date_str[5] == '/' \
+            and date_str[:2].isdigit() and date_str[3:5].isdigit() and date_str[6:].isdigit():
+        return datetime(int(date_str[6:]), int(date_str[3:5]), int(date_str[:2]))
     return datetime.strptime(date_str, "%d/%m/%Y")
 
 T = TypeVar("T")
@@ -21,27 +43,29 @@ class Row(Protocol[K, V]):
     def __getitem__(self, key: K) -> V:
         pass
 
+_LEGACY_ZONES = frozenset([
+    'A', 'B', 'C', 'D', 'E',
+    'I', 'M', 'N', 'O', 'P',
+    'R', 'S', 'T', 'U', 'V',
+    'W', 'X', 'Y', 'Z',
+])
+
+_EPAA_ZONE_PREFIXES = (
+    'IN', 'MU', 'RE', 'RU', 'SP',
+    'B', 'C', 'E', 'R', 'W',
+)
+
 def read_zone_std(row: Row[K, str], idx: K, name: str) -> ZoningKind | None:
     if not row[idx]:
         return None
+    return parse_zone_std(row[idx])
 
-    legacy_zone = [
-        'A', 'B', 'C', 'D', 'E',
-        'I', 'M', 'N', 'O', 'P',
-        'R', 'S', 'T', 'U', 'V',
-        'W', 'X', 'Y', 'Z',
-    ]
-
-    col = row[idx]
-    if col in legacy_zone:
+@lru_cache(maxsize=2 ** 10)
+def parse_zone_std(col: str) -> ZoningKind:
+    if col in _LEGACY_ZONES:
         return 'legacy_vg_2011'
 
-    epaa_zone_prefixes = [
-        'IN', 'MU', 'RE', 'RU', 'SP',
-        'B', 'C', 'E', 'R', 'W',
-    ]
-
-    for p in epaa_zone_prefixes:
+    for p in _EPAA_ZONE_PREFIXES:
         if len(col) != len(p)+1:
             continue
         if not col.startswith(p):
@@ -69,13 +93,19 @@ def mk_read_optional(f: Callable[[Row[K, str], K, str], T]) -> Callable[[Row[K,
             return f(row, idx, name)
     return impl
 
-@dataclass
+@dataclass(frozen=True)
 class StrCheck:
+    """
+    These are immutable so a check can be created once and
+    reused for every row, rather than once per field read.
+    """
     min_len: int | None = field(default=None)
     max_len: int | None = field(default=None)
 
-    def read_optional(self, *args, **kwargs) -> str | None:
-        return mk_read_optional(self.read)(*args, **kwargs)
+    def read_optional(self, row: Row[K, str], idx: K, name: str) -> str | None:
+        if row[idx] == '':
+            return None
+        return self.read(row, idx, name)
 
     def read(self, row: Row[K, str], idx: K, name: str) -> str:
         if not row[idx]:
@@ -146,3 +176,5 @@ read_optional_date = mk_read_optional(read_date)
 read_optional_datetime = mk_read_optional(read_datetime)
 read_optional_date_pre_2002 = mk_read_optional(read_date_pre_2002)
 
+zone_code_3 = StrCheck(max_len=3)
+zone_code_4 = StrCheck(max_len=4)
@@ -0,0 +1,79 @@
+"""
+A micro-benchmark of decoding the fields of property sale rows,
+it isn't collected by pytest, run it with:
+
+    python -m lib.pipeline.nsw_vg.raw_data.tests.bench_rows
+
+It builds a synthetic DAT file about the size of a year of
+sales, tokenizes it, then times creating the B records with
+the factory, and the dates of those records both with the
+decoders in `rows` and with `strptime`.
+"""
+from datetime import datetime, timedelta
+import random
+from time import perf_counter
+from typing import Callable, List
+
+from lib.pipeline.nsw_vg.property_sales.file_format.factories import CurrentFormatFactory
+from lib.pipeline.nsw_vg.property_sales.file_format.syntax import SYNTAX_2012
+from lib.pipeline.nsw_vg.property_sales.file_format.tokenizer import RecordTokenizer
+from lib.pipeline.nsw_vg.raw_data import rows
+
+_ROWS = 200_000
+_ZONES = ['R2', 'R3', 'B4', 'IN1', 'RU1', 'A', 'E2', 'SP2', '']
+
+def synthetic_dat(count: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    start = datetime(2021, 1, 1)
+    lines = ['A;RTSALEDATA;001;20210823 01:03;VALNET;']
+    for i in range(count):
+        provided = start + timedelta(days=rng.randrange(365), minutes=rng.randrange(3) * 7)
+        contract = start + timedelta(days=rng.randrange(365))
+        settled = contract + timedelta(days=rng.randrange(90))
+        lines.append(';'.join([
+            'B', '001', str(1000 + i), str(i % 7), provided.strftime('%Y%m%d %H:%M'),
+            '', '', str(rng.randrange(200)), 'SMITH ST', 'SYDNEY', '2000',
+            f'{rng.randrange(1, 2000)}.5', 'M',
+            contract.strftime('%Y%m%d'), settled.strftime('%Y%m%d'),
+            str(rng.randrange(100_000, 3_000_000)), rng.choice(_ZONES),
+            'R', 'RESIDENCE', '', '', '', '', f'AR{i}', '',
+        ]))
+    lines.append(f'Z;{count + 2};{count};0;0;')
+    return '\n'.join(lines) + '\n'
+
+def _time(label: str, f: Callable[[], object]) -> float:
+    started = perf_counter()
+    f()
+    elapsed = perf_counter() - started
+    print(f'{label:<32} {elapsed:8.3f}s')
+    return elapsed
+
+def main() -> None:
+    text = synthetic_dat(_ROWS)
+    b_rows: List[List[str]] = [
+        row for _, _, kind, row in RecordTokenizer(text, SYNTAX_2012, 'bench').rows()
+        if kind == 'B'
+    ]
+    factory = CurrentFormatFactory(2021, 'bench.dat')
+    datetimes = [row[3] for row in b_rows]
+    dates = [d for row in b_rows for d in (row[12], row[13])]
+
+    print(f'{len(b_rows)} B records, {len(set(datetimes))} distinct datetimes, '
+          f'{len(set(dates))} distinct dates')
+
+    _time('create_b', lambda: [factory.create_b(0, row, None, None) for row in b_rows])
+
+    slow = _time('dates with strptime', lambda: (
+        [datetime.strptime(d, '%Y%m%d %H:%M') for d in datetimes],
+        [datetime.strptime(d, '%Y%m%d') for d in dates],
+    ))
+    rows.parse_datetime.cache_clear()
+    rows.parse_date.cache_clear()
+    fast = _time('dates with rows.parse_*', lambda: (
+        [rows.parse_datetime(d) for d in datetimes],
+        [rows.parse_date(d) for d in dates],
+    ))
+    print(f'{"speed up":<32} {slow / fast:8.1f}x')
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,15 @@
+from datetime import datetime
 import pytest
 
-from ..rows import read_int, read_optional_int, read_zone_std
+from ..rows import (
+    parse_date,
+    parse_date_pre_2002,
+    parse_datetime,
+    read_int,
+    read_optional_int,
+    read_zone_std,
+    zone_code_3,
+)
 
 @pytest.mark.parametrize("code,std", [
     ('A', 'legacy_vg_2011'),
@@ -92,3 +101,33 @@ def test_read_int(row, index, result):
 ])
 def test_read_optional_int(row, index, result):
     assert read_optional_int(row, index, 'blah') == result
+
+@pytest.mark.parametrize("parse,fmt,date_str", [
+    (parse_datetime, "%Y%m%d %H:%M", '20010720 09:50'),
+    (parse_datetime, "%Y%m%d %H:%M", '19991231 23:59'),
+    (parse_date, "%Y%m%d", '20010720'),
+    (parse_date, "%Y%m%d", '20000229'),
+    (parse_date_pre_2002, "%d/%m/%Y", '20/07/2001'),
+    (parse_date_pre_2002, "%d/%m/%Y", '01/01/1990'),
+    # not the usual width, so these fall back to strptime
+    (parse_date_pre_2002, "%d/%m/%Y", '1/1/1990'),
+    (parse_datetime, "%Y%m%d %H:%M", '20010720 9:50'),
+])
+def test_parse_dates_match_strptime(parse, fmt, date_str):
+    assert parse(date_str) == datetime.strptime(date_str, fmt)
+
+@pytest.mark.parametrize("parse,date_str", [
+    (parse_date, '20010230'),
+    (parse_datetime, '20010720 25:00'),
+    (parse_date_pre_2002, '31/02/2001'),
+    (parse_date_pre_2002, 'ab/cd/efgh'),
+])
+def test_parse_dates_reject_invalid(parse, date_str):
+    with pytest.raises(ValueError):
+        parse(date_str)
+
+def test_str_check_read_optional():
+    assert zone_code_3.read_optional([''], 0, 'zone') is None
+    assert zone_code_3.read_optional(['R2'], 0, 'zone') == 'R2'
+    with pytest.raises(Exception, match='too long'):
+        zone_code_3.read_optional(['R2AB'], 0, 'zone')
@@ -14,7 +14,7 @@ class MockClockService(AbstractClockService):
     def now(self):
         return self.dt
 
-    async def sleep(self, ms: int):
+    async def sleep(self, seconds: float):
         return
 
     def tick_time(self, distance: float = 1):
@@ -13,7 +13,7 @@ class AbstractClockService(abc.ABC):
         raise NotImplementedError()
 
     @abc.abstractmethod
-    async def sleep(self, ms: int) -> None:
+    async def sleep(self, seconds: float) -> None:
         raise NotImplementedError()
 
 class ClockService(AbstractClockService):
@@ -27,6 +27,6 @@ class ClockService(AbstractClockService):
     def time(self):
         return time()
 
-    async def sleep(self, seconds: float | int):
+    async def sleep(self, seconds: float):
         await asyncio.sleep(seconds)
 
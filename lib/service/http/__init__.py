@@ -1,3 +1,4 @@
+from .codec import *
 from .client_session import *
 from .middleware import *
 from .util import *
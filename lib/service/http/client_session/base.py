@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, AsyncIterator, AsyncGenerator
+from typing import Dict, AsyncIterator, AsyncGenerator, Mapping
 
 class AbstractClientSession(ABC):
     @abstractmethod
@@ -25,8 +25,21 @@ class AbstractGetResponse(ABC):
     def status(self):
         pass
 
+    @property
+    @abstractmethod
+    def response_headers(self) -> Mapping[str, str]:
+        pass
+
     @abstractmethod
     async def json(self):
+        """
+        Parses the body from its bytes, rather than from the
+        decoded text, see `loads_json`.
+        """
+        pass
+
+    @abstractmethod
+    async def read(self) -> bytes:
         pass
 
     @abstractmethod
@@ -3,6 +3,7 @@ from aiohttp.client_exceptions import ClientConnectorError as ThirdPartyClientCo
 from dataclasses import dataclass, field
 from typing import Any, Optional, Dict, AsyncIterator, AsyncGenerator
 
+from ..codec import loads_json
 from .base import AbstractClientSession, AbstractGetResponse
 
 class ConnectionError(Exception):
@@ -49,12 +50,19 @@ class GetResponse(AbstractGetResponse):
     def status(self):
         return self._response.status
 
+    @property
+    def response_headers(self):
+        return self._response.headers
+
     async def json(self):
-        return await self._response.json()
+        return loads_json(await self._response.read())
 
     async def text(self):
         return await self._response.text()
 
+    async def read(self) -> bytes:
+        return await self._response.read()
+
     async def stream(self, chunk_size: int) -> AsyncGenerator[bytes, None]:
         async for chunk in self._response.content.iter_chunked(chunk_size):
             if chunk:
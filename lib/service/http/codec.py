@@ -0,0 +1,13 @@
+import orjson
+from typing import Any
+
+__all__ = ['loads_json']
+
+def loads_json(data: bytes | str) -> Any:
+    """
+    Parses json straight from the bytes of a response, so the
+    body is never copied into a str first. `orjson` is used
+    instead of the standard library, as it's much faster and
+    builds far fewer intermediate objects.
+    """
+    return orjson.loads(data)
@@ -4,5 +4,5 @@ from .expiry import CacheExpire
 from .expiry import Never as NeverExpire
 from .expiry import Delta as DeltaExpire
 from .expiry import TillNextDayOfWeek as TillNextDayOfWeekExpire
-from .file_cache import FileCacher as HttpLocalCache
+from .file_cache import FileCacher as HttpLocalCache, CacheStats, CacheStorage
 from .headers import InstructionHeaders, CacheHeader
@@ -1,6 +1,6 @@
 import asyncio
 from dataclasses import dataclass, field
-import json
+import zlib
 from logging import getLogger, Logger
 from typing import (
     Any,
@@ -15,7 +15,7 @@ from typing import (
 )
 
 from lib.service.io import IoService
-from lib.service.http import ConnectionError
+from lib.service.http import ConnectionError, loads_json
 from lib.service.http import AbstractClientSession, AbstractGetResponse
 from lib.service.http import ClientSession
 from lib.service.http.util import url_with_params, url_host
@@ -43,12 +43,14 @@ class CachedClientSession(AbstractClientSession):
                session: AbstractClientSession | None):
         session = session or ClientSession.create()
         logger = getLogger(f'{__name__}.CachedGet')
+        in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
         create_get_request: Factory = lambda url, headers, meta: CachedGetResponse(
             _io=io_service,
             _config=(url, headers, meta),
             _logger=logger,
             _session=session,
             _cache=file_cache,
+            _in_flight=in_flight,
         )
         return CachedClientSession(session, file_cache, create_get_request)
 
@@ -91,40 +93,78 @@ class CachedGetResponse(AbstractGetResponse):
     _state: Any = field(default=None)
     _response: Any = field(default=None)
 
+    """
+    The requests currently being fetched by url & format, shared
+    between every response of a session. Identical requests which
+    miss the cache at the same time wait on the first of them,
+    rather than each making the same request and cache write.
+    """
+    _in_flight: Dict[Tuple[str, str], asyncio.Future] = field(default_factory=dict)
+
     @property
     def status(self: Self):
         return self._status
 
+    @property
+    def response_headers(self: Self):
+        # responses read from the cache don't keep their headers
+        return self._response.response_headers if self._response else {}
+
     async def __aenter__(self: Self):
         url, headers, meta = self._config
 
-        state, valid = self._cache.read(url, meta.format)
-        if state is None or not valid:
-            self._response = self._session.get(url, headers=headers)
-            try:
-                response = await self._response.__aenter__()
-                self._status = response.status
-                if self._status == 200:
-                    data = await response.text()
-                    state = await self._cache.write(url, meta, data)
-                elif state is not None:
-                    self._logger.warning(
-                        'request failed, calling back to cache, '
-                        f'status: {self._status}'
-                    )
-                    self._status = 200
-                else:
-                    return response
-
-            except ConnectionError as e:
-                if state:
-                    self._status = 200
-                    self._logger.warning('connection error falling back to cache')
-                else:
-                    self._logger.warning('connection error without cache')
-                    raise e
-        else:
+        state, valid = self._cache.read(url, meta.format, meta.partition)
+        if state is not None and valid:
             self._status = 200
+            self._state = state
+            return self
+
+        key = (url, meta.format)
+        while key in self._in_flight:
+            # an identical request is already being fetched, so
+            # share what it writes to the cache. If it failed,
+            # there's nothing to share so try again.
+            if written := await asyncio.shield(self._in_flight[key]):
+                self._status = 200
+                self._state = written
+                return self
+
+        fetching = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = fetching
+        try:
+            return await self._fetch(state, fetching)
+        finally:
+            del self._in_flight[key]
+            if not fetching.done():
+                fetching.set_result(None)
+
+    async def _fetch(self: Self, state: Any, fetching: asyncio.Future):
+        url, headers, meta = self._config
+
+        self._response = self._session.get(url, headers=headers)
+        try:
+            response = await self._response.__aenter__()
+            self._status = response.status
+            if self._status == 200:
+                data = await response.text()
+                state = await self._cache.write(url, meta, data)
+                fetching.set_result(state)
+            elif state is not None:
+                self._logger.warning(
+                    'request failed, calling back to cache, '
+                    f'status: {self._status}'
+                )
+                self._status = 200
+            else:
+                return response
+
+        except ConnectionError as e:
+            if state:
+                self._status = 200
+                self._logger.warning('connection error falling back to cache')
+            else:
+                self._logger.warning('connection error without cache')
+                raise e
 
         self._state = state
         return self
@@ -138,17 +178,51 @@ class CachedGetResponse(AbstractGetResponse):
         if 'json' not in self._state:
             raise ValueError('Incorrect cache hint')
 
-        return json.loads(await self._io.f_read(self._state['json'].location))
+        return loads_json(await self._read_bytes(self._state['json']))
 
     async def stream(self: Self, chunk_size: int):
         _, _, instructions = self._config
-        f_loc = self._state['json'].location[instructions.format]
-        async for chunk in self._io.f_read_chunks(f_loc, chunk_size):
-            yield chunk
+        if instructions.format not in self._state:
+            raise ValueError('Incorrect cache hint')
+
+        cache: RequestCache = self._state[instructions.format]
+        chunks = self._io.f_read_chunks(cache.location, chunk_size)
+        if not cache.compressed:
+            async for chunk in chunks:
+                yield chunk
+            return
+
+        decompressor = zlib.decompressobj(wbits=_GZIP_WBITS)
+        async for chunk in chunks:
+            if data := decompressor.decompress(chunk):
+                yield data
+        if data := decompressor.flush():
+            yield data
 
     async def text(self: Self):
         if 'text' not in self._state:
             raise ValueError('Incorrect cache hint')
 
-        return await self._io.f_read(self._state['text'].location)
+        return await self._read_text(self._state['text'])
+
+    async def read(self: Self) -> bytes:
+        _, _, instructions = self._config
+        if instructions.format not in self._state:
+            raise ValueError('Incorrect cache hint')
+
+        return await self._read_bytes(self._state[instructions.format])
+
+    async def _read_text(self: Self, cache: RequestCache) -> str:
+        if not cache.compressed:
+            return await self._io.f_read(cache.location)
+        return (await self._read_bytes(cache)).decode('utf-8')
+
+    async def _read_bytes(self: Self, cache: RequestCache) -> bytes:
+        data = await self._io.f_read_bytes(cache.location)
+        if not cache.compressed:
+            return data
+        return await asyncio.to_thread(zlib.decompress, data, _GZIP_WBITS)
+
+# tells zlib to expect a gzip header & trailer.
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
 
@@ -1,3 +1,5 @@
-CACHE_VERSION = 1
+CACHE_VERSION = 2
 
-STATE_INIT = '{"version": %s, "files": {}}' % CACHE_VERSION
+# The version of the json cache state, which
+# is migrated into the index when it's found.
+LEGACY_CACHE_VERSION = 1
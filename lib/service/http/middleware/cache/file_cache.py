@@ -1,83 +1,113 @@
-import aiofiles
 import asyncio
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
+import gzip
+import hashlib
 from logging import getLogger
 import json
 import os
-from typing import Any, Dict, List, Optional, Self
+from typing import Any, Dict, List, Literal, Optional, Self
 
 from lib.service.clock import ClockService
 from lib.service.io import IoService
 from lib.service.uuid import UuidService
 from lib.utility.concurrent import PartitionLock
-from .constants import STATE_INIT, CACHE_VERSION
+from .constants import CACHE_VERSION, LEGACY_CACHE_VERSION
 from .expiry import CacheExpire
 from .headers import InstructionHeaders
+from .index import CacheIndex, IndexEntry
 
-# Explaination of keys and their values
+# How the body of a response is stored.
 #
-#  1. Key One. The value of this key will be a file path
-#     and the value of this key will be a dictorary of
-#     file formats. It's more than likely just one file
-#     format.
-#  2. Key Two. This is going to be a file format, the
-#     value assocatied with it will be state.
-#  3. Key Three. Each key at this level represents a
-#     property name and the value associated with it
-#     will be the value of the property in an unparsed
-#     state.
+# - plain: as is, in a file with a unique name.
+# - compressed: gzip compressed, in a file named after a hash
+#   of the body, so identical responses share the same file.
 #
-# Key 1 -------------------------┐
-# Key 2 ---------------┐         |
-# Key 3 -----┐         |         |
-#            ↓         ↓         ↓
-State = Dict[str, Dict[str, Dict[str, str]]]
+CacheStorage = Literal['plain', 'compressed']
+
+COMPRESSED_EXT = 'gz'
 
 class FileCacher:
+    """
+    Caches responses as files in `save_dir`, the metadata of
+    the cached responses (where the file is, when it expires)
+    is stored in a `CacheIndex` at `index_path`.
+
+    Before the index existed this metadata was stored in a
+    single json file (`legacy_state_path`), if that exists
+    and the index doesn't, it'll be migrated to the index.
+
+    The entries are loaded from the index once, and held in
+    memory already parsed, they're only serialised when they
+    are written to the index.
+
+    With `compressed` storage more than one entry can point to
+    the same file, so a file is only deleted once nothing else
+    in the index refers to it. Either kind of file can be read
+    regardless of the storage used to write new entries.
+    """
     _logger = getLogger(__name__)
+    _entries: Dict[str, Dict[str, 'RequestCache']] | None = None
+    _refs: Dict[str, int]
+    _stats: Dict[str, 'CacheStats']
 
     def __init__(self,
                  save_dir: str,
-                 config_path: str,
+                 index_path: str,
+                 legacy_state_path: str,
                  rc_factory: 'RequestCacheFactory',
                  io: IoService,
                  uuid: UuidService,
                  clock: ClockService,
-                 state: State | None = None):
+                 index: CacheIndex | None = None,
+                 storage: CacheStorage = 'plain'):
         self._save_dir = save_dir
-        self._config_path = config_path
-        self._state = state
+        self._index_path = index_path
+        self._legacy_state_path = legacy_state_path
+        self._index = index
         self._io = io
         self._lock = PartitionLock()
         self._uuid = uuid
         self._clock = clock
         self._rc_factory = rc_factory
+        self._storage = storage
+        self._refs = {}
+        self._stats = {}
 
-    def read(self: Self, url: str, fmt: str):
+    def read(self: Self, url: str, fmt: str, partition: Optional[str] = None):
         """
         No need to use partition lock, as this can syncronously
         check if it should just stop.
         """
 
-        if self._state is None:
-            raise ValueError('write occured while state was not initialised')
-
-        if url not in self._state:
-            return None, False
+        if self._entries is None:
+            raise ValueError('read occured while index was not initialised')
 
-        if fmt not in self._state[url]:
+        stats = self._stats_for(partition)
+        state = self._entries.get(url)
+        if state is None or fmt not in state:
+            stats.misses += 1
             return None, False
 
-        now = self._clock.now()
-        state = self.parse_state(self._state, url)
-        cache_found = state and fmt in state
-        cache_expired = cache_found and state[fmt].has_expired(now)
+        valid = not state[fmt].has_expired(self._clock.now())
+        if valid:
+            stats.hits += 1
+        else:
+            stats.expired += 1
+        return state, valid
 
-        if cache_found:
-            return state, not cache_expired
+    def stats(self: Self) -> Dict[str, 'CacheStats']:
+        """
+        The hits, misses & expired reads for each partition.
+        """
+        return { p: CacheStats(s.hits, s.misses, s.expired) for p, s in self._stats.items() }
 
-        return None, False
+    def _stats_for(self: Self, partition: Optional[str]) -> 'CacheStats':
+        key = partition or '?'
+        if key not in self._stats:
+            self._stats[key] = CacheStats()
+        return self._stats[key]
 
     async def forget_by_clause(
         self: Self,
@@ -85,30 +115,23 @@ class FileCacher:
         partition: str,
     ):
         async with self._lock.whole_partition_access(partition):
-            if self._state is None:
+            if self._index is None or self._entries is None:
                 return
 
-            url_to_rm: List[str] = []
-            locations: List[str] = []
-            for url, value in self._state.items():
-                if any([c not in url for c in clauses]):
-                    continue
-
-                for fmt in self.parse_state(self._state, url).values():
-                    locations.append(fmt.location)
-                url_to_rm.append(url)
+            matches = self._index.find_by_clauses(partition, clauses)
+            if not matches:
+                return
 
+            url_to_rm = list({ url for url, _ in matches })
+            self._index.delete_urls(url_to_rm)
             for url in url_to_rm:
-                del self._state[url]
-            else:
-                return
+                self._entries.pop(url, None)
 
             self._logger.info("Removed the following from cache: \n" \
                 + "\n - " + '\n - '.join(url_to_rm) \
                 + "\n\nNow deleteing from cache dir")
-            await self._save_cache_state()
-            for l in locations:
-                await self._io.f_delete(l)
+            for _, file_name in matches:
+                await self._release_file(file_name)
 
     async def write(
         self: Self,
@@ -116,80 +139,141 @@ class FileCacher:
         meta: InstructionHeaders,
         data: str,
     ) -> Dict[str, 'RequestCache']:
-        for attempt in range(0, 2):
-            async with self._lock.entry_access(meta.partition):
-                if self._state is None:
-                    raise ValueError('write occured while state was not initialised')
-
-                fname = f"{meta.request_label}-{self._uuid.get_uuid4_hex()}.{meta.ext}"
-                fpath = os.path.join(self._save_dir, fname)
-                await self._io.f_write(fpath, data)
-
-                fmts = self._state.get(url, {})
-
-                if meta.format in fmts:
-                    cache = self._rc_factory.from_json(fmts[meta.format])
-                    await self._io.f_delete(cache.location)
-
-                request_cache = self._rc_factory.create(meta.expiry, fname, self._clock.now())
-                fmts[meta.format] = request_cache.to_json()
-                self._state[url] = fmts
-
-                await self._save_cache_state()
-
-                if url in self._state:
-                    return self.parse_state(self._state, url)
-        raise ValueError('cache has entered weird state')
-
-    def parse_state(self: Self, state: Dict[Any, Any], key: str) -> Dict[str, 'RequestCache']:
+        async with self._lock.entry_access(meta.partition):
+            if self._index is None or self._entries is None:
+                raise ValueError('write occured while index was not initialised')
+
+            match self._storage:
+                case 'plain':
+                    fname = f"{meta.request_label}-{self._uuid.get_uuid4_hex()}.{meta.ext}"
+                    await self._io.f_write(os.path.join(self._save_dir, fname), data)
+                case 'compressed':
+                    body = data.encode('utf-8')
+                    digest = await asyncio.to_thread(_digest, body)
+                    fname = f"{meta.request_label}-{digest}.{meta.ext}.{COMPRESSED_EXT}"
+                    # if another entry has the same body there's
+                    # no need to write it again.
+                    if fname not in self._refs:
+                        compressed = await asyncio.to_thread(gzip.compress, body, 6, mtime=0)
+                        await self._io.f_write_bytes(os.path.join(self._save_dir, fname), compressed)
+
+            # the age is persisted to the second, so its truncated
+            # to ensure it's the same as when it's read back.
+            age = self._clock.now().replace(microsecond=0)
+            request_cache = self._rc_factory.create(meta.expiry, fname, age)
+            self._index.put(url, meta.format, meta.partition, meta.request_label, request_cache.to_json())
+
+            fmts = self._entries.get(url, {})
+            self._entries[url] = { **fmts, meta.format: request_cache }
+            self._refs[fname] = self._refs.get(fname, 0) + 1
+
+            if meta.format in fmts:
+                await self._release_file(fmts[meta.format].file_name)
+
+            return self._entries[url]
+
+    def parse_state(self: Self, entries: Dict[str, IndexEntry]) -> Dict[str, 'RequestCache']:
         return {
             fmt: self._rc_factory.from_json(s)
-            for fmt, s in state[key].items()
+            for fmt, s in entries.items()
         }
 
     async def __aenter__(self: Self):
         try:
-            if not await self._io.f_exists(self._config_path):
-                await self._io.f_write(self._config_path, STATE_INIT)
-            state = json.loads(await self._io.f_read(self._config_path))
-            if state['version'] != CACHE_VERSION:
-                raise Exception("cache doesn't match version")
-            self._state = state['files']
+            self._index = self._index or CacheIndex.open(self._index_path)
+
+            match self._index.get_version():
+                case None:
+                    # the version is set after migrating, so
+                    # a failed migration is retried next time.
+                    await self._migrate_legacy_state(self._index)
+                    self._index.set_version(CACHE_VERSION)
+                case version if version != CACHE_VERSION:
+                    raise Exception("cache doesn't match version")
+
+            self._entries = {}
+            self._refs = {}
+            for url, fmt, entry in self._index.load():
+                fmts = self._entries.setdefault(url, {})
+                fmts[fmt] = self._rc_factory.from_json(entry)
+                self._refs[entry['location']] = self._refs.get(entry['location'], 0) + 1
         except Exception as e:
             self._logger.exception(e)
-            self._logger.error("Failed to save cache state, possibly corrupted")
+            self._logger.error("Failed to load cache index, possibly corrupted")
             raise
         return self
 
     async def __aexit__(self: Self, exc_type, exc_value, traceback):
-        await self._save_cache_state()
+        for partition, stats in self._stats.items():
+            self._logger.info(f'cache usage for {partition}, {stats}')
+
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+        self._entries = None
+        self._refs = {}
         return False
 
-    async def _save_cache_state(self: Self):
-        state = { 'version': CACHE_VERSION, 'files': self._state }
-        await self._io.f_write(self._config_path, json.dumps(state, indent=1))
+    async def _migrate_legacy_state(self: Self, index: CacheIndex):
+        if not await self._io.f_exists(self._legacy_state_path):
+            return
+
+        state = json.loads(await self._io.f_read(self._legacy_state_path))
+        if state['version'] != LEGACY_CACHE_VERSION:
+            raise Exception("legacy cache doesn't match version")
+
+        self._logger.info(f'migrating {self._legacy_state_path} to {self._index_path}')
+        index.import_legacy_state(state['files'])
+        await self._io.f_move(self._legacy_state_path, f'{self._legacy_state_path}.migrated')
+
+    async def _release_file(self: Self, file_name: str):
+        """
+        Called when an entry no longer refers to a file, if
+        it was the last entry to do so the file is deleted.
+        """
+        count = self._refs.get(file_name, 0) - 1
+        if count > 0:
+            self._refs[file_name] = count
+            return
+
+        self._refs.pop(file_name, None)
+        await self._delete_file(f'{self._rc_factory.cache_dir}/{file_name}')
+
+    async def _delete_file(self: Self, location: str):
+        try:
+            await self._io.f_delete(location)
+        except FileNotFoundError:
+            self._logger.warning(f'cached file was already deleted, {location}')
 
     @staticmethod
     def create(io: IoService,
                cache_id: str | None,
                cache_dir: str | None = None,
-               state_dir: str | None = None):
+               state_dir: str | None = None,
+               storage: CacheStorage = 'plain'):
         cache_dir = cache_dir or './_out_cache'
         state_dir = state_dir or './_out_state'
-        state_path = f"{state_dir}/{cache_id or 'http'}-cache.json"
-        clock = ClockService()
-        uuid = UuidService()
+        index_path = f"{state_dir}/{cache_id or 'http'}-cache.sqlite"
+        legacy_state_path = f"{state_dir}/{cache_id or 'http'}-cache.json"
         factory = RequestCacheFactory(cache_dir=cache_dir)
         return FileCacher(save_dir=cache_dir,
-                          config_path=state_path,
+                          index_path=index_path,
+                          legacy_state_path=legacy_state_path,
                           rc_factory=factory,
                           io=io,
                           uuid=UuidService(),
-                          clock=ClockService())
+                          clock=ClockService(),
+                          storage=storage)
 
 _date_format = '%Y-%m-%d %H:%M:%S'
 
-@dataclass
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = field(default=0)
+    misses: int = field(default=0)
+    expired: int = field(default=0)
+
+@dataclass(slots=True)
 class RequestCache:
     expire: Any
     file_name: str
@@ -200,6 +284,10 @@ class RequestCache:
     def location(self: Self):
         return f'{self.cache_dir}/{self.file_name}'
 
+    @property
+    def compressed(self: Self) -> bool:
+        return self.file_name.endswith(f'.{COMPRESSED_EXT}')
+
     def has_expired(self: Self, now: datetime):
         return self.expire.has_expired(self.age, now)
 
@@ -220,8 +308,19 @@ class RequestCacheFactory:
 
     def from_json(self: Self, json) -> RequestCache:
         return RequestCache(
-            CacheExpire.parse_expire(json['expire']),
+            _parse_expire(json['expire']),
             json['location'],
-            datetime.strptime(json['age'], _date_format),
+            # `_date_format` is a subset of iso format, which
+            # is much faster to parse than using `strptime`.
+            datetime.fromisoformat(json['age']),
             cache_dir=self.cache_dir,
         )
+
+def _digest(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+@lru_cache(maxsize=64)
+def _parse_expire(expire_str: str | None):
+    # There only tend to be a handful of distinct expiry
+    # strings, and expiry instances are never mutated.
+    return CacheExpire.parse_expire(expire_str)
@@ -0,0 +1,164 @@
+import sqlite3
+from typing import Dict, Iterator, List, Optional, Self, Tuple
+
+# The legacy json state, which looks like this.
+#
+#   { url: { format: { 'expire', 'location', 'age' } } }
+#
+LegacyState = Dict[str, Dict[str, Dict[str, str]]]
+
+# An entry in the index, it has the keys `expire`, `location`
+# and `age`, in the same format `RequestCache.to_json` writes.
+IndexEntry = Dict[str, str]
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS meta (
+      key TEXT PRIMARY KEY,
+      value TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS entry (
+      url TEXT NOT NULL,
+      format TEXT NOT NULL,
+      partition TEXT,
+      label TEXT,
+      expire TEXT,
+      location TEXT NOT NULL,
+      age TEXT NOT NULL,
+      PRIMARY KEY (url, format)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS entry_partition ON entry (partition)",
+]
+
+class CacheIndex:
+    """
+    An on disk index of cached responses, so writing an entry
+    to the cache is an insert of that entry rather than writing
+    out the state of the whole cache.
+
+    Entries are keyed by their url and format, and also record
+    the partition & label of the request they came from so they
+    can be invalidated by partition without scanning the whole
+    cache. Entries migrated from the old json state have no
+    partition, so they're treated as part of every partition.
+    """
+
+    def __init__(self: Self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    @staticmethod
+    def open(path: str) -> 'CacheIndex':
+        conn = sqlite3.connect(path, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        return CacheIndex(conn)
+
+    def close(self: Self) -> None:
+        self._conn.close()
+
+    def get_version(self: Self) -> Optional[int]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return int(row[0]) if row else None
+
+    def set_version(self: Self, version: int) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)",
+            (str(version),))
+
+    def get(self: Self, url: str) -> Dict[str, IndexEntry]:
+        rows = self._conn.execute(
+            'SELECT format, expire, location, age FROM entry WHERE url = ?',
+            (url,))
+        return {
+            fmt: { 'expire': expire, 'location': location, 'age': age }
+            for fmt, expire, location, age in rows
+        }
+
+    def put(self: Self,
+            url: str,
+            fmt: str,
+            partition: Optional[str],
+            label: Optional[str],
+            entry: IndexEntry) -> None:
+        self._conn.execute(
+            'INSERT OR REPLACE INTO entry '
+            '(url, format, partition, label, expire, location, age) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (url, fmt, partition, label, entry['expire'], entry['location'], entry['age']))
+
+    def delete(self: Self, url: str, fmt: Optional[str] = None) -> None:
+        if fmt is None:
+            self._conn.execute('DELETE FROM entry WHERE url = ?', (url,))
+        else:
+            self._conn.execute('DELETE FROM entry WHERE url = ? AND format = ?', (url, fmt))
+
+    def delete_urls(self: Self, urls: List[str]) -> None:
+        with self._transaction():
+            self._conn.executemany('DELETE FROM entry WHERE url = ?', ((u,) for u in urls))
+
+    def find_by_clauses(self: Self,
+                        partition: str,
+                        clauses: List[str]) -> List[Tuple[str, str]]:
+        """
+        Returns the url and location (the file name) of every
+        entry in the partition which contains all of the clauses.
+        """
+        conditions = ''.join(' AND instr(url, ?) > 0' for _ in clauses)
+        rows = self._conn.execute(
+            'SELECT url, location FROM entry '
+            '  WHERE (partition = ? OR partition IS NULL)'
+            f'{conditions}',
+            (partition, *clauses))
+        return list(rows)
+
+    def load(self: Self) -> Iterator[Tuple[str, str, IndexEntry]]:
+        """
+        Every url, format & entry in the index.
+        """
+        rows = self._conn.execute('SELECT url, format, expire, location, age FROM entry')
+        for url, fmt, expire, location, age in rows:
+            yield url, fmt, { 'expire': expire, 'location': location, 'age': age }
+
+    def entries(self: Self) -> Iterator[Tuple[str, str, str]]:
+        """
+        Every url, format & location in the index.
+        """
+        yield from self._conn.execute('SELECT url, format, location FROM entry')
+
+    def import_legacy_state(self: Self, state: LegacyState) -> None:
+        rows = (
+            (url, fmt, None, _label_of(entry['location']),
+             entry['expire'], entry['location'], entry['age'])
+            for url, fmts in state.items()
+            for fmt, entry in fmts.items()
+        )
+        with self._transaction():
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO entry '
+                '(url, format, partition, label, expire, location, age) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                rows)
+
+    def _transaction(self: Self) -> '_Transaction':
+        return _Transaction(self._conn)
+
+class _Transaction:
+    def __init__(self: Self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self: Self) -> Self:
+        self._conn.execute('BEGIN')
+        return self
+
+    def __exit__(self: Self, exc_type, exc_value, traceback) -> None:
+        self._conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+
+def _label_of(file_name: str) -> Optional[str]:
+    # files are named `{label}-{uuid}.{ext}` or `{label}-{hash}.{ext}.gz`
+    label, sep, _ = file_name.rpartition('-')
+    return label if sep else None
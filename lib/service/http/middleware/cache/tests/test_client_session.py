@@ -1,4 +1,6 @@
+import asyncio
 from datetime import datetime, timedelta
+import gzip
 import logging
 from unittest import IsolatedAsyncioTestCase
 from unittest.mock import AsyncMock
@@ -44,7 +46,7 @@ class GetResponseTestCase(IsolatedAsyncioTestCase):
         meta = _never_instructions
         fmts = {'json': RequestCache(meta.expiry, 'file_location', _date_obj, 'cache_dir')}
 
-        self.mock_io.f_read.return_value = '{"count":0}'
+        self.mock_io.f_read_bytes.return_value = b'{"count":0}'
         self.mock_cache.read.return_value = (None, False)
         self.mock_cache.write.return_value = fmts
         self.mock_response.text.return_value = '{"count":0}'
@@ -59,7 +61,7 @@ class GetResponseTestCase(IsolatedAsyncioTestCase):
         )
 
         async with instance as request:
-            self.mock_cache.read.assert_called_once_with('my_url', meta.format)
+            self.mock_cache.read.assert_called_once_with('my_url', meta.format, meta.partition)
             self.mock_session.get.assert_called_once_with('my_url', headers={})
             self.mock_response.__aenter__.assert_called_once()
             self.mock_response.text.assert_called_once()
@@ -67,13 +69,13 @@ class GetResponseTestCase(IsolatedAsyncioTestCase):
             self.assertEqual(request.status, 200)
 
             self.assertEqual(await request.json(), { 'count': 0 })
-            self.mock_io.f_read.assert_called_once_with('cache_dir/file_location')
+            self.mock_io.f_read_bytes.assert_called_once_with('cache_dir/file_location')
 
     async def test_async_context_with_failed_request_with_no_cache(self):
         meta = _never_instructions
         fmts = {'json': RequestCache(meta.expiry, 'file_location', _date_obj, 'cache_dir')}
 
-        self.mock_io.f_read.return_value = '{"count":0}'
+        self.mock_io.f_read_bytes.return_value = b'{"count":0}'
         self.mock_cache.read.return_value = (None, False)
         self.mock_response.status = 400
 
@@ -86,7 +88,7 @@ class GetResponseTestCase(IsolatedAsyncioTestCase):
         )
 
         async with instance as request:
-            self.mock_cache.read.assert_called_once_with('my_url', meta.format)
+            self.mock_cache.read.assert_called_once_with('my_url', meta.format, meta.partition)
             self.mock_session.get.assert_called_once_with('my_url', headers={})
             self.mock_response.__aenter__.assert_called_once()
             self.mock_response.text.assert_not_called()
@@ -98,7 +100,7 @@ class GetResponseTestCase(IsolatedAsyncioTestCase):
         meta = _never_instructions
         fmts = {'json': RequestCache(meta.expiry, 'file_location', _date_obj, 'cache_dir')}
 
-        self.mock_io.f_read.return_value = '{"count":0}'
+        self.mock_io.f_read_bytes.return_value = b'{"count":0}'
         self.mock_cache.read.return_value = (fmts, False)
         self.mock_response.status = 400
 
@@ -111,7 +113,7 @@ class GetResponseTestCase(IsolatedAsyncioTestCase):
         )
 
         async with instance as request:
-            self.mock_cache.read.assert_called_once_with('my_url', meta.format)
+            self.mock_cache.read.assert_called_once_with('my_url', meta.format, meta.partition)
             self.mock_session.get.assert_called_once_with('my_url', headers={})
             self.mock_response.__aenter__.assert_called_once()
             self.mock_response.text.assert_not_called()
@@ -120,13 +122,13 @@ class GetResponseTestCase(IsolatedAsyncioTestCase):
             self.assertEqual(request.status, 200)
 
             self.assertEqual(await request.json(), { 'count': 0 })
-            self.mock_io.f_read.assert_called_once_with('cache_dir/file_location')
+            self.mock_io.f_read_bytes.assert_called_once_with('cache_dir/file_location')
 
     async def test_async_context_with_cache(self):
         meta = _never_instructions
         fmts = {'json': RequestCache(meta.expiry, 'file_location', _date_obj, 'cache_dir')}
 
-        self.mock_io.f_read.return_value = '{"count":0}'
+        self.mock_io.f_read_bytes.return_value = b'{"count":0}'
         self.mock_cache.read.return_value = (fmts, True)
 
         instance = CachedGet(
@@ -138,13 +140,13 @@ class GetResponseTestCase(IsolatedAsyncioTestCase):
         )
 
         async with instance as request:
-            self.mock_cache.read.assert_called_once_with('my_url', meta.format)
+            self.mock_cache.read.assert_called_once_with('my_url', meta.format, meta.partition)
             self.mock_session.get.assert_not_called()
             self.assertEqual(request, instance)
             self.assertEqual(request.status, 200)
 
             self.assertEqual(await request.json(), { 'count': 0 })
-            self.mock_io.f_read.assert_called_once_with('cache_dir/file_location')
+            self.mock_io.f_read_bytes.assert_called_once_with('cache_dir/file_location')
 
     async def test_async_context_connection_error_with_cache(self):
         meta = _never_instructions
@@ -152,7 +154,7 @@ class GetResponseTestCase(IsolatedAsyncioTestCase):
 
         self.mock_cache.read.return_value = (fmts, False)
         self.mock_response.__aenter__.side_effect = ConnectionError()
-        self.mock_io.f_read.return_value = '{"count":0}'
+        self.mock_io.f_read_bytes.return_value = b'{"count":0}'
 
         instance = CachedGet(
             _config=('my_url', {}, meta),
@@ -163,7 +165,7 @@ class GetResponseTestCase(IsolatedAsyncioTestCase):
         )
 
         async with instance as request:
-            self.mock_cache.read.assert_called_once_with('my_url', meta.format)
+            self.mock_cache.read.assert_called_once_with('my_url', meta.format, meta.partition)
             self.mock_session.get.assert_called_once_with('my_url', headers={})
             self.mock_response.__aenter__.assert_called_once()
 
@@ -175,3 +177,72 @@ class GetResponseTestCase(IsolatedAsyncioTestCase):
             self.assertEqual(request.status, 200)
             self.assertEqual(await request.json(), { 'count': 0 })
 
+
+    async def test_compressed_cache(self):
+        meta = _never_instructions
+        fmts = {'json': RequestCache(meta.expiry, 'file_location.json.gz', _date_obj, 'cache_dir')}
+        body = gzip.compress(b'{"count":0}')
+
+        self.mock_io.f_read_bytes.return_value = body
+        self.mock_io.f_read_chunks.return_value = _chunks(body, 4)
+        self.mock_cache.read.return_value = (fmts, True)
+
+        instance = CachedGet(
+            _config=('my_url', {}, meta),
+            _io=self.mock_io,
+            _cache=self.mock_cache,
+            _logger=self.mock_logger,
+            _session=self.mock_session,
+        )
+
+        async with instance as request:
+            self.assertEqual(await request.json(), { 'count': 0 })
+            self.assertEqual(await request.read(), b'{"count":0}')
+            self.assertEqual(b''.join([c async for c in request.stream(4)]), b'{"count":0}')
+            self.mock_io.f_read.assert_not_called()
+            self.mock_io.f_read_chunks.assert_called_once_with('cache_dir/file_location.json.gz', 4)
+
+    async def test_concurrent_misses_share_one_fetch(self):
+        meta = _never_instructions
+        fmts = {'json': RequestCache(meta.expiry, 'file_location', _date_obj, 'cache_dir')}
+        released = asyncio.Event()
+
+        async def text():
+            await released.wait()
+            return '{"count":0}'
+
+        self.mock_io.f_read_bytes.return_value = b'{"count":0}'
+        self.mock_cache.read.return_value = (None, False)
+        self.mock_cache.write.return_value = fmts
+        self.mock_response.text.side_effect = text
+        self.mock_response.status = 200
+
+        in_flight = {}
+        instances = [
+            CachedGet(
+                _config=('my_url', {}, meta),
+                _io=self.mock_io,
+                _cache=self.mock_cache,
+                _logger=self.mock_logger,
+                _session=self.mock_session,
+                _in_flight=in_flight,
+            )
+            for _ in range(3)
+        ]
+
+        async def get_json(instance):
+            async with instance as request:
+                return await request.json()
+
+        tasks = [asyncio.create_task(get_json(i)) for i in instances]
+        await asyncio.sleep(0)
+        released.set()
+
+        self.assertEqual(await asyncio.gather(*tasks), [{ 'count': 0 }] * 3)
+        self.mock_session.get.assert_called_once_with('my_url', headers={})
+        self.mock_cache.write.assert_called_once_with('my_url', meta, '{"count":0}')
+        self.assertEqual(in_flight, {})
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
@@ -1,4 +1,7 @@
 from datetime import datetime, timedelta
+import gzip
+import hashlib
+import json
 from unittest import TestCase, IsolatedAsyncioTestCase
 from unittest.mock import AsyncMock, call, ANY
 
@@ -6,13 +9,13 @@ from lib.service.clock.mocks import MockClockService
 from lib.service.uuid.mocks import MockUuidService
 from lib.service.io import IoService
 from lib.service.http.middleware.cache import InstructionHeaders, CACHE_VERSION
-from lib.service.http.middleware.cache.file_cache import RequestCache, FileCacher, RequestCacheFactory
+from lib.service.http.middleware.cache.file_cache import CacheStats, RequestCache, FileCacher, RequestCacheFactory
+from lib.service.http.middleware.cache.index import CacheIndex
 from lib.service.http.middleware.cache.expiry import *
 
 _file_path = 'blah/blah/blah'
 _date_str = '2012-10-15 10:10:10'
 _date_obj = datetime(2012, 10, 15, 10, 10, 10)
-_empty_state_str = '{\n "version": %s,\n "files": {}\n}' % CACHE_VERSION
 
 class RequestCacheTestCase(TestCase):
     factory = RequestCacheFactory(cache_dir='asdf')
@@ -41,48 +44,71 @@ class FileCacherTestCase(IsolatedAsyncioTestCase):
     mock_io = None
 
     @classmethod
-    def _mk_state(cls, *args):
-        state = {}
+    def _mk_index(cls, *args, partition=None):
+        index = CacheIndex.open(':memory:')
+        index.set_version(CACHE_VERSION)
         for url, fmt, o in args:
-            state[url] = {
-                **state.get(url, {}),
-                fmt: { 'expire': o[0], 'location': o[1], 'age': o[2] },
-            }
-        return state
-
-    def _get_instance(self, state, uuid=None, clock=None):
-        state_path = 'state_path'
+            entry = { 'expire': o[0], 'location': o[1], 'age': o[2] }
+            index.put(url, fmt, partition, None, entry)
+        return index
+
+    def _get_instance(self, index, uuid=None, clock=None, storage='plain'):
         uuid = uuid or MockUuidService(values=['1', '2', '3'])
         clock = clock or MockClockService(dt=_date_obj)
         return FileCacher(cache_dir,
-                          state_path,
+                          'index_path',
+                          'state_path',
                           RequestCacheFactory(cache_dir),
                           self.mock_io,
                           uuid,
                           clock,
-                          state)
+                          index,
+                          storage)
 
-    def assertEqualIgnoringWhitespace(self, l, r):
-        self.assertEqual(' '.join(l.split()), ' '.join(r.split()))
+    async def _open(self, index, uuid=None, clock=None, storage='plain'):
+        instance = self._get_instance(index, uuid=uuid, clock=clock, storage=storage)
+        return await instance.__aenter__()
 
     async def asyncSetUp(self):
         self.mock_io = AsyncMock(spec=IoService)
 
-    async def test_async_context(self):
-        instance = self._get_instance(state=None)
-        self.mock_io.f_read.return_value = _empty_state_str
-        self.mock_io.f_write.return_value = None
+    async def test_async_context_without_legacy_state(self):
+        index = CacheIndex.open(':memory:')
+        self.mock_io.f_exists.return_value = False
+
+        async with self._get_instance(index=index) as f:
+            self.mock_io.f_exists.assert_called_once_with('state_path')
+            self.mock_io.f_read.assert_not_called()
+            self.assertEqual(index.get_version(), CACHE_VERSION)
 
-        async with self._get_instance(state=None) as f:
+    async def test_async_context_migrates_legacy_state(self):
+        index = CacheIndex.open(':memory:')
+        encoded = { 'expire': 'never', 'location': 'label-u1.json', 'age': _date_str }
+        self.mock_io.f_exists.return_value = True
+        self.mock_io.f_read.return_value = json.dumps({
+            'version': 1,
+            'files': { 'breakfast': { 'json': encoded } },
+        })
+
+        async with self._get_instance(index=index) as f:
             self.mock_io.f_read.assert_called_once_with('state_path')
-            self.assertEqual(f._state, {})
-        self.mock_io.f_write.assert_called_once_with('state_path', _empty_state_str)
+            self.mock_io.f_move.assert_called_once_with('state_path', 'state_path.migrated')
+            self.assertEqual(index.get_version(), CACHE_VERSION)
+            self.assertEqual(index.get('breakfast'), { 'json': encoded })
+
+    async def test_async_context_with_wrong_version(self):
+        index = CacheIndex.open(':memory:')
+        index.set_version(CACHE_VERSION + 1)
+
+        with self.assertRaises(Exception):
+            async with self._get_instance(index=index) as f:
+                pass
 
     async def test_read_empty(self):
-        instance = self._get_instance(state={})
+        instance = await self._open(index=self._mk_index())
         self.assertEqual(instance.read('a', 'json'), (None, False))
 
-        instance = self._get_instance(state=self._mk_state())
+        instance = await self._open(index=self._mk_index(('a', 'text', ('never', 'file_a', _date_str))))
         self.assertEqual(instance.read('a', 'json'), (None, False))
 
     async def test_read_valid(self):
@@ -92,13 +118,13 @@ class FileCacherTestCase(IsolatedAsyncioTestCase):
         b_date_obj = datetime(2012, 12, 15, 10, 10, 10)
 
         clock = MockClockService(dt=b_date_obj)
-        state = self._mk_state(
+        index = self._mk_index(
             ('a', 'json', ('never', 'file_a', a_date_str)),
             ('b', 'json', ('delta:days:5', 'file_b', a_date_str)),
             ('c', 'json', ('till_next_day_of_week:Sunday', 'file_c', a_date_str)),
         )
 
-        instance = self._get_instance(state=state, clock=clock)
+        instance = await self._open(index=index, clock=clock)
 
         self.assertEqual(
             instance.read('a', 'json'),
@@ -120,12 +146,12 @@ class FileCacherTestCase(IsolatedAsyncioTestCase):
         b_date_obj = datetime(2012, 12, 17, 10, 10, 10)
 
         clock = MockClockService(dt=b_date_obj)
-        state = self._mk_state(
+        index = self._mk_index(
             ('b', 'json', ('delta:days:4', 'file_b', a_date_str)),
             ('c', 'json', ('till_next_day_of_week:Sunday', 'file_c', a_date_str)),
         )
 
-        instance = self._get_instance(state=state, clock=clock)
+        instance = await self._open(index=index, clock=clock)
 
         self.assertEqual(
             instance.read('b', 'json'),
@@ -152,13 +178,13 @@ class FileCacherTestCase(IsolatedAsyncioTestCase):
 
         self.mock_io.f_write.return_value = None
         self.mock_io.f_delete.return_value = None
-        instance = self._get_instance(state={}, uuid=uuid, clock=clock)
+        index = self._mk_index()
+        instance = await self._open(index=index, uuid=uuid, clock=clock)
         cache = await instance.write(request_url, request_meta, request_data)
         self.assertEqual(cache, { 'json': decoded })
-        self.assertEqual(instance._state, { 'breakfast': { 'json': encoded } })
+        self.assertEqual(index.get('breakfast'), { 'json': encoded })
         self.assertEqual(self.mock_io.f_write.mock_calls, [
             call(f'cache_dir/{fname}', request_data),
-            call(f'state_path', ANY)
         ])
         self.mock_io.f_delete.assert_not_called()
 
@@ -178,17 +204,102 @@ class FileCacherTestCase(IsolatedAsyncioTestCase):
 
         self.mock_io.f_write.return_value = None
         self.mock_io.f_delete.return_value = None
-        instance = self._get_instance(state={
-            'breakfast': {
-                'json': { **encoded, 'location': 'old-file' },
-            }
-        }, uuid=uuid, clock=clock)
+        index = self._mk_index(('breakfast', 'json', ('never', 'old-file', _date_str)))
+        instance = await self._open(index=index, uuid=uuid, clock=clock)
         cache = await instance.write(request_url, request_meta, request_data)
         self.assertEqual(cache, { 'json': decoded })
-        self.assertEqual(instance._state, { 'breakfast': { 'json': encoded } })
+        self.assertEqual(index.get('breakfast'), { 'json': encoded })
         self.assertEqual(self.mock_io.f_write.mock_calls, [
             call(f'cache_dir/{fname}', request_data),
-            call(f'state_path', ANY)
         ])
         self.mock_io.f_delete.assert_called_once_with('cache_dir/old-file')
 
+    async def test_forget_by_clause(self):
+        index = self._mk_index(
+            ('u/query?where=a&offset=1', 'json', ('never', 'f1', _date_str)),
+            ('u/query?where=a&offset=2', 'json', ('never', 'f2', _date_str)),
+            ('u/query?where=b&offset=1', 'json', ('never', 'f3', _date_str)),
+            partition='p1',
+        )
+        index.put('u/query?where=a&offset=3', 'json', 'p2', None,
+                  { 'expire': 'never', 'location': 'f4', 'age': _date_str })
+        index.put('u/query?where=a&offset=4', 'json', None, None,
+                  { 'expire': 'never', 'location': 'f5', 'age': _date_str })
+
+        instance = await self._open(index=index)
+        await instance.forget_by_clause(['u', 'where=a'], partition='p1')
+
+        self.assertEqual(
+            sorted(url for url, _, _ in index.entries()),
+            ['u/query?where=a&offset=3', 'u/query?where=b&offset=1'],
+        )
+        self.assertEqual(
+            sorted(self.mock_io.f_delete.mock_calls),
+            [call('cache_dir/f1'), call('cache_dir/f2'), call('cache_dir/f5')],
+        )
+
+    async def test_write_compressed_deduplicates(self):
+        meta_a = InstructionHeaders(format='json',
+                                    expiry=Never(),
+                                    disabled=False,
+                                    partition='blah',
+                                    request_label='fruitloop')
+        request_data = '{"count":2012}'
+        digest = hashlib.sha256(request_data.encode('utf-8')).hexdigest()
+        fname = f'fruitloop-{digest}.json.gz'
+
+        index = self._mk_index()
+        instance = await self._open(index=index, storage='compressed')
+        cache_a = await instance.write('a', meta_a, request_data)
+        cache_b = await instance.write('b', meta_a, request_data)
+
+        self.assertEqual(cache_a['json'].file_name, fname)
+        self.assertEqual(cache_b['json'].file_name, fname)
+        self.assertTrue(cache_a['json'].compressed)
+        self.mock_io.f_write.assert_not_called()
+        self.mock_io.f_write_bytes.assert_called_once_with(f'cache_dir/{fname}', ANY)
+        _, written = self.mock_io.f_write_bytes.call_args.args
+        self.assertEqual(gzip.decompress(written).decode('utf-8'), request_data)
+
+        # the file is only deleted once nothing refers to it
+        await instance.write('a', meta_a, '{"count":2013}')
+        self.mock_io.f_delete.assert_not_called()
+        await instance.write('b', meta_a, '{"count":2013}')
+        self.mock_io.f_delete.assert_called_once_with(f'cache_dir/{fname}')
+
+    async def test_forget_by_clause_shared_file(self):
+        index = self._mk_index(
+            ('u/query?where=a', 'json', ('never', 'f1.json.gz', _date_str)),
+            ('u/query?where=b', 'json', ('never', 'f1.json.gz', _date_str)),
+            partition='p1',
+        )
+
+        instance = await self._open(index=index)
+        await instance.forget_by_clause(['where=a'], partition='p1')
+        self.mock_io.f_delete.assert_not_called()
+        await instance.forget_by_clause(['where=b'], partition='p1')
+        self.mock_io.f_delete.assert_called_once_with('cache_dir/f1.json.gz')
+
+    async def test_stats(self):
+        # 2012-12-12 = Wednesday, 2012-12-17 = Monday
+        a_date_str = '2012-12-12 10:10:10'
+        b_date_obj = datetime(2012, 12, 17, 10, 10, 10)
+
+        clock = MockClockService(dt=b_date_obj)
+        index = self._mk_index(
+            ('a', 'json', ('never', 'file_a', a_date_str)),
+            ('b', 'json', ('delta:days:4', 'file_b', a_date_str)),
+        )
+
+        instance = await self._open(index=index, clock=clock)
+        instance.read('a', 'json', 'p1')
+        instance.read('a', 'json', 'p1')
+        instance.read('b', 'json', 'p1')
+        instance.read('c', 'json', 'p2')
+        instance.read('a', 'text')
+
+        self.assertEqual(instance.stats(), {
+            'p1': CacheStats(hits=2, misses=0, expired=1),
+            'p2': CacheStats(hits=0, misses=1, expired=0),
+            '?': CacheStats(hits=0, misses=1, expired=0),
+        })
@@ -107,6 +107,12 @@ class ExpBackoffGetResponse(AbstractGetResponse):
             await self._response.__aexit__(exc_type, exc_value, traceback)
         return False
 
+    @property
+    def response_headers(self):
+        if not self._response:
+            raise ValueError('outside of context')
+        return self._response.response_headers
+
     async def stream(self, chunk_size: int):
         if not self._response:
             raise ValueError('outside of context')
@@ -124,6 +130,11 @@ class ExpBackoffGetResponse(AbstractGetResponse):
             raise ValueError('outside of context')
         return await self._response.json()
 
+    async def read(self) -> bytes:
+        if not self._response:
+            raise ValueError('outside of context')
+        return await self._response.read()
+
 @dataclass
 class ResponseFactory:
     config: BackoffConfig
@@ -3,31 +3,36 @@ from dataclasses import dataclass, field
 from logging import getLogger
 from typing import Any, List, Dict, AsyncGenerator
 
+from lib.service.clock import AbstractClockService, ClockService
 from lib.service.http import ClientSession
 from lib.service.http.util import url_host
 from lib.service.http.client_session import AbstractClientSession, AbstractGetResponse
 
 from .config import HostSemaphoreConfig
+from .limiter import HostLimiter
 
 class ThrottledClientSession(AbstractClientSession):
     _logger = getLogger(f'{__name__}.ThrottledSession')
     """
     We want to throttle on a host basis to avoid getting rate
-    limited of blocked. So we have a different semaphore for
-    the different hosts.
+    limited of blocked. So we have a different limiter for the
+    different hosts, which caps the requests in flight and
+    optionally the rate they start at, see `HostSemaphoreConfig`.
     """
-    _semaphores: Dict[str, asyncio.Semaphore]
+    _limiters: Dict[str, HostLimiter]
 
-    def __init__(self, session: ClientSession, semaphores):
-        self._semaphores = semaphores
+    def __init__(self, session: ClientSession, limiters, clock: AbstractClockService):
+        self._limiters = limiters
         self._session = session
+        self._clock = clock
 
     @staticmethod
     def create(host_configs: List[HostSemaphoreConfig],
                session: ClientSession | None = None):
-        semaphores = { c.host: asyncio.Semaphore(c.limit) for c in host_configs }
+        clock = ClockService()
+        limiters = { c.host: HostLimiter.create(c, clock) for c in host_configs }
         session = session or ClientSession.create()
-        return ThrottledClientSession(session, semaphores)
+        return ThrottledClientSession(session, limiters, clock)
 
     async def __aenter__(self):
         await self._session.__aenter__()
@@ -39,13 +44,14 @@ class ThrottledClientSession(AbstractClientSession):
 
     def get(self, url: str, headers: Dict[str, str] | None =None):
         host = url_host(url)
-        if host not in self._semaphores:
-            return self._session.get(url)
+        if host not in self._limiters:
+            return self._session.get(url, headers=headers)
 
         return ThrottledGetResponse(url=url,
                                     headers=headers,
-                                    semaphore=self._semaphores[host],
-                                    session=self._session)
+                                    limiter=self._limiters[host],
+                                    session=self._session,
+                                    clock=self._clock)
 
     @property
     def closed(self):
@@ -55,20 +61,28 @@ class ThrottledGetResponse(AbstractGetResponse):
     url: str
     headers: Dict[str, str] | None
 
-    _semaphore: asyncio.Semaphore
+    _limiter: HostLimiter
     _session: ClientSession
+    _clock: AbstractClockService
     _response: AbstractGetResponse | None = None
+    _epoch: int | None = None
+    _latency: float = 0.0
 
-    def __init__(self, url, headers, semaphore, session):
+    def __init__(self, url, headers, limiter, session, clock):
         self.url = url
         self.headers = headers
         self._session = session
-        self._semaphore = semaphore
+        self._limiter = limiter
+        self._clock = clock
 
     @property
     def status(self):
         return self._response.status
 
+    @property
+    def response_headers(self):
+        return self._response.response_headers
+
     async def text(self):
         if not self._response:
             raise ValueError('outside of context')
@@ -79,6 +93,11 @@ class ThrottledGetResponse(AbstractGetResponse):
             raise ValueError('outside of context')
         return await self._response.json()
 
+    async def read(self) -> bytes:
+        if not self._response:
+            raise ValueError('outside of context')
+        return await self._response.read()
+
     async def stream(self, chunk_size: int):
         if not self._response:
             raise ValueError('outside of context')
@@ -87,21 +106,47 @@ class ThrottledGetResponse(AbstractGetResponse):
             yield chunk
 
     async def __aenter__(self):
-        await self._semaphore.__aenter__()
-
-        if self._session.closed:
-            raise RuntimeError("http session has been closed")
-
-        self._response = self._session.get(self.url, headers=self.headers)
-        await self._response.__aenter__()
+        self._epoch = await self._limiter.acquire()
+        started = self._clock.time()
+
+        try:
+            if self._session.closed:
+                raise RuntimeError("http session has been closed")
+
+            self._response = self._session.get(self.url, headers=self.headers)
+            await self._response.__aenter__()
+        except asyncio.CancelledError:
+            # a cancelled request says nothing about how the
+            # host is coping, so it mustn't shrink the window.
+            await self._cancel()
+            raise
+        except:
+            # `__aexit__` isn't called when entering fails, so
+            # the request has to be released here instead.
+            await self._release(None, self._clock.time() - started)
+            raise
+
+        self._latency = self._clock.time() - started
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback):
-        await self._semaphore.__aexit__(exc_type, exc_value, traceback)
+        await self._release(self._response.status if self._response else None, self._latency)
 
         if self._response:
             await self._response.__aexit__(exc_type, exc_value, traceback)
 
         return False
 
+    async def _release(self, status: int | None, latency: float):
+        if self._epoch is None:
+            return
+        epoch, self._epoch = self._epoch, None
+        await self._limiter.release(epoch, status, latency)
+
+    async def _cancel(self):
+        if self._epoch is None:
+            return
+        self._epoch = None
+        await self._limiter.cancel()
+
 
@@ -1,7 +1,34 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from collections import namedtuple
 
 @dataclass
 class HostSemaphoreConfig:
     host: str
+
+    """
+    The most requests to the host that can be in flight at once,
+    when `adaptive` this is the ceiling of the concurrency window.
+    """
     limit: int
+
+    """
+    When set, requests to the host can only start at this many
+    requests per second, with bursts of upto `burst` requests.
+    """
+    rate: float | None = field(default=None)
+    burst: int = field(default=1)
+
+    """
+    When set, the number of requests in flight is adjusted to
+    how the host is coping, it grows slowly while responses
+    are healthy and halves when the host responds with a 429
+    or 5xx, fails to respond or gets much slower than usual.
+    """
+    adaptive: bool = field(default=False)
+    min_limit: int = field(default=1)
+
+    """
+    How many times slower than usual a response has to be for
+    the host to be considered overwhelmed.
+    """
+    latency_factor: float = field(default=3.0)
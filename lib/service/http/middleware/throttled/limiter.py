@@ -0,0 +1,139 @@
+import asyncio
+from logging import getLogger
+from typing import Optional, Self
+
+from lib.service.clock import AbstractClockService
+
+from .config import HostSemaphoreConfig
+
+# How much each healthy response moves the usual latency.
+_LATENCY_WEIGHT = 0.1
+
+class TokenBucket:
+    """
+    Limits the rate requests start at, tokens refill at `rate`
+    per second upto `burst`, and each request takes one token.
+    """
+
+    def __init__(self: Self, rate: float, burst: int, clock: AbstractClockService):
+        self._rate = rate
+        self._burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._last = clock.time()
+        self._lock = asyncio.Lock()
+
+    async def take(self: Self) -> None:
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await self._clock.sleep((1 - self._tokens) / self._rate)
+                self._refill()
+            self._tokens -= 1
+
+    def _refill(self: Self) -> None:
+        now = self._clock.time()
+        self._tokens = min(self._burst, self._tokens + (now - self._last) * self._rate)
+        self._last = now
+
+class ConcurrencyWindow:
+    """
+    Limits the number of requests in flight, unlike a semaphore
+    the limit (the window) can change while requests are in
+    flight. When adaptive the window is adjusted with AIMD, it
+    grows by about one request for each window of healthy
+    responses and halves when the host looks overwhelmed.
+
+    Requests that were already in flight when the window was
+    halved won't halve it again, otherwise a single bad moment
+    would collapse the window to its minimum.
+    """
+    _logger = getLogger(f'{__name__}.ConcurrencyWindow')
+    _latency: Optional[float] = None
+
+    def __init__(self: Self,
+                 host: str,
+                 limit: int,
+                 min_limit: int,
+                 adaptive: bool,
+                 latency_factor: float):
+        self.window = float(limit)
+        self._host = host
+        self._limit = limit
+        self._min_limit = min(min_limit, limit)
+        self._adaptive = adaptive
+        self._latency_factor = latency_factor
+        self._in_flight = 0
+        self._epoch = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self: Self) -> int:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < int(self.window))
+            self._in_flight += 1
+            return self._epoch
+
+    async def release(self: Self, epoch: int, status: Optional[int], latency: float) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            if self._adaptive:
+                self._adjust(epoch, status, latency)
+            self._condition.notify_all()
+
+    async def cancel(self: Self) -> None:
+        """
+        Releases a request that never started, so it says
+        nothing about how the host is coping.
+        """
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _adjust(self: Self, epoch: int, status: Optional[int], latency: float) -> None:
+        healthy = status is not None and status != 429 and status < 500
+        slow = self._latency is not None and latency > self._latency * self._latency_factor
+
+        if healthy:
+            self._latency = latency if self._latency is None \
+                else self._latency + _LATENCY_WEIGHT * (latency - self._latency)
+
+        if healthy and not slow:
+            self.window = min(self._limit, self.window + 1 / self.window)
+        elif epoch == self._epoch:
+            self._epoch += 1
+            self.window = max(self._min_limit, self.window / 2)
+            self._logger.info(f'{self._host} window reduced to {int(self.window)} '
+                              f'(status {status}, latency {latency:.2f}s)')
+
+class HostLimiter:
+    def __init__(self: Self,
+                 window: ConcurrencyWindow,
+                 bucket: Optional[TokenBucket]):
+        self.window = window
+        self._bucket = bucket
+
+    async def acquire(self: Self) -> int:
+        epoch = await self.window.acquire()
+        if self._bucket is not None:
+            try:
+                await self._bucket.take()
+            except:
+                await self.window.cancel()
+                raise
+        return epoch
+
+    async def release(self: Self, epoch: int, status: Optional[int], latency: float) -> None:
+        await self.window.release(epoch, status, latency)
+
+    async def cancel(self: Self) -> None:
+        await self.window.cancel()
+
+    @staticmethod
+    def create(config: HostSemaphoreConfig, clock: AbstractClockService) -> 'HostLimiter':
+        window = ConcurrencyWindow(config.host,
+                                   config.limit,
+                                   config.min_limit,
+                                   config.adaptive,
+                                   config.latency_factor)
+        bucket = TokenBucket(config.rate, config.burst, clock) if config.rate else None
+        return HostLimiter(window, bucket)
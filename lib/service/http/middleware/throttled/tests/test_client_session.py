@@ -0,0 +1,37 @@
+import asyncio
+from datetime import datetime
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock
+
+from lib.service.clock.mocks import MockClockService
+
+from ..client_session import ThrottledGetResponse
+from ..limiter import ConcurrencyWindow, HostLimiter
+
+class ThrottledGetResponseTestCase(IsolatedAsyncioTestCase):
+    async def test_cancelled_request_keeps_window(self):
+        window = ConcurrencyWindow('host', 4, 1, adaptive=True, latency_factor=3.0)
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.Event().wait()
+
+        session = MagicMock(closed=False)
+        session.get.return_value.__aenter__.side_effect = hang
+        response = ThrottledGetResponse('http://host/a', None, HostLimiter(window, None),
+                                        session, MockClockService(dt=datetime(2020, 1, 1)))
+
+        async def request():
+            async with response:
+                pass
+
+        task = asyncio.create_task(request())
+        await started.wait()
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        self.assertEqual(window.window, 4.0)
+        epochs = [await asyncio.wait_for(window.acquire(), 1) for _ in range(4)]
+        self.assertEqual(epochs, [0, 0, 0, 0])
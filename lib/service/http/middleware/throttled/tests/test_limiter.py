@@ -0,0 +1,84 @@
+import asyncio
+from datetime import datetime
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock
+
+from lib.service.clock.mocks import MockClockService
+
+from ..limiter import ConcurrencyWindow, TokenBucket
+
+def window(limit=8, min_limit=1) -> ConcurrencyWindow:
+    return ConcurrencyWindow('host', limit, min_limit, adaptive=True, latency_factor=3.0)
+
+class ConcurrencyWindowTestCase(IsolatedAsyncioTestCase):
+    async def test_halves_on_too_many_requests(self):
+        w = window()
+        epoch = await w.acquire()
+        await w.release(epoch, 429, 0.1)
+        self.assertEqual(w.window, 4.0)
+
+    async def test_in_flight_requests_only_halve_once(self):
+        w = window()
+        epochs = [await w.acquire() for _ in range(3)]
+        for epoch in epochs:
+            await w.release(epoch, 503, 0.1)
+        self.assertEqual(w.window, 4.0)
+
+        epoch = await w.acquire()
+        await w.release(epoch, None, 0.1)
+        self.assertEqual(w.window, 2.0)
+
+    async def test_grows_while_healthy_upto_limit(self):
+        w = window(limit=4)
+        epoch = await w.acquire()
+        await w.release(epoch, 429, 0.1)
+        self.assertEqual(w.window, 2.0)
+
+        for _ in range(20):
+            epoch = await w.acquire()
+            await w.release(epoch, 200, 0.1)
+        self.assertEqual(w.window, 4.0)
+
+    async def test_halves_when_much_slower_than_usual(self):
+        w = window()
+        for _ in range(5):
+            epoch = await w.acquire()
+            await w.release(epoch, 200, 0.1)
+        epoch = await w.acquire()
+        await w.release(epoch, 200, 1.0)
+        self.assertEqual(w.window, 4.0)
+
+    async def test_never_below_min_limit(self):
+        w = window(min_limit=3)
+        for _ in range(5):
+            epoch = await w.acquire()
+            await w.release(epoch, 500, 0.1)
+        self.assertEqual(w.window, 3.0)
+
+    async def test_waits_for_room_in_window(self):
+        w = window(limit=1)
+        epoch = await w.acquire()
+        waiting = asyncio.create_task(w.acquire())
+        await asyncio.sleep(0)
+        self.assertFalse(waiting.done())
+
+        await w.release(epoch, 200, 0.1)
+        await asyncio.wait_for(waiting, 1)
+
+class TokenBucketTestCase(IsolatedAsyncioTestCase):
+    async def test_waits_once_burst_is_used(self):
+        clock = MockClockService(dt=datetime(2020, 1, 1))
+        clock.sleep = AsyncMock()
+        bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+
+        await bucket.take()
+        await bucket.take()
+        clock.sleep.assert_not_called()
+
+        await bucket.take()
+        clock.sleep.assert_called_once_with(0.5)
+
+        clock.tick_time(5)
+        clock.sleep.reset_mock()
+        await bucket.take()
+        clock.sleep.assert_not_called()
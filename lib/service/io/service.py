@@ -1,12 +1,16 @@
 import aiofiles
 from aiofiles.tempfile import NamedTemporaryFile
 import asyncio
+import codecs
 from dataclasses import dataclass
+import mmap
 import os
+import pandas as pd
 from pathlib import Path
 import shutil
 import tarfile
-from typing import Any, AsyncIterator, AsyncGenerator, Self, Tuple, List, Optional
+from typing import Any, AsyncIterator, AsyncGenerator, Dict, Self, Tuple, List, Optional
+from io import BytesIO
 from zipfile import ZipFile
 
 from lib.utility.concurrent import NullableSemaphore, iterator_thread
@@ -33,9 +37,68 @@ class IoService:
         async with self._semaphore:
             await asyncio.to_thread(_sync_unzip, zipfile, unzip_to)
 
+    async def extract_zip_members(self, zipfile: str, members: List[str], unzip_to: str) -> None:
+        async with self._semaphore:
+            await asyncio.to_thread(_sync_unzip, zipfile, unzip_to, members)
+
+    async def zip_members(self, zipfile: str) -> List[Tuple[str, int]]:
+        """
+        The name and uncompressed size of every member of the
+        zip, which is read from its central directory, so it
+        doesn't require reading (or extracting) the members.
+        """
+        async with self._semaphore:
+            data = await asyncio.to_thread(_sync_zip_members, zipfile)
+        return data
+
+    async def zip_read_member(self, zipfile: str, member: str) -> bytes:
+        async with self._semaphore:
+            data = await asyncio.to_thread(_sync_zip_read_member, zipfile, member)
+        return data
+
+    async def zip_walk(self, zipfile: str) -> List[Tuple[Tuple[str, ...], int]]:
+        """
+        Every file in the zip, including the files in any zips
+        nested within it, along with its uncompressed size. Each
+        file is identified by the chain of members that leads to
+        it, for example `('2001.zip', '20010107.zip', 'a.DAT')`.
+        """
+        async with self._semaphore:
+            data = await asyncio.to_thread(_sync_zip_walk, zipfile)
+        return data
+
+    async def zip_read_nested(self, zipfile: str, members: Tuple[str, ...]) -> bytes:
+        """
+        Reads a file in the zip by the chain of members that leads
+        to it (see `zip_walk`), nested zips are read into memory.
+        """
+        async with self._semaphore:
+            data = await asyncio.to_thread(_sync_zip_read_nested, zipfile, members)
+        return data
+
+    async def zip_read_nested_batch(self,
+                                    zipfile: str,
+                                    parents: Tuple[str, ...],
+                                    names: List[str]) -> Dict[str, bytes]:
+        """
+        Reads several files from the same nested zip, which is
+        found by the chain of `parents` (see `zip_walk`). Each zip
+        in the chain is only read into memory once for all of them.
+        """
+        async with self._semaphore:
+            data = await asyncio.to_thread(_sync_zip_read_nested_batch, zipfile, parents, names)
+        return data
+
     async def mk_dir(self, dir_name: str):
         await asyncio.to_thread(os.mkdir, dir_name)
 
+    async def mk_dirs(self, dir_names: List[str]):
+        """
+        Creates each directory along with any missing parents,
+        ignoring any that already exist.
+        """
+        await asyncio.to_thread(_sync_mk_dirs, dir_names)
+
     def mk_tmp_file(self: Self, mode: Optional[str] = None) -> 'TmpFile':
         f = NamedTemporaryFile(mode) if mode else NamedTemporaryFile() # type: ignore
         return TmpFile(f, self)
@@ -56,6 +119,12 @@ class IoService:
                 data = await f.read()
         return data
 
+    async def f_read_bytes(self, file_path: str) -> bytes:
+        async with self._semaphore:
+            async with aiofiles.open(file_path, 'rb') as f:
+                data = await f.read()
+        return data
+
     async def f_read_lines(self, file_path: str, encoding: Optional[str] = None) -> AsyncGenerator[str, None]:
         async with self._semaphore:
             async with aiofiles.open(file_path, 'r', encoding=encoding) as f:
@@ -69,6 +138,50 @@ class IoService:
                 data = await f.read(length)
         return data
 
+    async def f_decodes_as(self, file_path: str, encoding: str, chunk_size: int = 2 ** 20) -> bool:
+        """
+        Whether the whole file can be decoded with the encoding,
+        the file is decoded incrementally so it's never held in
+        memory all at once.
+        """
+        async with self._semaphore:
+            decodes = await asyncio.to_thread(_sync_decodes_as, file_path, encoding, chunk_size)
+        return decodes
+
+    async def f_read_csv_chunks(self,
+                                file_path: str,
+                                chunk_size: int,
+                                encoding: Optional[str] = None) -> AsyncGenerator[Any, None]:
+        """
+        Reads the csv as data frames of `chunk_size` rows, each
+        chunk is only read once the last has been consumed. Every
+        column is read as a string, with empty fields left as
+        empty strings rather than treated as missing.
+        """
+        async with self._semaphore:
+            reader = await asyncio.to_thread(
+                pd.read_csv,
+                file_path,
+                dtype=str,
+                encoding=encoding,
+                keep_default_na=False,
+                na_filter=False,
+                chunksize=chunk_size,
+            )
+            with reader:
+                while True:
+                    chunk = await asyncio.to_thread(next, reader, None)
+                    if chunk is None:
+                        break
+                    yield chunk
+
+    async def f_mmap(self, file_path: str) -> mmap.mmap:
+        """
+        Maps the file read only, the file descriptor is closed
+        straight away as the mapping doesn't depend on it.
+        """
+        return await asyncio.to_thread(_sync_mmap, file_path)
+
     async def f_write_chunks(self,
                              file_path: str,
                              chunks: AsyncGenerator[bytes, None]) -> None:
@@ -77,6 +190,27 @@ class IoService:
                 async for chunk in chunks:
                     await f.write(chunk)
 
+    async def f_write_chunks_at(self,
+                                file_path: str,
+                                offset: int,
+                                chunks: AsyncGenerator[bytes, None]) -> None:
+        """
+        Writes the chunks into an existing file starting at the
+        offset, without truncating the rest of the file.
+        """
+        async with self._semaphore:
+            async with aiofiles.open(file_path, 'r+b') as f:
+                await f.seek(offset)
+                async for chunk in chunks:
+                    await f.write(chunk)
+
+    async def f_allocate(self, file_path: str, size: int) -> None:
+        """
+        Creates a file of the given size, or resizes it if it
+        already exists, so parts of it can be written out of order.
+        """
+        await asyncio.to_thread(_sync_allocate, file_path, size)
+
     async def f_read_chunks(self,
                             file_path: str,
                             chunk_size=1024) -> AsyncGenerator[bytes, None]:
@@ -93,6 +227,14 @@ class IoService:
             async with aiofiles.open(file_path, 'w') as f:
                 await f.write(data)
 
+    async def f_write_bytes(self, file_path: str, data: bytes):
+        async with self._semaphore:
+            async with aiofiles.open(file_path, 'wb') as f:
+                await f.write(data)
+
+    async def f_move(self, src_path: str, dst_path: str):
+        await asyncio.to_thread(os.replace, src_path, dst_path)
+
     async def f_delete(self, file_path: str):
         await asyncio.to_thread(os.remove, file_path)
 
@@ -143,9 +285,69 @@ class TmpFile:
     async def __aexit__(self: Self, *args, **kwargs):
         await self.__aexit__(*args, **kwargs)
 
-def _sync_unzip(zipfile: str, unzip_to: str):
+def _sync_unzip(zipfile: str, unzip_to: str, members: Optional[List[str]] = None):
+    with ZipFile(zipfile, 'r') as z:
+        z.extractall(unzip_to, members)
+
+def _sync_zip_members(zipfile: str) -> List[Tuple[str, int]]:
+    with ZipFile(zipfile, 'r') as z:
+        return [(info.filename, info.file_size) for info in z.infolist()]
+
+def _sync_zip_read_member(zipfile: str, member: str) -> bytes:
+    with ZipFile(zipfile, 'r') as z:
+        return z.read(member)
+
+def _sync_zip_walk(zipfile: str | BytesIO,
+                   parents: Tuple[str, ...] = ()) -> List[Tuple[Tuple[str, ...], int]]:
+    files = []
+    with ZipFile(zipfile, 'r') as z:
+        for info in z.infolist():
+            if info.is_dir():
+                continue
+            members = (*parents, info.filename)
+            if info.filename.endswith('.zip'):
+                files.extend(_sync_zip_walk(BytesIO(z.read(info)), members))
+            else:
+                files.append((members, info.file_size))
+    return files
+
+def _sync_zip_read_nested(zipfile: str | BytesIO, members: Tuple[str, ...]) -> bytes:
+    member, *rest = members
+    with ZipFile(zipfile, 'r') as z:
+        data = z.read(member)
+    return _sync_zip_read_nested(BytesIO(data), tuple(rest)) if rest else data
+
+def _sync_zip_read_nested_batch(zipfile: str | BytesIO,
+                                parents: Tuple[str, ...],
+                                names: List[str]) -> Dict[str, bytes]:
     with ZipFile(zipfile, 'r') as z:
-        z.extractall(unzip_to)
+        if not parents:
+            return { name: z.read(name) for name in names }
+        data = z.read(parents[0])
+    return _sync_zip_read_nested_batch(BytesIO(data), parents[1:], names)
+
+def _sync_mk_dirs(dir_names: List[str]):
+    for dir_name in dir_names:
+        os.makedirs(dir_name, exist_ok=True)
+
+def _sync_allocate(file_path: str, size: int):
+    with open(file_path, 'ab') as f:
+        f.truncate(size)
+
+def _sync_decodes_as(file_path: str, encoding: str, chunk_size: int) -> bool:
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        with open(file_path, 'rb') as f:
+            while chunk := f.read(chunk_size):
+                decoder.decode(chunk)
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+def _sync_mmap(file_path: str) -> mmap.mmap:
+    with open(file_path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
 def _sync_check_if_dir_empty(dir_name: str) -> bool:
     with os.scandir(dir_name) as it:
@@ -1,2 +1,3 @@
 from .initialiser import StaticEnvironmentInitialiser
 from .config import *
+from .download import Downloader, DownloadConfig, DownloadError
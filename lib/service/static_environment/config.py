@@ -6,3 +6,9 @@ class Target:
     web_dst: str
     zip_dst: str | None
     token: str | None
+
+    """
+    When false the zip is downloaded but not extracted, for
+    targets whose members are read straight from the zip.
+    """
+    extract: bool = field(default=True, kw_only=True)
@@ -0,0 +1,154 @@
+import asyncio
+from dataclasses import asdict, dataclass, field
+import json
+from logging import getLogger
+import re
+from typing import Dict, Iterator, List, Optional, Self, Tuple
+
+from lib.service.io import IoService
+from lib.service.http import AbstractClientSession, AbstractGetResponse, CacheHeader
+
+_CONTENT_RANGE = re.compile(r'bytes \d+-\d+/(\d+)')
+
+@dataclass(frozen=True)
+class DownloadConfig:
+    segment_size: int = field(default=64 * 1024 * 1024)
+    parallel_segments: int = field(default=4)
+
+    """
+    The size of the chunks read from responses, and written
+    to disk. Much larger than the usual chunks as these files
+    can be several gigabytes.
+    """
+    chunk_size: int = field(default=1024 * 1024)
+
+@dataclass
+class DownloadManifest:
+    url: str
+    size: int
+    segment_size: int
+    complete: List[int] = field(default_factory=list)
+
+    def segments(self: Self) -> Iterator[Tuple[int, int, int]]:
+        """
+        The index, first byte & last byte of every segment.
+        """
+        for index, start in enumerate(range(0, self.size, self.segment_size)):
+            yield index, start, min(start + self.segment_size, self.size) - 1
+
+class Downloader:
+    """
+    Downloads a file to `dst`. When the server supports range
+    requests the file is downloaded in segments, a few at a
+    time, into `{dst}.part`. Each segment is recorded in the
+    manifest (`{dst}.manifest.json`) once it's written, so a
+    failed download resumes with just the segments it's missing
+    rather than starting over. Once every segment is written
+    the part file is moved to `dst`.
+
+    When the server doesn't support range requests the file is
+    streamed straight to `dst`, and deleted if that fails.
+    """
+    _logger = getLogger(f'{__name__}.Downloader')
+
+    def __init__(self: Self,
+                 io: IoService,
+                 session: AbstractClientSession,
+                 config: DownloadConfig):
+        self._io = io
+        self._session = session
+        self._config = config
+
+    async def download(self: Self, url: str, dst: str, headers: Dict[str, str]) -> None:
+        headers = { **headers, CacheHeader.DISABLED: 'True' }
+        part_path, manifest_path = f'{dst}.part', f'{dst}.manifest.json'
+
+        manifest = await self._load_manifest(url, part_path, manifest_path)
+        if manifest is None:
+            async with self._session.get(url, { **headers, 'Range': 'bytes=0-0' }) as resp:
+                match resp.status, _total_size(resp):
+                    case 200, _:
+                        # the range was ignored, so this is the whole file
+                        return await self._stream(resp, dst)
+                    case 206, int(size):
+                        manifest = DownloadManifest(url, size, self._config.segment_size)
+                    case 206, None:
+                        manifest = None
+                    case status, _:
+                        raise DownloadError(f'status {status} for {url}')
+
+            if manifest is None:
+                async with self._session.get(url, headers) as resp:
+                    _expect_status(resp, 200, url)
+                    return await self._stream(resp, dst)
+
+            await self._io.f_allocate(part_path, manifest.size)
+            await self._save_manifest(manifest_path, manifest)
+        else:
+            self._logger.info(f'Resuming "{url}", {len(manifest.complete)} segments already done')
+
+        lock = asyncio.Lock()
+        semaphore = asyncio.Semaphore(self._config.parallel_segments)
+
+        async def fetch(index: int, start: int, end: int) -> None:
+            async with semaphore:
+                range_headers = { **headers, 'Range': f'bytes={start}-{end}' }
+                async with self._session.get(url, range_headers) as resp:
+                    _expect_status(resp, 206, url)
+                    chunks = resp.stream(self._config.chunk_size)
+                    await self._io.f_write_chunks_at(part_path, start, chunks)
+            async with lock:
+                manifest.complete.append(index)
+                await self._save_manifest(manifest_path, manifest)
+
+        complete = set(manifest.complete)
+        await asyncio.gather(*[
+            fetch(index, start, end)
+            for index, start, end in manifest.segments()
+            if index not in complete
+        ])
+
+        await self._io.f_move(part_path, dst)
+        await self._io.f_delete(manifest_path)
+
+    async def _stream(self: Self, resp: AbstractGetResponse, dst: str) -> None:
+        try:
+            await self._io.f_write_chunks(dst, resp.stream(self._config.chunk_size))
+        except:
+            if await self._io.is_file(dst):
+                await self._io.f_delete(dst)
+            raise
+
+    async def _load_manifest(self: Self,
+                             url: str,
+                             part_path: str,
+                             manifest_path: str) -> Optional[DownloadManifest]:
+        if not await self._io.is_file(manifest_path) or not await self._io.is_file(part_path):
+            return None
+
+        manifest = DownloadManifest(**json.loads(await self._io.f_read(manifest_path)))
+        if manifest.url != url \
+                or manifest.segment_size != self._config.segment_size \
+                or await self._io.f_size(part_path) != manifest.size:
+            self._logger.info(f'Discarding manifest of "{url}", it no longer matches')
+            return None
+        return manifest
+
+    async def _save_manifest(self: Self, manifest_path: str, manifest: DownloadManifest) -> None:
+        # written in full elsewhere first, so it's never half written
+        await self._io.f_write(f'{manifest_path}.tmp', json.dumps(asdict(manifest)))
+        await self._io.f_move(f'{manifest_path}.tmp', manifest_path)
+
+def _total_size(resp: AbstractGetResponse) -> Optional[int]:
+    match _CONTENT_RANGE.fullmatch(resp.response_headers.get('Content-Range', '')):
+        case None:
+            return None
+        case m:
+            return int(m.group(1))
+
+def _expect_status(resp: AbstractGetResponse, status: int, url: str) -> None:
+    if resp.status != status:
+        raise DownloadError(f'status {resp.status} for {url}, expected {status}')
+
+class DownloadError(Exception):
+    pass
@@ -11,8 +11,11 @@ from typing import (
 from lib.service.io import IoService
 from lib.service.http import AbstractClientSession, CacheHeader
 from .config import Target
+from .download import Downloader, DownloadConfig
 
-CHUNKSIZE_16KB = 16384
+# The number of batches the members of a zip are split into,
+# each batch is extracted in its own thread.
+_EXTRACT_BATCHES = 4
 
 _T = TypeVar('_T', bound=Target)
 
@@ -24,15 +27,19 @@ class StaticEnvironmentInitialiser:
     _targets: List[Target]
     _directories: List[str]
 
-    def __init__(self, targets, dirs, io, session) -> None:
+    def __init__(self, targets, dirs, io, session, downloader) -> None:
         self._targets = targets
         self._directories = dirs
         self._io = io
         self._session = session
+        self._downloader = downloader
 
     @staticmethod
-    def create(io: IoService, session: AbstractClientSession):
-        return StaticEnvironmentInitialiser([], [], io, session)
+    def create(io: IoService,
+               session: AbstractClientSession,
+               download_config: DownloadConfig = DownloadConfig()):
+        downloader = Downloader(io, session, download_config)
+        return StaticEnvironmentInitialiser([], [], io, session, downloader)
 
     def queue_directory(self, directory: str):
         self._directories.append(directory)
@@ -61,20 +68,14 @@ class StaticEnvironmentInitialiser:
     async def _install_target(self, target: Target) -> None:
         self._logger.info(f'Checking Target "{target.web_dst}"')
         w_out = '_out_web/%s' % target.web_dst
-        z_out = target.zip_dst and '_out_zip/%s' % target.zip_dst
+        z_out = target.extract and target.zip_dst and '_out_zip/%s' % target.zip_dst
 
         if not await self._io.is_file(w_out):
             self._logger.info(f'Downloading "{target.url} to {w_out}"')
             headers = { CacheHeader.DISABLED: 'True' }
             if target.token:
                 headers['Authorization'] = f'Basic {target.token}'
-            try:
-                async with self._session.get(target.url, headers) as resp:
-                    await self._io.f_write_chunks(w_out, resp.stream(CHUNKSIZE_16KB))
-            except:
-                if await self._io.is_file(w_out):
-                    await self._io.f_delete(w_out)
-                raise
+            await self._downloader.download(target.url, w_out, headers)
 
         if z_out and not await self._io.is_dir(z_out):
             self._logger.info(f'Creating zip output dir "{z_out}"')
@@ -83,34 +84,54 @@ class StaticEnvironmentInitialiser:
         if z_out and await self._io.is_directory_empty(z_out):
             self._logger.info(f'Extracting contents into "{z_out}"')
             try:
-                await self._io.extract_zip(w_out, z_out)
-                await self._recursively_unzip_child_zips(z_out)
+                await self._extract_zip(w_out, z_out)
             except Exception as e:
                 self._logger.error(f'failed to unzip, {w_out} to {z_out}')
                 await self._io.f_delete(w_out)
                 raise e
 
-    async def _recursively_unzip_child_zips(self, directory: str):
+    async def _extract_zip(self, zip_path: str, unzip_to: str) -> None:
         """
-        This walks the directory repeatedly until there are no
-        zip files within the directory. While it walks it, it
-        unzips any zip file it comes across and then removes it.
-
-        After it walking it recursively calls itself. It will
-        terminate once it stops finding zips.
+        The members of the zip are split into batches of about the
+        same size, which are extracted at the same time in their own
+        threads. Any zips within a batch are extracted (and removed)
+        as soon as that batch is done, so nested zips are extracted
+        in the same pass, rather than walking the output for zips
+        after everything has been extracted.
+
+        Members of different batches can share directories, which
+        `ZipFile.extractall` would race to create, so they're all
+        created before any batch starts.
         """
-        zip_found = False
-
-        async for root, _, files in self._io.walk_dir(directory):
-            for file in files:
-                if file.endswith('.zip'):
-                    zip_found = True
-                    zip_path = path.join(root, file)
-                    dst_path = path.join(root, path.splitext(file)[0])
-                    await self._io.extract_zip(zip_path, dst_path)
-                    await self._io.f_delete(zip_path)
-
-        if zip_found:
-            await self._recursively_unzip_child_zips(directory)
-
-
+        members = sorted(await self._io.zip_members(zip_path), key=lambda m: m[1], reverse=True)
+        names = [name for name, _ in members]
+        await self._io.mk_dirs(_member_dirs(unzip_to, names))
+
+        async def extract(batch: List[str]) -> None:
+            await self._io.extract_zip_members(zip_path, batch, unzip_to)
+            await asyncio.gather(*[
+                self._extract_child_zip(path.join(unzip_to, name))
+                for name in batch
+                if name.endswith('.zip')
+            ])
+
+        await asyncio.gather(*[
+            extract(batch)
+            for i in range(_EXTRACT_BATCHES)
+            if (batch := names[i::_EXTRACT_BATCHES])
+        ])
+
+    async def _extract_child_zip(self, zip_path: str) -> None:
+        await self._extract_zip(zip_path, path.splitext(zip_path)[0])
+        await self._io.f_delete(zip_path)
+
+def _member_dirs(unzip_to: str, names: List[str]) -> List[str]:
+    # only directories that stay within `unzip_to`, anything else
+    # is left to `ZipFile` which sanitises the member paths.
+    root = path.normpath(unzip_to)
+    dirs = {
+        path.normpath(path.join(root, path.dirname(name)))
+        for name in names
+        if path.dirname(name) and not path.isabs(name)
+    }
+    return sorted(d for d in dirs if d.startswith(root + path.sep))
@@ -0,0 +1,102 @@
+import json
+import re
+
+import pytest
+
+from lib.service.http import AbstractClientSession, AbstractGetResponse
+from lib.service.io import IoService
+
+from ..download import Downloader, DownloadConfig, DownloadManifest
+
+_body = bytes(range(256)) * 40
+
+class FakeResponse(AbstractGetResponse):
+    def __init__(self, status, body, headers):
+        self._status, self._body, self._headers = status, body, headers
+
+    @property
+    def status(self):
+        return self._status
+
+    @property
+    def response_headers(self):
+        return self._headers
+
+    async def json(self):
+        raise NotImplementedError()
+
+    async def text(self):
+        raise NotImplementedError()
+
+    async def read(self):
+        return self._body
+
+    async def stream(self, chunk_size):
+        for i in range(0, len(self._body), chunk_size):
+            yield self._body[i:i + chunk_size]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+class FakeSession(AbstractClientSession):
+    def __init__(self, ranges=True):
+        self.ranges = ranges
+        self.requested = []
+
+    def get(self, url, headers=None):
+        match = re.fullmatch(r'bytes=(\d+)-(\d+)', (headers or {}).get('Range', ''))
+        self.requested.append(match and (int(match[1]), int(match[2])))
+        if not self.ranges or not match:
+            return FakeResponse(200, _body, {})
+        start, end = int(match[1]), int(match[2])
+        return FakeResponse(206, _body[start:end + 1], {
+            'Content-Range': f'bytes {start}-{end}/{len(_body)}',
+        })
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    @property
+    def closed(self):
+        return False
+
+config = DownloadConfig(segment_size=1000, parallel_segments=3, chunk_size=64)
+
+@pytest.mark.asyncio
+async def test_downloads_in_segments(tmp_path):
+    dst = str(tmp_path / 'file.zip')
+    session = FakeSession()
+    await Downloader(IoService.create(None), session, config).download('url', dst, {})
+
+    assert (tmp_path / 'file.zip').read_bytes() == _body
+    assert not (tmp_path / 'file.zip.part').exists()
+    assert not (tmp_path / 'file.zip.manifest.json').exists()
+    assert len(session.requested) == 1 + 11
+
+@pytest.mark.asyncio
+async def test_resumes_missing_segments(tmp_path):
+    dst = str(tmp_path / 'file.zip')
+    (tmp_path / 'file.zip.part').write_bytes(_body[:3000] + bytes(len(_body) - 3000))
+    manifest = DownloadManifest('url', len(_body), 1000, [0, 1, 2])
+    (tmp_path / 'file.zip.manifest.json').write_text(json.dumps(manifest.__dict__))
+
+    session = FakeSession()
+    await Downloader(IoService.create(None), session, config).download('url', dst, {})
+
+    assert (tmp_path / 'file.zip').read_bytes() == _body
+    assert sorted(session.requested) == [(s, min(s + 999, len(_body) - 1)) for s in range(3000, len(_body), 1000)]
+
+@pytest.mark.asyncio
+async def test_streams_without_range_support(tmp_path):
+    dst = str(tmp_path / 'file.zip')
+    session = FakeSession(ranges=False)
+    await Downloader(IoService.create(None), session, config).download('url', dst, {})
+
+    assert (tmp_path / 'file.zip').read_bytes() == _body
+    assert len(session.requested) == 1
@@ -0,0 +1,57 @@
+import io
+import os
+from unittest.mock import AsyncMock
+from zipfile import ZipFile
+
+import pytest
+
+from lib.service.http import AbstractClientSession
+from lib.service.io import IoService
+
+from ..initialiser import StaticEnvironmentInitialiser
+
+def zip_bytes(files) -> bytes:
+    buffer = io.BytesIO()
+    with ZipFile(buffer, 'w') as z:
+        for name, body in files.items():
+            z.writestr(name, body)
+    return buffer.getvalue()
+
+@pytest.mark.asyncio
+async def test_extracts_nested_zips_in_one_pass(tmp_path):
+    week = zip_bytes({ '001_SALES_DATA.DAT': 'B;1;\n' })
+    year = zip_bytes({ '20010107.zip': week, 'readme.txt': 'hello' })
+    outer = zip_bytes({ '2001.zip': year, 'a/b.csv': 'x,y\n' })
+    (tmp_path / 'outer.zip').write_bytes(outer)
+
+    initialiser = StaticEnvironmentInitialiser.create(
+        IoService.create(None), AsyncMock(spec=AbstractClientSession))
+    await initialiser._extract_zip(str(tmp_path / 'outer.zip'), str(tmp_path / 'out'))
+
+    files = sorted(
+        os.path.relpath(os.path.join(root, f), tmp_path / 'out')
+        for root, _, fs in os.walk(tmp_path / 'out')
+        for f in fs
+    )
+    assert files == [
+        '2001/20010107/001_SALES_DATA.DAT',
+        '2001/readme.txt',
+        'a/b.csv',
+    ]
+    assert (tmp_path / 'out/2001/20010107/001_SALES_DATA.DAT').read_text() == 'B;1;\n'
+
+@pytest.mark.asyncio
+async def test_extracts_members_sharing_directories(tmp_path):
+    files = {
+        f'd{n}/sub/f{m}.txt': f'{n}-{m}'
+        for n in range(40)
+        for m in range(40)
+    }
+    (tmp_path / 'many.zip').write_bytes(zip_bytes(files))
+
+    initialiser = StaticEnvironmentInitialiser.create(
+        IoService.create(None), AsyncMock(spec=AbstractClientSession))
+    await initialiser._extract_zip(str(tmp_path / 'many.zip'), str(tmp_path / 'out'))
+
+    for name, body in files.items():
+        assert (tmp_path / 'out' / name).read_text() == body
@@ -1,5 +1,5 @@
 import asyncio
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 from lib.pipeline.abs.defaults import (
     ABS_MAIN_STRUCTURES,
@@ -27,7 +27,14 @@ class Environment:
     sale_price_annual: AnnualSalePriceDiscovery
     gnaf: GnafPublicationDiscovery
 
-async def initialise(io_service: IoService, session: AbstractClientSession) -> Environment:
+async def initialise(io_service: IoService,
+                     session: AbstractClientSession,
+                     extract_sale_prices: bool = True) -> Environment:
+    """
+    When `extract_sale_prices` is false the property sale zips
+    are downloaded but not extracted, for when their files are
+    read straight from the zips.
+    """
     initialiser = StaticEnvironmentInitialiser.create(io_service, session)
 
     land_value_dis = LandValueDiscovery()
@@ -55,11 +62,8 @@ async def initialise(io_service: IoService, session: AbstractClientSession) -> E
     if land_value_dis.latest:
         initialiser.queue_target(land_value_dis.latest)
 
-    for sale_price_target in w_sale_price.links:
-        initialiser.queue_target(sale_price_target)
-
-    for sale_price_target in a_sale_price.links:
-        initialiser.queue_target(sale_price_target)
+    for sale_price_target in [*w_sale_price.links, *a_sale_price.links]:
+        initialiser.queue_target(replace(sale_price_target, extract=extract_sale_prices))
 
     await initialiser.initalise_environment()
 
@@ -1,12 +1,17 @@
-from functools import reduce
-import json
-from typing import Any, Dict, List, Set, Tuple
+import os
+from typing import Dict, List, Tuple
 from lib.service.io import IoService
+from lib.service.http.middleware.cache.file_cache import FileCacher
+from lib.service.http.middleware.cache.index import CacheIndex
 
-_CACHE_STATE = './_out_state/http-cache.json'
+_CACHE_STATE_DIR = './_out_state'
 _CACHE_DIR = '_out_cache'
 
-async def fix_cache(io: IoService) -> None:
+_LEGACY_SUFFIX = '-cache.json'
+
+async def fix_cache(io: IoService,
+                    state_dir: str = _CACHE_STATE_DIR,
+                    cache_dir: str = _CACHE_DIR) -> None:
     """
     For a number reasons it's possible for the cache to
     become kind of broken. Such reasons include:
@@ -16,19 +21,30 @@ async def fix_cache(io: IoService) -> None:
        recording a new asset (resulting it being orphaned).
 
     2. The logic for cache could be buggy in some cases.
+
+    Any cache state still in the legacy json format is migrated
+    to an index first, otherwise the files it refers to would
+    look orphaned and be deleted.
     """
-    cache_states: Dict[str, Dict[str, Any]] = {
-        f: json.loads(await io.f_read(f))
-        async for f in io.grep_dir('./_out_state', '*-cache.json')
+    legacy_states = [f async for f in io.grep_dir(state_dir, f'*{_LEGACY_SUFFIX}')]
+    for f in legacy_states:
+        cache_id = os.path.basename(f)[:-len(_LEGACY_SUFFIX)]
+        print(f'Migrating {f}')
+        async with FileCacher.create(io, cache_id, cache_dir=cache_dir, state_dir=state_dir):
+            pass
+
+    cache_indexes: Dict[str, CacheIndex] = {
+        f: CacheIndex.open(f)
+        async for f in io.grep_dir(state_dir, '*-cache.sqlite')
     }
 
-    files_referenced_in_cache: List[str] = reduce(lambda acc, it: [*acc, *[
-        f'{_CACHE_DIR}/{fmt['location']}'
-        for formats in it['files'].values()
-        for fmt in formats.values()
-    ]], cache_states.values(), [])
+    files_referenced_in_cache = {
+        f'{cache_dir}/{location}'
+        for index in cache_indexes.values()
+        for _, _, location in index.entries()
+    }
 
-    files_in_fs = { f async for f in io.grep_dir(_CACHE_DIR, '*') }
+    files_in_fs = { f async for f in io.grep_dir(cache_dir, '*') }
 
     print('Checking if FILES on DISC are MISSING from CACHE STATE')
     for file in files_in_fs:
@@ -37,23 +53,19 @@ async def fix_cache(io: IoService) -> None:
             await io.f_delete(file)
 
     print('CHECKING IF CACHED FILES ARE ON DISC')
-    for f, state in cache_states.items():
-        remove_from_state: List[Tuple[str, str]] = []
-
-        for url, formats in state['files'].items():
-            for fmt_name, fmt in formats.items():
-                path = f'{_CACHE_DIR}/{fmt['location']}'
-                if path not in files_in_fs:
-                    remove_from_state.append((url, fmt_name))
+    for f, index in cache_indexes.items():
+        remove_from_state: List[Tuple[str, str]] = [
+            (url, fmt_name)
+            for url, fmt_name, location in index.entries()
+            if f'{cache_dir}/{location}' not in files_in_fs
+        ]
 
         for url, fmt in remove_from_state:
             print(f'removing {fmt} from {url}')
-            del state['files'][url][fmt]
-            if not state['files'][url]:
-                del state['files'][url]
+            index.delete(url, fmt)
 
         print(f"Saving {f}")
-        await io.f_write(f, json.dumps(state, indent=1))
+        index.close()
 
 
 if __name__ == '__main__':
@@ -65,4 +77,3 @@ if __name__ == '__main__':
 
     io = IoService.create(file_limit)
     asyncio.run(fix_cache(io))
-
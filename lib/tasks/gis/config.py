@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
 from typing import List, Optional, Literal
-from lib.pipeline.gis import DateRangeParam, GisWorkerDbMode
+from lib.pipeline.gis import DateRangeParam, GisWorkerDbMode, PagingMode
+from lib.service.http.middleware.cache import CacheStorage
 
 
 class GisTaskConfig:
@@ -16,6 +17,9 @@ class GisTaskConfig:
         projections: List['GisTaskConfig.ProjectionKind']
         exp_backoff_attempts: int
         disable_cache: bool
+        decode_workers: Optional[int] = field(default=None)
+        cache_storage: CacheStorage = field(default='plain')
+        paging: PagingMode = field(default='offset')
 
     @dataclass
     class Deduplication:
@@ -22,6 +22,7 @@ from lib.pipeline.gis import (
     GisPipelineTelemetry,
     GisProjection,
     DateRangeParam,
+    ShardPlan,
     HOST_SEMAPHORE_CONFIG,
     ENSW_DA_PROJECTION,
     SNSW_LOT_PROJECTION,
@@ -44,6 +45,8 @@ from lib.tooling.schema import SchemaController, SchemaDiscovery, SchemaCommand
 
 from .config import GisTaskConfig
 
+_SHARD_PLAN_PATH = './_out_state/gis-shard-plan.sqlite'
+
 def http_limits_of(ss: List[HostSemaphoreConfig]) -> int:
     return reduce(lambda acc, it: acc + it.limit, ss, 0)
 
@@ -105,12 +108,16 @@ async def stage_gis_api_data(
 
     cache_cleaner: AbstractCacheCleaner
 
+    shard_plan: Optional[ShardPlan]
+
     if conf.disable_cache:
         http_file_cache = None
+        shard_plan = None
         cache_cleaner = DisabledCacheCleaner()
     else:
-        http_file_cache = HttpLocalCache.create(io, 'gis')
-        cache_cleaner = CacheCleaner(http_file_cache)
+        http_file_cache = HttpLocalCache.create(io, 'gis', storage=conf.cache_storage)
+        shard_plan = ShardPlan.open(_SHARD_PLAN_PATH)
+        cache_cleaner = CacheCleaner(http_file_cache, shard_plan)
 
     projections: List[GisProjection] = []
 
@@ -120,7 +127,7 @@ async def stage_gis_api_data(
         projections.append(SNSW_PROP_PROJECTION)
 
     match conf.db_mode:
-        case 'write':
+        case 'write' | 'copy':
             api_workers = http_limits_of(HOST_SEMAPHORE_CONFIG)
             db_workers = conf.db_workers
         case 'skip':
@@ -141,18 +148,24 @@ async def stage_gis_api_data(
                 api_worker_backpressure=db_workers * 4,
                 db_mode=conf.db_mode,
                 db_workers=db_workers,
-                chunk_size=None),
+                chunk_size=None,
+                decode_workers=conf.decode_workers),
             feature_client,
             db,
             telemetry,
             cache_cleaner)
-        sharder_factory = FeaturePaginationSharderFactory(feature_client, telemetry)
+        sharder_factory = FeaturePaginationSharderFactory(
+            feature_client, telemetry, plan=shard_plan, paging=conf.paging)
         pipeline = GisPipeline(sharder_factory, ingestion)
 
-        await pipeline.start([
-            (p, conf.gis_params)
-            for p in projections
-        ])
+        try:
+            await pipeline.start([
+                (p, conf.gis_params)
+                for p in projections
+            ])
+        finally:
+            if shard_plan is not None:
+                shard_plan.close()
 
 async def run_in_console(
     open_file_limit: int,
@@ -164,7 +177,7 @@ async def run_in_console(
     clock = ClockService()
     controller = SchemaController(io, db, SchemaDiscovery.create(io))
     match config.db_mode:
-        case 'write':
+        case 'write' | 'copy':
             await controller.command(SchemaCommand.Drop(ns='nsw_spatial'))
             await controller.command(SchemaCommand.Create(ns='nsw_spatial'))
     await stage_gis_api_data(io, db, clock, config)
@@ -183,9 +196,12 @@ if __name__ == '__main__':
     parser.add_argument("--gis-range", type=str)
     parser.add_argument("--instance", type=int, required=True)
     parser.add_argument("--db-connections", type=int, default=32)
-    parser.add_argument("--db-mode", choices=['write', 'print_head_then_quit', 'skip'], required=True)
+    parser.add_argument("--db-mode", choices=['write', 'copy', 'print_head_then_quit', 'skip'], required=True)
     parser.add_argument("--exp-backoff-attempts", type=int, default=8)
     parser.add_argument("--disable-cache", action='store_true', required=False)
+    parser.add_argument("--decode-workers", type=int, required=False)
+    parser.add_argument("--cache-storage", choices=['plain', 'compressed'], default='plain')
+    parser.add_argument("--paging", choices=['offset', 'object_id'], default='offset')
     parser.add_argument('--projections', nargs='*', choices=GisTaskConfig.projection_kinds)
 
     args = parser.parse_args()
@@ -218,6 +234,9 @@ if __name__ == '__main__':
                     gis_params=params,
                     exp_backoff_attempts=args.exp_backoff_attempts,
                     disable_cache=args.disable_cache,
+                    decode_workers=args.decode_workers,
+                    cache_storage=args.cache_storage,
+                    paging=args.paging,
                     projections=args.projections or GisTaskConfig.projection_kinds,
                 ),
             ),
@@ -157,7 +157,6 @@ async def ingest_all(config: IngestConfig):
                 worker_config=GnafWorkerConfig(
                     db_config=instance_cfg.database,
                     db_poolsize=8,
-                    batch_size=1000,
                 ),
             ),
             db_service,
@@ -36,6 +36,7 @@ if __name__ == '__main__':
     parser.add_argument("--workers", type=int, required=True)
     parser.add_argument("--debug", action='store_true', default=False)
     parser.add_argument("--reset-schema", action='store_true', default=False)
+    parser.add_argument("--direct-copy", action='store_true', default=False)
 
     args = parser.parse_args()
     config_logging(worker=None, debug=args.debug)
@@ -66,7 +67,7 @@ if __name__ == '__main__':
             worker_config=gnaf.GnafWorkerConfig(
                 db_config=instance_cfg.database,
                 db_poolsize=1,
-                batch_size=1000,
+                staging=not args.direct_copy,
             ),
         )
 
@@ -11,6 +11,7 @@ class NswVgTaskConfig:
         workers: int
         sub_workers: int
         db_config: DatabaseConfig
+        page_size: int = field(default=1000)
 
     @dataclass
     class PsiIngest:
@@ -38,6 +39,12 @@ class NswVgTaskConfig:
             db_config: DatabaseConfig
             db_conn: int
 
+            """
+            The number of rows copied into the database
+            before they're committed.
+            """
+            flush_size: int = field(default=50_000)
+
         @dataclass
         class Main:
             truncate_raw_earlier: bool
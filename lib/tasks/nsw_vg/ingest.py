@@ -15,6 +15,7 @@ from .ingest_property_sales import ingest_property_sales_rows
 from .ingest_land_values import ingest_land_values
 
 ZIP_DIR = './_out_zip'
+WEB_DIR = './_out_web'
 _logger = logging.getLogger(__name__)
 
 async def ingest_nswvg(
@@ -69,6 +70,7 @@ if __name__ == '__main__':
     parser.add_argument("--lv-worker-debug", action='store_true', default=False)
     parser.add_argument("--lv-worker-db-pool-size", type=int, default=1)
     parser.add_argument("--lv-worker-chunk-size", type=int, default=1000)
+    parser.add_argument("--lv-worker-flush-size", type=int, default=50_000)
     parser.add_argument("--lv-truncate-earlier", action='store_true', default=False)
 
     parser.add_argument("--load-property-sales", action='store_true', default=False)
@@ -76,6 +78,7 @@ if __name__ == '__main__':
     parser.add_argument("--ps-publish-max", type=int, default=None)
     parser.add_argument("--ps-download-min", type=date.fromisoformat, default=None)
     parser.add_argument("--ps-download-max", type=date.fromisoformat, default=None)
+    parser.add_argument("--ps-read-from-archive", action='store_true', default=False)
     parser.add_argument("--ps-workers", type=int, default=1)
     parser.add_argument("--ps-worker-debug", type=int, default=False)
     parser.add_argument("--ps-worker-file-limit", type=int, default=None)
@@ -87,6 +90,7 @@ if __name__ == '__main__':
     parser.add_argument("--nswlrs-propdesc-workers", type=int, default=1)
     parser.add_argument("--nswlrs-propdesc-subworkers", type=int, default=1)
     parser.add_argument("--nswlrs-propdesc-child-debug", action='store_true', default=False)
+    parser.add_argument("--nswlrs-propdesc-page-size", type=int, default=1000)
 
     parser.add_argument("--dedup", action='store_true', default=False)
     parser.add_argument("--dedup-reinitialise-destination-schema", action='store_true', default=False)
@@ -119,6 +123,7 @@ if __name__ == '__main__':
                 db_conn=args.lv_worker_db_pool_size,
                 db_config=instance_cfg.database,
                 chunk_size=args.lv_worker_chunk_size,
+                flush_size=args.lv_worker_flush_size,
             ),
         )
 
@@ -156,6 +161,7 @@ if __name__ == '__main__':
                 publish_max=args.ps_publish_max,
                 download_min=args.ps_download_min,
                 download_max=args.ps_download_max,
+                archive_root_dir=WEB_DIR if args.ps_read_from_archive else None,
             ),
         )
 
@@ -176,6 +182,7 @@ if __name__ == '__main__':
             worker_debug=args.nswlrs_propdesc_child_debug,
             workers=args.nswlrs_propdesc_workers,
             sub_workers=args.nswlrs_propdesc_subworkers,
+            page_size=args.nswlrs_propdesc_page_size,
         )
 
     config = NswVgTaskConfig.Ingestion(
@@ -199,7 +206,12 @@ if __name__ == '__main__':
         )
 
         async with get_session(io, 'env-nswvg-cli') as session:
-            environment = await initialise(io, session)
+            psi = config.load_raw_property_sales
+            environment = await initialise(
+                io,
+                session,
+                extract_sale_prices=psi is None or psi.parent_config.archive_root_dir is None,
+            )
 
         try:
             await db.open()
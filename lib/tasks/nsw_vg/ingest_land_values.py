@@ -100,9 +100,9 @@ def spawn_worker(id: int,
         logger = logging.getLogger(f'{__name__}.spawn')
         io = IoService.create(file_limit)
         db = DatabaseService.create(cfg.db_config, cfg.db_conn)
-        ingestion = NswVgLvIngestion(cfg.chunk_size, io, db)
+        ingestion = NswVgLvIngestion(cfg.chunk_size, io, db, cfg.flush_size)
         coordinator = NswVgLvCoordinatorClient(recv_q=recv_q, send_q=send_q)
-        worker = NswVgLvWorker.create(id, ingestion, coordinator, cfg.db_conn * (2 ** 4))
+        worker = NswVgLvWorker.create(id, ingestion, coordinator)
         try:
             logger.debug('start worker')
             await worker.start(cfg.db_conn)
@@ -130,6 +130,7 @@ if __name__ == '__main__':
     parser.add_argument("--workers", type=int, required=True)
     parser.add_argument("--worker-db-conn", type=int, default=8)
     parser.add_argument("--worker-chunk-size", type=int, default=1000)
+    parser.add_argument("--worker-flush-size", type=int, default=50_000)
     parser.add_argument("--truncate-raw-earlier", action='store_true', default=False)
 
     args = parser.parse_args()
@@ -156,6 +157,7 @@ if __name__ == '__main__':
             db_conn=args.worker_db_conn,
             db_config=db_config,
             chunk_size=args.worker_chunk_size,
+            flush_size=args.worker_flush_size,
         ),
     )
     asyncio.run(cli_main(cfg))
@@ -19,17 +19,17 @@ async def ingest_property_description(
     semaphore = Semaphore(1)
     spawn_worker_with_worker_config = lambda w_config: \
         Process(target=spawn_worker,
-                args=(w_config, semaphore, config.worker_debug, config.db_config))
+                args=(w_config, semaphore, config.worker_debug, config.db_config, config.page_size))
     pool = PropDescIngestionWorkerPool(semaphore, spawn_worker_with_worker_config)
     parent = PropDescIngestionSupervisor(db, pool)
     await parent.ingest(config.workers, config.sub_workers)
 
-def spawn_worker(config: WorkerProcessConfig, semaphore: SemaphoreT, worker_debug: bool, db_config: DatabaseConfig):
+def spawn_worker(config: WorkerProcessConfig, semaphore: SemaphoreT, worker_debug: bool, db_config: DatabaseConfig, page_size: int):
     async def worker_runtime(config: WorkerProcessConfig, semaphore: SemaphoreT, db_config: DatabaseConfig):
         config_vendor_logging({'sqlglot', 'psycopg.pool'})
         config_logging(config.worker_no, worker_debug)
         db = DatabaseService.create(db_config, len(config.quantiles))
-        worker = PropDescIngestionWorker(semaphore, db)
+        worker = PropDescIngestionWorker(semaphore, db, page_size)
         await worker.ingest(config.quantiles)
     asyncio.run(worker_runtime(config, semaphore, db_config))
 
@@ -43,6 +43,7 @@ if __name__ == '__main__':
     parser.add_argument("--instance", type=int, required=True)
     parser.add_argument("--workers", type=int, required=True)
     parser.add_argument("--sub-workers", type=int, required=True)
+    parser.add_argument("--page-size", type=int, default=1000)
 
     args = parser.parse_args()
 
@@ -54,6 +55,7 @@ if __name__ == '__main__':
             worker_debug=args.debug_worker,
             workers=args.workers,
             sub_workers=args.sub_workers,
+            page_size=args.page_size,
             db_config=INSTANCE_CFG[args.instance].database,
         ),
     ))
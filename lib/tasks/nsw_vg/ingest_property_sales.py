@@ -12,7 +12,7 @@ import resource
 import os
 
 from lib.pipeline.nsw_vg.property_sales.data import *
-from lib.pipeline.nsw_vg.property_sales.file_format import PropertySalesRowParserFactory, BufferedFileReaderTextSource
+from lib.pipeline.nsw_vg.property_sales.file_format import PropertySalesRowParserFactory, MmapTextSource
 from lib.pipeline.nsw_vg.property_sales.ingestion import NSW_VG_PS_INGESTION_CONFIG, PropertySalesIngestion
 from lib.pipeline.nsw_vg.property_sales.orchestration import *
 from lib.service.clock import ClockService
@@ -24,6 +24,7 @@ from .config import NswVgTaskConfig
 from ..fetch_static_files import Environment
 
 ZIP_DIR = './_out_zip'
+WEB_DIR = './_out_web'
 
 async def ingest_property_sales_rows(
     environment: Environment,
@@ -111,7 +112,7 @@ async def _child_main(
         async with asyncio.TaskGroup() as tg:
             factory = PropertySalesRowParserFactory(
                 io,
-                BufferedFileReaderTextSource,
+                MmapTextSource,
                 config.parser_chunk_size,
             )
             ingestion = PropertySalesIngestion.create(
@@ -161,7 +162,11 @@ async def _cli_main(
     db = DatabaseService.create(db_config, 1)
 
     async with get_session(io, 'psi') as session:
-        environment = await initialise(io, session)
+        environment = await initialise(
+            io,
+            session,
+            extract_sale_prices=config.parent_config.archive_root_dir is None,
+        )
 
     if truncate:
         controller = SchemaController(io, db, SchemaDiscovery.create(io))
@@ -192,6 +197,7 @@ if __name__ == '__main__':
     parser.add_argument("--publish-max", type=int, default=None)
     parser.add_argument("--download-min", type=date.fromisoformat, default=None)
     parser.add_argument("--download-max", type=date.fromisoformat, default=None)
+    parser.add_argument("--read-from-archive", action='store_true', default=False)
     parser.add_argument("--truncate-earlier", action='store_true', default=False)
     parser.add_argument("--workers", type=int, default=1)
     parser.add_argument("--worker-debug", type=int, default=False)
@@ -230,6 +236,7 @@ if __name__ == '__main__':
             publish_max=args.publish_max,
             download_min=args.download_min,
             download_max=args.download_max,
+            archive_root_dir=WEB_DIR if args.read_from_archive else None,
         ),
     )
 
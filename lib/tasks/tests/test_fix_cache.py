@@ -0,0 +1,33 @@
+import json
+import pytest
+
+from lib.service.io import IoService
+from lib.service.http.middleware.cache.constants import LEGACY_CACHE_VERSION
+from lib.service.http.middleware.cache.index import CacheIndex
+
+from ..fix_cache import fix_cache
+
+@pytest.mark.asyncio
+async def test_legacy_state_is_migrated_before_cleaning(tmp_path):
+    state_dir, cache_dir = tmp_path / 'state', tmp_path / 'cache'
+    state_dir.mkdir()
+    cache_dir.mkdir()
+    (cache_dir / 'kept').write_text('kept')
+    (cache_dir / 'orphan').write_text('orphan')
+    (state_dir / 'http-cache.json').write_text(json.dumps({
+        'version': LEGACY_CACHE_VERSION,
+        'files': {
+            'http://a': { 'json': { 'expire': 'never', 'location': 'kept', 'age': '2012-10-15 10:10:10' } },
+            'http://b': { 'json': { 'expire': 'never', 'location': 'gone', 'age': '2012-10-15 10:10:10' } },
+        },
+    }))
+
+    await fix_cache(IoService.create(None), str(state_dir), str(cache_dir))
+
+    assert (cache_dir / 'kept').exists()
+    assert not (cache_dir / 'orphan').exists()
+    assert not (state_dir / 'http-cache.json').exists()
+
+    index = CacheIndex.open(str(state_dir / 'http-cache.sqlite'))
+    assert list(index.entries()) == [('http://a', 'json', 'kept')]
+    index.close()
@@ -3,8 +3,11 @@ import geopandas as gpd
 from logging import getLogger
 import numpy
 import pandas as pd
+import shapely
 import warnings
 from typing import (
+    Any,
+    Callable,
     Dict,
     Literal,
     Optional,
@@ -33,12 +36,6 @@ def prepare_postgis_insert(
     def create_placeholder(col: Optional[FieldFormat], crs: int) -> str:
         return '%s'
 
-    def apply_dt(x: Optional[int]) -> Optional[str]:
-        max_ms = 2147483647000
-        if x is None or x > max_ms or numpy.isnan(x):
-            return None
-        return datetime.fromtimestamp(x // 1000).strftime('%Y-%m-%d %H:%M:%S')
-
     def apply_geometry(g):
         if g is None:
             return None
@@ -58,6 +55,56 @@ def prepare_postgis_insert(
     query = f"INSERT INTO {relation} ({columns}) VALUES ({placeholders})"
 
     copy = df.copy() if clone else df
+    _apply_column_formats(copy, column_formats, lambda s: s.apply(apply_geometry))
+    return copy, query
+
+def prepare_postgis_copy(
+    df: gpd.GeoDataFrame,
+    relation: str,
+    epsg_crs: int,
+    column_formats: _FormatDict,
+    clone = True
+) -> Tuple[gpd.GeoDataFrame, str]:
+    """
+    Like `prepare_postgis_insert` but the query is a `COPY ... FROM
+    STDIN` and the values are formatted for COPY's text format. The
+    geometries are hex EWKB (with the SRID) instead of WKT, which is
+    much cheaper for postgis to parse.
+    """
+    def apply_number(x):
+        # COPY won't coerce '1.0' into an integer column
+        # like an INSERT parameter would.
+        if isinstance(x, float) and x.is_integer():
+            return int(x)
+        return x
+
+    def apply_geometry(s: pd.Series) -> pd.Series:
+        geoms = numpy.asarray(s, dtype=object)
+        invalid = ~shapely.is_valid(geoms) & ~shapely.is_missing(geoms)
+        geoms[invalid] = shapely.buffer(geoms[invalid], 0)
+        geoms = shapely.set_srid(geoms, epsg_crs)
+        wkb = shapely.to_wkb(geoms, hex=True, include_srid=True)
+        return pd.Series(wkb, index=s.index, dtype=object)
+
+    columns = ", ".join(df.columns)
+    query = f"COPY {relation} ({columns}) FROM STDIN"
+
+    copy = df.copy() if clone else df
+    _apply_column_formats(copy, column_formats, apply_geometry, apply_number)
+    return copy, query
+
+def _apply_column_formats(
+    copy: gpd.GeoDataFrame,
+    column_formats: _FormatDict,
+    apply_geometry: Callable[[pd.Series], pd.Series],
+    apply_number: Optional[Callable[[Any], Any]] = None,
+) -> None:
+    def apply_dt(x: Optional[int]) -> Optional[str]:
+        max_ms = 2147483647000
+        if x is None or x > max_ms or numpy.isnan(x):
+            return None
+        return datetime.fromtimestamp(x // 1000).strftime('%Y-%m-%d %H:%M:%S')
+
     with warnings.catch_warnings():
         warnings.simplefilter("ignore")
         for k, fmt in column_formats.items():
@@ -66,19 +113,18 @@ def prepare_postgis_insert(
                     case 'bool':
                         copy[k] = copy[k].apply(lambda x: 'true' if x else 'false')
                     case 'geometry':
-                        copy[k] = copy[k].apply(apply_geometry)
+                        copy[k] = apply_geometry(copy[k])
                     case 'timestamp_ms':
-                        max_ms = 2147483647000
                         copy[k] = copy[k].apply(apply_dt)
                     case 'text':
                         copy[k] = copy[k].astype(object)
                     case 'number':
                         copy[k] = copy[k].astype(object)
                         copy[[k]] = copy[[k]].where(pd.notnull(copy[[k]]), None)
+                        if apply_number is not None:
+                            values = [apply_number(x) for x in copy[k]]
+                            copy[k] = pd.Series(values, index=copy.index, dtype=object)
             except Exception as e:
                 with pd.option_context('display.max_columns', None):
                     _logger.error(f"Failed to transform column '{k}' to '{fmt}'\n{copy[k]}\n{copy.head()}\n{copy.info()}")
                 raise e
-    return copy, query
-
-
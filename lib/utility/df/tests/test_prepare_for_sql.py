@@ -0,0 +1,35 @@
+import geopandas as gpd
+import shapely
+from shapely.geometry import Point
+
+from ..prepare_for_sql import prepare_postgis_copy
+
+def make_df() -> gpd.GeoDataFrame:
+    return gpd.GeoDataFrame(
+        {'a': [1.0, None], 'b': [1.5, 2.0]},
+        geometry=[Point(1, 2), None],
+        crs='EPSG:7844',
+    )
+
+def test_copy_query() -> None:
+    _, query = prepare_postgis_copy(make_df(), 's.t', 7844, {'geometry': 'geometry'})
+    assert query == 'COPY s.t (a, b, geometry) FROM STDIN'
+
+def test_copy_geometry_is_ewkb() -> None:
+    df, _ = prepare_postgis_copy(make_df(), 's.t', 7844, {'geometry': 'geometry'})
+    geom = shapely.from_wkb(df['geometry'][0])
+    assert geom == Point(1, 2)
+    assert shapely.get_srid(geom) == 7844
+    assert df['geometry'][1] is None
+
+def test_copy_whole_numbers_are_ints() -> None:
+    df, _ = prepare_postgis_copy(make_df(), 's.t', 7844, {
+        'a': 'number',
+        'b': 'number',
+        'geometry': 'geometry',
+    })
+    assert df.to_records(index=False).tolist() == [
+        (1, 1.5, df['geometry'][0]),
+        (None, 2, None),
+    ]
+    assert isinstance(df['a'][0], int)